@@ -0,0 +1,353 @@
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import models, transaction
+from django.db.models import Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework import serializers, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .goals import Goal
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class UserAchievementCounters(models.Model):
+    """
+    Kullanıcı başına başarı sayaçları. Durum geçişlerinde (goal / challenge / workout
+    tamamlanması, silinmesi) aynı transaction içinde F() ile artırılır; badge kontrolü,
+    istatistikler ve genel sıralama COUNT(*) yerine bu tek satırı okur.
+    Satır kullanıcı oluşturulurken (post_save) sıfırlarla açılır; mevcut kullanıcılar migration'da
+    doldurulmuştur. Sapmalar `reconcile_achievements` ile düzeltilir.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='achievements')
+    goals_completed = models.IntegerField(default=0)
+    challenges_completed = models.IntegerField(default=0)
+    workouts_completed = models.IntegerField(default=0)
+    total_duration_minutes = models.IntegerField(default=0)
+    total_sets = models.IntegerField(default=0)
+    total_reps = models.IntegerField(default=0)
+    total_volume_kg = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(F('workouts_completed').desc(), 'user', name='achv_workouts_idx'),
+            models.Index(F('goals_completed').desc(), 'user', name='achv_goals_idx'),
+            models.Index(F('challenges_completed').desc(), 'user', name='achv_challenges_idx'),
+            models.Index(F('total_volume_kg').desc(), 'user', name='achv_volume_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.workouts_completed} workouts, {self.goals_completed} goals"
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class AchievementService:
+    """Sayaç satırının artımlı güncellenmesi, okunması ve kaynaklardan yeniden hesaplanması"""
+
+    FIELDS = [
+        'goals_completed', 'challenges_completed', 'workouts_completed',
+        'total_duration_minutes', 'total_sets', 'total_reps', 'total_volume_kg',
+    ]
+    # Sıralanabilir metrikler (leaderboard ?metric=)
+    METRICS = {
+        'workouts': 'workouts_completed',
+        'goals': 'goals_completed',
+        'challenges': 'challenges_completed',
+        'volume': 'total_volume_kg',
+    }
+    RECONCILE_CHUNK = 500
+
+    # ---- artımlı güncelleme ----
+    @staticmethod
+    def _update(user_ids, seed=True, **deltas):
+        """
+        F() artışı. Satırı olmayan kullanıcılar (ör. bulk_create ile açılmış hesaplar ya da
+        sayaçlardan önceki geçmişi olanlar) için satır sıfırdan değil kaynaklardan kurulur
+        (reconcile). Çağıranlar kaynağı zaten yazmış olduğundan artış bu satırlara ayrıca
+        uygulanmaz. seed=False: kaynak henüz yazılmadı (pre_delete); eksik satır açılmaz,
+        ilk okumada (get) kaynaklardan oluşturulur.
+        """
+        user_ids = list(user_ids)
+        update = {field: F(field) + value for field, value in deltas.items()}
+        update['updated_at'] = timezone.now()
+        updated = UserAchievementCounters.objects.filter(user_id__in=user_ids).update(**update)
+        if updated < len(user_ids) and seed:
+            existing = set(
+                UserAchievementCounters.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True)
+            )
+            missing = [user_id for user_id in user_ids if user_id not in existing]
+            AchievementService.reconcile(missing)
+
+    @staticmethod
+    def ensure(user_ids):
+        """Eksik sayaç satırlarını sıfırlarla açar"""
+        UserAchievementCounters.objects.bulk_create(
+            [UserAchievementCounters(user_id=user_id) for user_id in user_ids], ignore_conflicts=True,
+        )
+
+    @staticmethod
+    def bump(user_id, seed=True, **deltas):
+        """Tek UPDATE ile F() artışı"""
+        deltas = {field: value for field, value in deltas.items() if value}
+        if deltas:
+            AchievementService._update([user_id], seed=seed, **deltas)
+
+    @staticmethod
+    def bump_many(field, amounts):
+        """amounts: {user_id: delta}; aynı delta'ya sahip kullanıcılar tek UPDATE'te"""
+        by_delta = {}
+        for user_id, delta in amounts.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(user_id)
+        for delta, user_ids in by_delta.items():
+            AchievementService._update(user_ids, **{field: delta})
+
+    @staticmethod
+    def goals_completed(user_ids, sign=1):
+        """user_ids: tamamlanan (sign=-1 ise geri alınan) her goal için bir user_id"""
+        AchievementService.bump_many('goals_completed', {u: n * sign for u, n in Counter(user_ids).items()})
+
+    @staticmethod
+    def challenges_completed(user_ids, sign=1):
+        AchievementService.bump_many('challenges_completed', {u: n * sign for u, n in Counter(user_ids).items()})
+
+    @staticmethod
+    def workout_totals(session):
+        """Session'ın sayaçlara katkısı (tek aggregate sorgu)"""
+        from workouts.models import WorkoutSet
+
+        totals = WorkoutSet.objects.filter(workout_exercise__workout=session).aggregate(
+            sets=Count('id'),
+            rep_count=Sum('reps'),
+            volume=Sum(F('weight_kg') * F('reps'), output_field=FloatField()),
+        )
+        return {
+            'workouts_completed': 1,
+            'total_duration_minutes': session.duration_minutes or 0,
+            'total_sets': totals['sets'] or 0,
+            'total_reps': totals['rep_count'] or 0,
+            'total_volume_kg': totals['volume'] or 0,
+        }
+
+    @staticmethod
+    def workout_completed(session, sign=1, seed=True):
+        """Session tamamlandı (sign=-1: tamamlanmışlık geri alındı / silindi)"""
+        totals = AchievementService.workout_totals(session)
+        AchievementService.bump(session.user_id, seed=seed, **{k: v * sign for k, v in totals.items()})
+
+    @staticmethod
+    def session_saved(session, was_completed, old_duration):
+        """Session kaydedildi: tamamlanma geçişi ya da tamamlanmış session'da süre değişikliği"""
+        if was_completed and session.is_completed:
+            delta = (session.duration_minutes or 0) - (old_duration or 0)
+            AchievementService.bump(session.user_id, total_duration_minutes=delta)
+        elif session.is_completed:
+            AchievementService.workout_completed(session)
+        elif was_completed:
+            # Geri alındı: sayaca daha önce eklenen süre düşülür
+            totals = AchievementService.workout_totals(session)
+            totals['total_duration_minutes'] = old_duration or 0
+            AchievementService.bump(session.user_id, **{k: -v for k, v in totals.items()})
+
+    @staticmethod
+    def sets_changed(session, sets=0, reps=0, volume=0):
+        """Tamamlanmış bir session'da set eklendi / düzenlendi / silindi"""
+        if session.is_completed:
+            AchievementService.bump(session.user_id, total_sets=sets, total_reps=reps, total_volume_kg=volume)
+
+    # ---- okuma ----
+    @staticmethod
+    def get(user_id):
+        """Tek satır okuma; satır yoksa (sinyal dışı açılmış hesap) kaynaklardan bir kez oluşturulur"""
+        counters = UserAchievementCounters.objects.filter(user_id=user_id).first()
+        if counters is None:
+            AchievementService.reconcile([user_id])
+            counters = UserAchievementCounters.objects.get(user_id=user_id)
+        return counters
+
+    @staticmethod
+    def get_many(user_ids):
+        """{user_id: counters}; eksik satırlar tek reconcile ile oluşturulur"""
+        counters = {c.user_id: c for c in UserAchievementCounters.objects.filter(user_id__in=user_ids)}
+        missing = set(user_ids) - set(counters)
+        if missing:
+            AchievementService.reconcile(missing)
+            counters.update({c.user_id: c for c in UserAchievementCounters.objects.filter(user_id__in=missing)})
+        return counters
+
+    # ---- yeniden hesaplama ----
+    @staticmethod
+    def computed(user_ids=None):
+        """Kaynak tablolardan hesaplanan sayaçlar: kullanıcı başına tek satır (correlated subquery'ler)"""
+        from workouts.models import WorkoutSession, WorkoutSet
+        from .models import ChallengeJoined
+
+        def aggregate_of(qs, user_field, expression, output_field):
+            return Coalesce(
+                Subquery(
+                    qs.filter(**{user_field: OuterRef('pk')}).order_by().values(user_field)
+                    .annotate(n=expression).values('n'),
+                    output_field=output_field,
+                ),
+                Value(0, output_field=output_field),
+            )
+
+        sessions = WorkoutSession.objects.filter(is_completed=True)
+        sets = WorkoutSet.objects.filter(workout_exercise__workout__is_completed=True)
+        set_user = 'workout_exercise__workout__user'
+        qs = User.objects.order_by('pk')
+        if user_ids is not None:
+            qs = qs.filter(pk__in=user_ids)
+        # Alias'lar User'ın ilişki adlarıyla (goals, ...) çakışmasın diye önekli
+        return qs.values('pk').annotate(
+            n_goals_completed=aggregate_of(Goal.objects.filter(is_completed=True), 'user', Count('id'), IntegerField()),
+            n_challenges_completed=aggregate_of(
+                ChallengeJoined.objects.filter(is_completed=True), 'user', Count('id'), IntegerField()
+            ),
+            n_workouts_completed=aggregate_of(sessions, 'user', Count('id'), IntegerField()),
+            n_total_duration_minutes=aggregate_of(sessions, 'user', Sum('duration_minutes'), IntegerField()),
+            n_total_sets=aggregate_of(sets, set_user, Count('id'), IntegerField()),
+            n_total_reps=aggregate_of(sets, set_user, Sum('reps'), IntegerField()),
+            n_total_volume_kg=aggregate_of(sets, set_user, Sum(F('weight_kg') * F('reps')), FloatField()),
+        )
+
+    @staticmethod
+    def reconcile(user_ids=None):
+        """
+        Sayaçları kaynaklardan yeniden yazar (yoksa oluşturur). Chunk başına bir hesaplama
+        sorgusu + bir upsert. Değeri değişen (ya da yeni oluşan) satır sayısını döner.
+        """
+        fields = AchievementService.FIELDS
+        changed = 0
+        chunk = []
+
+        def flush(rows):
+            existing = {
+                row['user_id']: row
+                for row in UserAchievementCounters.objects
+                .filter(user_id__in=[r['pk'] for r in rows]).values('user_id', *fields)
+            }
+            objs = []
+            drifted = 0
+            for row in rows:
+                values = {field: row[f'n_{field}'] for field in fields}
+                old = existing.get(row['pk'])
+                if old is None or any(old[field] != values[field] for field in fields):
+                    drifted += 1
+                objs.append(UserAchievementCounters(user_id=row['pk'], **values))
+            UserAchievementCounters.objects.bulk_create(
+                objs, update_conflicts=True, unique_fields=['user'], update_fields=fields + ['updated_at'],
+            )
+            return drifted
+
+        with transaction.atomic():
+            for row in AchievementService.computed(user_ids).iterator(chunk_size=AchievementService.RECONCILE_CHUNK):
+                chunk.append(row)
+                if len(chunk) >= AchievementService.RECONCILE_CHUNK:
+                    changed += flush(chunk)
+                    chunk = []
+            if chunk:
+                changed += flush(chunk)
+        return changed
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_counters_for_new_user(sender, instance, created, raw=False, **kwargs):
+    # Sayaç satırı baştan var: artışlar ve genel sıralama yeni kullanıcıları da kapsar
+    if created and not raw:
+        AchievementService.ensure([instance.pk])
+
+
+# Silinen tamamlanmış kayıtlar (challenge'dan çıkma, cascade silmeler dahil) sayaçtan düşülür
+@receiver(post_delete, sender=Goal)
+def discount_deleted_goal(sender, instance, **kwargs):
+    if instance.is_completed:
+        AchievementService.goals_completed([instance.user_id], sign=-1)
+
+
+@receiver(post_delete, sender='fitware.ChallengeJoined')
+def discount_deleted_join(sender, instance, **kwargs):
+    if instance.is_completed:
+        AchievementService.challenges_completed([instance.user_id], sign=-1)
+
+
+@receiver(pre_delete, sender='workouts.WorkoutSession')
+def discount_deleted_session(sender, instance, **kwargs):
+    # pre_delete: set'ler cascade ile silinmeden önce toplamları okunabilsin. Session henüz
+    # silinmediği için eksik satır buradan kurulmaz (kaynaklardan sayılırdı).
+    if instance.is_completed:
+        AchievementService.workout_completed(instance, sign=-1, seed=False)
+
+
+# =============================================================================
+# SERIALIZERS
+# =============================================================================
+
+class AchievementCountersSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserAchievementCounters
+        fields = AchievementService.FIELDS + ['updated_at']
+
+
+# =============================================================================
+# VIEWS
+# =============================================================================
+
+class AchievementViewSet(viewsets.ViewSet):
+    """
+    GET /api/achievements/ - Current user's counters (+ streak)
+    GET /api/achievements/leaderboard/?metric=workouts|goals|challenges|volume&limit=50
+    """
+    permission_classes = [IsAuthenticated]
+    LEADERBOARD_SIZE = 50
+    LEADERBOARD_MAX_SIZE = 200
+
+    def list(self, request):
+        from .streaks import StreakService, StreakSerializer
+
+        data = AchievementCountersSerializer(AchievementService.get(request.user.pk)).data
+        data['streak'] = StreakSerializer(StreakService.get_streak(request.user)).data
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def leaderboard(self, request):
+        from .leaderboards import display_name
+
+        metric = request.query_params.get('metric', 'workouts')
+        field = AchievementService.METRICS.get(metric)
+        if not field:
+            return Response({'metric': f'Unknown metric: {metric}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', self.LEADERBOARD_SIZE))
+        except ValueError:
+            return Response({'limit': 'Must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.LEADERBOARD_MAX_SIZE))
+
+        rows = (
+            UserAchievementCounters.objects.filter(**{f'{field}__gt': 0})
+            .select_related('user')
+            .order_by(f'-{field}', 'user_id')[:limit]
+        )
+        results = []
+        for position, row in enumerate(rows, start=1):
+            value = getattr(row, field)
+            rank = results[-1]['rank'] if results and results[-1]['value'] == value else position
+            results.append({
+                'rank': rank,
+                'user_id': row.user_id,
+                'display_name': display_name(row.user),
+                'value': value,
+            })
+        return Response({'metric': metric, 'results': results})
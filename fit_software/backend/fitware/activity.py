@@ -0,0 +1,173 @@
+import base64
+import datetime
+import logging
+import threading
+
+from django.core.signals import request_finished
+from django.db import connection, transaction
+from django.dispatch import receiver
+
+from .goals import ActivityLog, local_today
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class ActivityRecorder:
+    """
+    ActivityLog yazımlarını birleştiren süreç içi kayıt tamponu.
+
+    - Bu süreçte bugün zaten loglanan (user, date, action_type) anahtarları
+      DB'ye hiç gitmeden atlanır.
+    - Yeni kayıtlar tamponda toplanır ve istek bitince (ya da tampon dolunca)
+      tek bir bulk INSERT ile, çakışmalar yok sayılarak yazılır. Açık bir transaction
+      içinde kaydedilenler ancak commit'te kuyruğa girer ve o anda yazılır; transaction
+      geri alınırsa kayıt hiç tampona girmez.
+
+    Dayanıklılık: tampon yalnızca süreç belleğindedir; flush'tan önce worker çökerse ya da
+    yeniden başlatılırsa bekleyen kayıtlar kaybolur. Bu loglar yalnızca streak/takvim içindir,
+    bu kayıp bilerek kabul edilmiştir. Sonucu DB'ye dayanması gereken yerler (ör. log_visit)
+    tamponu kullanmaz. `record`ın dönüş değeri DB'deki durumu değil, bu sürecin tamponunu yansıtır.
+    """
+
+    batch_size = 200
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._seen_day = None
+        self._pending = {}
+
+    def record(self, user, action_type, day=None):
+        """
+        Aktiviteyi kuyruğa alır; bu süreçte ilk kez görülüyorsa True döner.
+        Açık bir transaction içindeyse kayıt ancak commit'te kuyruğa girer (ve yazılır);
+        geri alınan işin aktivitesi loglanmaz.
+        """
+        day = day or local_today()
+        user_id = getattr(user, 'pk', user)
+        key = (user_id, day, action_type)
+
+        if connection.in_atomic_block:
+            with self._lock:
+                self._forget_past_days()
+                if key in self._seen:
+                    return False
+            transaction.on_commit(lambda: self._queue(key) and self.flush())
+            return True
+        queued = self._queue(key)
+        if queued and len(self._pending) >= self.batch_size:
+            self.flush()
+        return queued
+
+    def _forget_past_days(self):
+        today = local_today()
+        if self._seen_day != today:
+            # Gün döndü: dünün anahtarlarını unut
+            self._seen = {k for k in self._seen if k[1] >= today}
+            self._seen_day = today
+
+    def _queue(self, key):
+        """Anahtarı tampona ekler; bu süreçte daha önce görülmüşse False"""
+        with self._lock:
+            self._forget_past_days()
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            user_id, day, action_type = key
+            self._pending[key] = ActivityLog(user_id=user_id, date=day, action_type=action_type)
+            return True
+
+    def flush(self):
+        """Bekleyen kayıtları tek sorguda yazar ve streak'leri günceller"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        try:
+            ActivityLog.objects.bulk_create(pending.values(), ignore_conflicts=True)
+        except Exception as exc:
+            # Yazılamayanlar bir sonraki çağrıda tekrar denenebilsin
+            with self._lock:
+                self._seen.difference_update(pending.keys())
+            logger.warning("Could not flush activity logs: %s", exc)
+            return 0
+
+        # bulk_create post_save tetiklemez; streak'i gün başına bir kez güncelle
+        from .streaks import StreakService
+        for user_id, day in {(k[0], k[1]) for k in pending}:
+            try:
+                StreakService.record_activity(user_id, day)
+            except Exception as exc:
+                logger.warning("Could not update streak for user %s: %s", user_id, exc)
+        return len(pending)
+
+    def clear(self):
+        with self._lock:
+            self._seen = set()
+            self._seen_day = None
+            self._pending = {}
+
+
+activity_recorder = ActivityRecorder()
+
+
+@receiver(request_finished)
+def flush_activity_on_request_finished(sender, **kwargs):
+    activity_recorder.flush()
+
+
+# =============================================================================
+# ACTIVITY CALENDAR (yıllık ısı haritası)
+# =============================================================================
+
+def encode_bitmap(day_indexes, days):
+    """Gün indekslerini bit dizisine çevirir (bit i = yılın i. günü, LSB önce), base64"""
+    bits = bytearray((days + 7) // 8)
+    for i in day_indexes:
+        bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode('ascii')
+
+
+def encode_runs(day_indexes):
+    """Ardışık aktif günleri [başlangıç_indeksi, uzunluk] çiftlerine sıkıştırır"""
+    runs = []
+    for i in sorted(day_indexes):
+        if runs and runs[-1][0] + runs[-1][1] == i:
+            runs[-1][1] += 1
+        else:
+            runs.append([i, 1])
+    return runs
+
+
+def build_activity_calendar(user, year, encoding='bitmap'):
+    """Bir yılın günlük aktivitesini action_type bazında tek sorguyla çıkarır"""
+    start = datetime.date(year, 1, 1)
+    days = (datetime.date(year + 1, 1, 1) - start).days
+
+    by_type = {}
+    rows = (
+        ActivityLog.objects.filter(user=user, date__gte=start, date__lt=datetime.date(year + 1, 1, 1))
+        .order_by()
+        .values_list('action_type', 'date')
+    )
+    for action_type, day in rows:
+        by_type.setdefault(action_type, set()).add((day - start).days)
+
+    all_days = set().union(*by_type.values()) if by_type else set()
+
+    def encode(indexes):
+        data = encode_runs(indexes) if encoding == 'rle' else encode_bitmap(indexes, days)
+        return {'count': len(indexes), 'data': data}
+
+    return {
+        'year': year,
+        'start': str(start),
+        'days': days,
+        'encoding': encoding,
+        'action_types': {action_type: encode(indexes) for action_type, indexes in sorted(by_type.items())},
+        'all': encode(all_days),
+    }
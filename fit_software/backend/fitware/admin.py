@@ -4,9 +4,18 @@ from .models import (
     Goal,
     Challenge,
     ChallengeJoined,
+    ChallengeResult,
     Movement,
     WorkoutLog,
     Badge,
+    UserStreak,
+    GoalProgressEvent,
+    BodyMetric,
+    Job,
+    OutboxEvent,
+    UserAchievementCounters,
+    OutgoingEmail,
+    RateLimitRule,
 )
 
 
@@ -44,7 +53,7 @@ class ChallengeJoinedInline(admin.TabularInline):
 
 @admin.register(Challenge)
 class ChallengeAdmin(admin.ModelAdmin):
-    list_display = ("title", "created_user", "badge_name", "due_date", "created_at")
+    list_display = ("title", "created_user", "badge_name", "due_date", "participant_count", "finalized_at", "created_at")
     search_fields = (
         "title",
         "created_user__username",
@@ -55,6 +64,13 @@ class ChallengeAdmin(admin.ModelAdmin):
     inlines = [ChallengeJoinedInline]
 
 
+@admin.register(ChallengeResult)
+class ChallengeResultAdmin(admin.ModelAdmin):
+    list_display = ("challenge", "rank", "user", "progress_value", "is_completed", "created_at")
+    list_filter = ("is_completed",)
+    search_fields = ("challenge__title", "user__username", "user__email")
+
+
 # MOVEMENT
 @admin.register(Movement)
 class MovementAdmin(admin.ModelAdmin):
@@ -74,7 +90,75 @@ class WorkoutLogAdmin(admin.ModelAdmin):
 # BADGE
 @admin.register(Badge)
 class BadgeAdmin(admin.ModelAdmin):
-    list_display = ("badge_type", "user", "awarded_at")
+    list_display = ("badge_type", "user", "awarded_at", "seen_at")
     list_filter = ("badge_type", "awarded_at")
     search_fields = ("badge_type", "user__email", "user__username")
     readonly_fields = ("awarded_at",)
+
+
+# STREAK
+@admin.register(UserStreak)
+class UserStreakAdmin(admin.ModelAdmin):
+    list_display = ("user", "current_streak", "longest_streak", "last_active_date", "updated_at")
+    search_fields = ("user__username", "user__email")
+    readonly_fields = ("updated_at",)
+
+
+# GOAL PROGRESS HISTORY
+@admin.register(GoalProgressEvent)
+class GoalProgressEventAdmin(admin.ModelAdmin):
+    list_display = ("goal", "value", "source", "is_daily", "recorded_at")
+    list_filter = ("source", "is_daily")
+    search_fields = ("goal__title", "goal__user__username", "goal__user__email")
+
+
+# BODY METRICS
+@admin.register(BodyMetric)
+class BodyMetricAdmin(admin.ModelAdmin):
+    list_display = ("user", "metric", "value", "source", "recorded_at")
+    list_filter = ("metric", "source")
+    search_fields = ("user__username", "user__email")
+
+
+# JOB QUEUE
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "status", "priority", "dedup_key", "attempts", "duration_ms", "run_after", "finished_at")
+    list_filter = ("kind", "status")
+    search_fields = ("dedup_key", "last_error")
+
+
+# OUTBOX
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ("topic", "created_at", "processed_at", "attempts", "available_at")
+    list_filter = ("topic",)
+    search_fields = ("last_error",)
+    readonly_fields = ("created_at",)
+
+
+# ACHIEVEMENT COUNTERS
+@admin.register(UserAchievementCounters)
+class UserAchievementCountersAdmin(admin.ModelAdmin):
+    list_display = ("user", "goals_completed", "challenges_completed", "workouts_completed", "total_volume_kg", "updated_at")
+    search_fields = ("user__username", "user__email")
+    readonly_fields = ("updated_at",)
+
+
+# OUTGOING EMAIL
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ("to_email", "subject", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("to_email", "last_error")
+    # Gövde tek kullanımlık linkler içerir; admin'de gösterilmez
+    exclude = ("body",)
+    readonly_fields = ("created_at", "sent_at")
+
+
+# RATE LIMITS
+@admin.register(RateLimitRule)
+class RateLimitRuleAdmin(admin.ModelAdmin):
+    list_display = ("scope", "key_type", "rate", "enabled", "updated_at")
+    list_filter = ("scope", "key_type", "enabled")
+    list_editable = ("rate", "enabled")
@@ -2,4 +2,18 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitware.settings')
-application = get_asgi_application()
\ No newline at end of file
+django_application = get_asgi_application()
+
+# Django kurulduktan sonra import edilmeli
+from fitware.realtime import challenge_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Challenge progress push kanalı (SSE / WebSocket) Django'nun önünde karşılanır
+    if challenge_stream.matches(scope):
+        return await challenge_stream(scope, receive, send)
+    if scope['type'] == 'websocket':
+        # Başka WebSocket yolu yok
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    return await django_application(scope, receive, send)
@@ -0,0 +1,148 @@
+import copy
+import functools
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import BaseAuthentication
+from rest_framework_simplejwt.authentication import AUTH_HEADER_TYPE_BYTES, JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class UserCache:
+    """
+    JWT ile doğrulanan kullanıcılar için süreç içi, kısa ömürlü önbellek.
+
+    Kayıt/silme sinyalleri (şifre değişimi dahil) ilgili girdiyi hemen düşürür;
+    başka süreçlerde yapılan değişiklikler en geç AUTH_USER_CACHE_SECONDS sonra görülür.
+    """
+
+    max_size = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @staticmethod
+    def ttl():
+        return getattr(settings, 'AUTH_USER_CACHE_SECONDS', 60)
+
+    # Token claim'i string (simplejwt), sinyaldeki pk int olabilir; anahtar her zaman str
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[str(user_id)]
+                return None
+        # Her istek kendi kopyasını alır; istek içi önbellekler paylaşılmaz
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        ttl = self.ttl()
+        if ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                now = time.monotonic()
+                self._entries = {k: v for k, v in self._entries.items() if v[0] >= now}
+                if len(self._entries) >= self.max_size:
+                    self._entries.clear()
+            self._entries[str(user_id)] = (time.monotonic() + ttl, copy.copy(user))
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+
+
+# =============================================================================
+# AUTHENTICATION
+# =============================================================================
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    İmza ve süre kontrolü her istekte yapılır; kullanıcı satırı ise `user_cache`'ten
+    okunur. Aktiflik / şifre (CHECK_REVOKE_TOKEN) kontrolleri önbellekteki kullanıcıyla aynen uygulanır.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+            return user
+        self.check_user(user, validated_token)
+        return user
+
+    @staticmethod
+    def check_user(user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+
+class RouteScopedAuthentication(BaseAuthentication):
+    """
+    DEFAULT_AUTHENTICATION_CLASSES yerine geçen tek giriş noktası.
+
+    AUTH_FAST_PATH_PREFIXES altındaki Bearer istekleri doğrudan JWT'ye gider
+    (Session/Token/Basic denenmez). Diğer istekler AUTHENTICATION_CHAIN'i DRF'in
+    yaptığı gibi sırayla dener; 401/403 davranışı zincirin ilk elemanına göre kalır.
+    """
+
+    def __init__(self):
+        self.chain = [cls() for cls in self.chain_classes(tuple(settings.AUTHENTICATION_CHAIN))]
+        self.jwt = next(
+            (a for a in self.chain if isinstance(a, JWTAuthentication)), CachedJWTAuthentication(),
+        )
+        self.prefixes = tuple(getattr(settings, 'AUTH_FAST_PATH_PREFIXES', ('/api/',)))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def chain_classes(paths):
+        return [import_string(path) for path in paths]
+
+    def authenticate(self, request):
+        if request.path.startswith(self.prefixes) and self._is_bearer(request):
+            return self.jwt.authenticate(request)
+        for authenticator in self.chain:
+            result = authenticator.authenticate(request)
+            if result is not None:
+                return result
+        return None
+
+    def authenticate_header(self, request):
+        return self.chain[0].authenticate_header(request) if self.chain else None
+
+    def _is_bearer(self, request):
+        header = self.jwt.get_header(request)
+        parts = header.split(None, 1) if header else ()
+        return bool(parts) and parts[0] in AUTH_HEADER_TYPE_BYTES
@@ -0,0 +1,55 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2),
+                    thread_name_prefix='fitware-bg',
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, '__name__', func))
+    finally:
+        # Worker thread'lerinin bağlantıları açık kalmasın
+        close_old_connections()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    İşi mevcut transaction commit edildikten sonra, istek thread'i dışında çalıştırır.
+    BACKGROUND_TASKS_EAGER=True ise (testler) commit sonrası aynı thread'de çalışır.
+    """
+    def submit():
+        if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("Background task %s failed", getattr(func, '__name__', func))
+        else:
+            _get_executor().submit(_run, func, args, kwargs)
+
+    transaction.on_commit(submit)
@@ -1,4 +1,6 @@
+from django.utils import timezone
 from rest_framework import serializers, viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Badge
@@ -10,105 +12,116 @@ from .models import Badge
 class BadgeService:
     """Service for handling badge awarding logic with milestone achievements"""
     
-    # Milestone badge definitions with creative names and emojis
+    # Milestone badge definitions with creative names and emojis.
+    # Kural tablosu: metric sayacı threshold'a ulaşınca badge verilir.
     MILESTONE_BADGES = {
         'goal_5': {
             'name': '🎯 Goal Crusher',
-            'description': 'Complete 5 goals'
+            'description': 'Complete 5 goals',
+            'metric': 'goals',
+            'threshold': 5,
         },
         'goal_10': {
             'name': '⭐ Goal Master',
-            'description': 'Complete 10 goals'
+            'description': 'Complete 10 goals',
+            'metric': 'goals',
+            'threshold': 10,
         },
         'goal_15': {
             'name': '🏆 Goal Legend',
-            'description': 'Complete 15 goals'
+            'description': 'Complete 15 goals',
+            'metric': 'goals',
+            'threshold': 15,
         },
         'goal_20': {
             'name': '👑 Goal Champion',
-            'description': 'Complete 20 goals'
+            'description': 'Complete 20 goals',
+            'metric': 'goals',
+            'threshold': 20,
         },
         'challenge_1': {
             'name': '🎪 Challenge Taker',
-            'description': 'Complete 1 challenge'
+            'description': 'Complete 1 challenge',
+            'metric': 'challenges',
+            'threshold': 1,
         },
         'challenge_5': {
             'name': '🔥 Challenge Warrior',
-            'description': 'Complete 5 challenges'
+            'description': 'Complete 5 challenges',
+            'metric': 'challenges',
+            'threshold': 5,
         },
         'challenge_10': {
             'name': '⚡ Challenge Legend',
-            'description': 'Complete 10 challenges'
+            'description': 'Complete 10 challenges',
+            'metric': 'challenges',
+            'threshold': 10,
         },
         'workout_5': {
             'name': '💪 Workout Warrior',
-            'description': 'Complete 5 workouts'
+            'description': 'Complete 5 workouts',
+            'metric': 'workouts',
+            'threshold': 5,
         },
         'workout_10': {
             'name': '🏋️ Iron Beast',
-            'description': 'Complete 10 workouts'
+            'description': 'Complete 10 workouts',
+            'metric': 'workouts',
+            'threshold': 10,
         },
         'workout_25': {
             'name': '🚀 Fitness Rocket',
-            'description': 'Complete 25 workouts'
+            'description': 'Complete 25 workouts',
+            'metric': 'workouts',
+            'threshold': 25,
         },
         'workout_50': {
             'name': '🌟 Gym Legend',
-            'description': 'Complete 50 workouts'
+            'description': 'Complete 50 workouts',
+            'metric': 'workouts',
+            'threshold': 50,
         },
     }
-    
+
+    @staticmethod
+    def rules_for(metric):
+        return [rule for rule in BadgeService.MILESTONE_BADGES.values() if rule['metric'] == metric]
+
+    @staticmethod
+    def milestone_counts(user_id):
+        """Kural metrikleri (tamamlanan goal / challenge / workout): sayaç tablosundan tek satır"""
+        from .achievements import AchievementService
+        counters = AchievementService.get(user_id)
+        return {
+            'goals': counters.goals_completed,
+            'challenges': counters.challenges_completed,
+            'workouts': counters.workouts_completed,
+        }
+
     @staticmethod
     def check_milestone_badges(user):
-        """Check and award milestone badges for completed goals, challenges, and workouts"""
-        from .models import Goal, ChallengeJoined, Badge
-        
-        # Count completed goals
-        completed_goals = Goal.objects.filter(user=user, is_completed=True).count()
-        
-        # Award goal milestones (every 5 goals)
-        goal_milestones = [5, 10, 15, 20]
-        for milestone in goal_milestones:
-            if completed_goals >= milestone:
-                badge_key = f'goal_{milestone}'
-                badge_info = BadgeService.MILESTONE_BADGES.get(badge_key)
-                if badge_info and not Badge.objects.filter(user=user, badge_type=badge_info['name']).exists():
-                    Badge.objects.create(user=user, badge_type=badge_info['name'])
-        
-        # Count completed challenges
-        completed_challenges = ChallengeJoined.objects.filter(user=user, is_completed=True).count()
-        
-        # Award challenge milestones (every challenge)
-        if completed_challenges >= 1:
-            badge_info = BadgeService.MILESTONE_BADGES.get('challenge_1')
-            if badge_info and not Badge.objects.filter(user=user, badge_type=badge_info['name']).exists():
-                Badge.objects.create(user=user, badge_type=badge_info['name'])
-        
-        if completed_challenges >= 5:
-            badge_info = BadgeService.MILESTONE_BADGES.get('challenge_5')
-            if badge_info and not Badge.objects.filter(user=user, badge_type=badge_info['name']).exists():
-                Badge.objects.create(user=user, badge_type=badge_info['name'])
-        
-        if completed_challenges >= 10:
-            badge_info = BadgeService.MILESTONE_BADGES.get('challenge_10')
-            if badge_info and not Badge.objects.filter(user=user, badge_type=badge_info['name']).exists():
-                Badge.objects.create(user=user, badge_type=badge_info['name'])
-        
-        # Count completed workouts
-        try:
-            from workouts.models import WorkoutSession
-            completed_workouts = WorkoutSession.objects.filter(user=user, is_completed=True).count()
-        except (ImportError, Exception):
-            completed_workouts = 0
-        
-        # Award workout milestones (every 5 workouts)
-        workout_milestones = [5, 10, 25, 50]
-        for milestone in workout_milestones:
-            if completed_workouts >= milestone:
-                badge_key = f'workout_{milestone}'
-                badge_info = BadgeService.MILESTONE_BADGES.get(badge_key)
-                if badge_info and not Badge.objects.filter(user=user, badge_type=badge_info['name']).exists():
-                    Badge.objects.create(user=user, badge_type=badge_info['name'])
+        """
+        Check and award milestone badges for completed goals, challenges, and workouts.
+        Tek aggregate sorgu + kullanıcının badge kümesi; yeniler tek bulk INSERT ile
+        (user, badge_type) unique kısıtına çarpanlar yok sayılarak yazılır.
+        Yeni verilen Badge nesnelerini döner.
+        """
+        user_id = getattr(user, 'pk', user)
+        counts = BadgeService.milestone_counts(user_id)
+        earned = [
+            rule['name'] for rule in BadgeService.MILESTONE_BADGES.values()
+            if counts[rule['metric']] >= rule['threshold']
+        ]
+        if not earned:
+            return []
+
+        owned = set(
+            Badge.objects.filter(user_id=user_id, badge_type__in=earned).values_list('badge_type', flat=True)
+        )
+        new = [Badge(user_id=user_id, badge_type=name) for name in earned if name not in owned]
+        if new:
+            Badge.objects.bulk_create(new, ignore_conflicts=True)
+        return new
 
 # =============================================================================
 # SERIALIZERS
@@ -119,8 +132,8 @@ class BadgeSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Badge
-        fields = ['id', 'badge_type', 'awarded_at']
-        read_only_fields = ['awarded_at']
+        fields = ['id', 'badge_type', 'awarded_at', 'seen_at']
+        read_only_fields = ['awarded_at', 'seen_at']
 
 # =============================================================================
 # VIEWS
@@ -133,6 +146,8 @@ class BadgeViewSet(viewsets.ModelViewSet):
     Endpoints:
     - GET /api/badges/ - Get all badges for the current authenticated user
     - POST /api/badges/ - Create a new badge for the current authenticated user
+    - GET /api/badges/new/ - Badges not yet shown to the user (arka planda verilenler)
+    - POST /api/badges/seen/ - Mark badges as shown ({"ids": [...]} or all)
     """
     
     serializer_class = BadgeSerializer
@@ -150,5 +165,22 @@ class BadgeViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create badge and assign to current user"""
+        badge_type = serializer.validated_data.get('badge_type')
+        if Badge.objects.filter(user=self.request.user, badge_type=badge_type).exists():
+            raise serializers.ValidationError({'badge_type': 'Badge already awarded.'})
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['get'])
+    def new(self, request):
+        badges = self.get_queryset().filter(seen_at__isnull=True)
+        return Response(self.get_serializer(badges, many=True).data)
+
+    @action(detail=False, methods=['post'])
+    def seen(self, request):
+        badges = self.get_queryset().filter(seen_at__isnull=True)
+        ids = request.data.get('ids')
+        if ids is not None:
+            if not isinstance(ids, list):
+                return Response({'ids': 'Must be a list.'}, status=status.HTTP_400_BAD_REQUEST)
+            badges = badges.filter(pk__in=ids)
+        return Response({'marked': badges.update(seen_at=timezone.now())})
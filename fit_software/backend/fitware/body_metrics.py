@@ -0,0 +1,208 @@
+import datetime
+
+from django.db import models
+from django.db.models import Avg, Q
+from django.db.models.functions import TruncDate
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework import serializers, viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class BodyMetric(models.Model):
+    """Vücut ölçümlerinin (append-only) zaman serisi"""
+    METRIC_CHOICES = [
+        ('weight', 'Weight (kg)'),
+        ('body_fat', 'Body Fat %'),
+        ('waist', 'Waist (cm)'),
+        ('hips', 'Hips (cm)'),
+        ('chest', 'Chest (cm)'),
+        ('height', 'Height (cm)'),
+    ]
+    SOURCE_CHOICES = [
+        ('profile', 'Profile update'),
+        ('goal', 'Goal progress'),
+        ('manual', 'Manual entry'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='body_metrics')
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES, default='weight')
+    value = models.FloatField()
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='manual')
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # value da indekste: aralık sorguları tabloya hiç gitmeden indeksten okunur
+            models.Index(fields=['user', 'metric', 'recorded_at', 'value'], name='bodymetric_covering_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} {self.metric}={self.value}"
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class BodyMetricService:
+    # Goal tipi (frontend'deki GOAL_TYPES ikonları) → (metrik, geçerli birimler).
+    # Birim tek başına yetmez: kg cinsinden bench press hedefi vücut ağırlığı değildir.
+    GOAL_TYPE_METRICS = {
+        '📉': ('weight', ('kg', 'lbs')),    # Weight Loss
+        '📈': ('weight', ('kg', 'lbs')),    # Weight Gain
+        '⚖️': ('body_fat', ('fav',)),       # Body Fat
+    }
+    DEFAULT_TREND_WINDOW = 7
+
+    @staticmethod
+    def record(user_id, metric, value, source='manual', recorded_at=None):
+        return BodyMetric.objects.create(
+            user_id=user_id, metric=metric, value=value, source=source, recorded_at=recorded_at or timezone.now(),
+        )
+
+    @staticmethod
+    def record_many(points, source):
+        """points: [(user_id, metric, value), ...] → tek bulk INSERT"""
+        now = timezone.now()
+        BodyMetric.objects.bulk_create([
+            BodyMetric(user_id=user_id, metric=metric, value=value, source=source, recorded_at=now)
+            for user_id, metric, value in points
+        ])
+
+    @staticmethod
+    def goal_metric(icon, unit):
+        """Goal tipinin (ikon + birim) karşılığı olan vücut ölçüsü; değilse None"""
+        metric, units = BodyMetricService.GOAL_TYPE_METRICS.get(icon, (None, ()))
+        return metric if unit in units else None
+
+    @staticmethod
+    def goals_q(metric):
+        """goal_metric'in sorgu karşılığı: bu ölçüyü tutan goal'ler (toplu UPDATE yolları için)"""
+        q = Q(pk__in=[])
+        for icon, (goal_metric, units) in BodyMetricService.GOAL_TYPE_METRICS.items():
+            if goal_metric == metric:
+                q |= Q(icon=icon, unit__in=units)
+        return q
+
+    @staticmethod
+    def from_goal(goal, value):
+        """Goal değerini (metric, value) çiftine çevirir; vücut ölçüsü tipinde değilse None"""
+        from .goals import GoalProgressService
+        metric = BodyMetricService.goal_metric(goal.icon, goal.unit)
+        if not metric:
+            return None
+        if goal.unit == 'lbs':
+            value = round(value * GoalProgressService.LBS_TO_KG, 2)
+        return metric, value
+
+    @staticmethod
+    def queryset(user, metric, start=None, end=None):
+        qs = BodyMetric.objects.filter(user=user, metric=metric)
+        if start:
+            qs = qs.filter(recorded_at__gte=start)
+        if end:
+            qs = qs.filter(recorded_at__lte=end)
+        return qs
+
+    @staticmethod
+    def trend(user, metric, start=None, end=None, window=DEFAULT_TREND_WINDOW):
+        """
+        Günlük ortalamalar veritabanında hesaplanır; üstüne son `window` günü kapsayan
+        hareketli ortalama eklenir (ölçüm olmayan günler pencereden düşer).
+        """
+        days = list(
+            BodyMetricService.queryset(user, metric, start, end)
+            .annotate(day=TruncDate('recorded_at'))
+            .values('day')
+            .annotate(avg=Avg('value'))
+            .order_by('day')
+            .values_list('day', 'avg')
+        )
+
+        points = []
+        total = 0.0
+        lo = 0
+        for i, (day, avg) in enumerate(days):
+            total += avg
+            while days[lo][0] <= day - datetime.timedelta(days=window):
+                total -= days[lo][1]
+                lo += 1
+            points.append({
+                'date': day,
+                'value': round(avg, 2),
+                'trend': round(total / (i - lo + 1), 2),
+            })
+        return points
+
+
+# =============================================================================
+# SERIALIZERS
+# =============================================================================
+
+class BodyMetricSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BodyMetric
+        fields = ['id', 'metric', 'value', 'source', 'recorded_at']
+        read_only_fields = ['id', 'source']
+        extra_kwargs = {'recorded_at': {'required': False}}
+
+
+# =============================================================================
+# VIEWS
+# =============================================================================
+
+class BodyMetricViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Endpoints:
+    - GET /api/body-metrics/?metric=weight&from=&to=&bucket=auto&points=200 - örneklenmiş seri
+    - POST /api/body-metrics/ - manuel ölçüm ekle
+    - DELETE /api/body-metrics/{id}/ - ölçümü sil
+    - GET /api/body-metrics/trend/?metric=weight&window=7 - günlük ortalama + hareketli ortalama
+    """
+    serializer_class = BodyMetricSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return BodyMetric.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user, source='manual')
+
+    def _parse(self, request):
+        from .progress import parse_series_params
+        metric = request.query_params.get('metric') or 'weight'
+        if metric not in dict(BodyMetric.METRIC_CHOICES):
+            raise ValueError('metric')
+        return (metric, *parse_series_params(request.query_params))
+
+    def list(self, request):
+        from .progress import bucketed_series
+        try:
+            metric, start, end, bucket, max_points = self._parse(request)
+        except ValueError as e:
+            return Response({'error': f'Invalid parameter: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = BodyMetricService.queryset(request.user, metric, start, end)
+        bucket, points = bucketed_series(qs, bucket, max_points)
+        return Response({'metric': metric, 'bucket': bucket, 'points': points})
+
+    @action(detail=False, methods=['get'])
+    def trend(self, request):
+        try:
+            metric, start, end, _, _ = self._parse(request)
+            try:
+                window = int(request.query_params.get('window') or BodyMetricService.DEFAULT_TREND_WINDOW)
+            except ValueError:
+                raise ValueError('window')
+        except ValueError as e:
+            return Response({'error': f'Invalid parameter: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        window = max(1, min(window, 90))
+        points = BodyMetricService.trend(request.user, metric, start, end, window)
+        return Response({'metric': metric, 'window': window, 'points': points})
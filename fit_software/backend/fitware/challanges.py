@@ -1,52 +1,29 @@
 # fitware/challanges.py
+import datetime
+
 from django.utils import timezone
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from django.shortcuts import get_object_or_404
 
+from .achievements import AchievementService
 from .models import Challenge, ChallengeJoined
-from .goals import Goal
-
-class ChallengeParticipantSerializer(serializers.ModelSerializer):
-    display_name = serializers.SerializerMethodField()
-
-    class Meta:
-        model = ChallengeJoined
-        fields = [
-            "id",
-            "user_id",          # 👈 React’te (you) için kullanacağız
-            "display_name",     # 👈 ekledik
-            "progress_value",
-            "progress_percent",
-            "is_completed",
-        ]
-
-    def get_display_name(self, obj):
-        user = obj.user
-        if not user:
-            return ""
-
-        full = f"{user.first_name} {user.last_name}".strip()
-        if full:
-            return full
-        if user.username:
-            return user.username
-        return user.email or ""
-
-
-    def get_progress_percent(self, obj):
-        return obj.progress_percent
-
+from .outbox import EventOutbox
+from .goals import Goal, goal_icon_for, local_today
+from .pagination import OptionalPageNumberPagination
+from .participants import ParticipantCounter
+from .realtime import get_broker
+from .leaderboards import LeaderboardService
 
 class ChallengeSerializer(serializers.ModelSerializer):
     participants = serializers.SerializerMethodField()
-    participants_detail = ChallengeParticipantSerializer(
-        source="challengejoined_set",
-        many=True,
-        read_only=True,
-    )    
+    # Katılımcı listesi burada yok (challenge başına binlerce satır olabilir);
+    # sayfalı liste /api/challenges/{id}/leaderboard/ üzerinden gelir
     days_left = serializers.SerializerMethodField()
     is_joined = serializers.SerializerMethodField()
 
@@ -77,8 +54,7 @@ class ChallengeSerializer(serializers.ModelSerializer):
             "progress_value",
             "progress_percent",
             "created_at",
-            "participants_detail",   # 🔹 YENİ
-
+            "finalized_at",
         ]
         read_only_fields = [
             "id",
@@ -88,7 +64,7 @@ class ChallengeSerializer(serializers.ModelSerializer):
             "progress_value",
             "progress_percent",
             "created_at",
-            "participants_detail",
+            "finalized_at",
         ]
 
     # ---- yardımcı metodlar ----
@@ -103,10 +79,13 @@ class ChallengeSerializer(serializers.ModelSerializer):
         user = self._get_user()
         if not user:
             return None
+        # ViewSet kullanıcının join kaydını önceden yükler (my_joins)
+        if hasattr(obj, "my_joins"):
+            return obj.my_joins[0] if obj.my_joins else None
         return ChallengeJoined.objects.filter(user=user, challenge=obj).first()
 
     def get_participants(self, obj):
-        return obj.challengejoined_set.count()
+        return obj.participant_count
 
     def get_days_left(self, obj):
         if not obj.due_date:
@@ -134,12 +113,14 @@ class ChallengeProgressSerializer(serializers.Serializer):
         """
         instance: ChallengeJoined
         - Kullanıcının challenge içindeki ilerlemesini günceller
-        - Kullanıcının aynı title/unit/target_value ile eşleşen Goal'lerini de günceller.
+        - Aynı transaction'da `challenge_progress` olayı yazar; bağlı Goal senkronu
+          ve badge kontrolü bu olaydan commit sonrası işlenir (fitware.outbox).
         """
         value = validated_data["progress_value"]
         challenge = instance.challenge
         user = instance.user
         old_completed = instance.is_completed
+        old_value = instance.progress_value
 
         # 1) ChallengeJoined'i güncelle
         instance.progress_value = value
@@ -149,41 +130,28 @@ class ChallengeProgressSerializer(serializers.Serializer):
             challenge.target_value and value >= challenge.target_value
         )
 
-        # DİKKAT: progress_percent artık modelde @property ise
-        # burada asla set ETMİYORUZ.
-        instance.save()
-
-        # 2) Badge evaluation - check for milestone badges when challenge is completed
-        if not old_completed and instance.is_completed:
-            from .badges import BadgeService
-            BadgeService.check_milestone_badges(user)
-
-        # 2) Bu kullanıcının eşleşen goal'lerini bul ve güncelle
-        try:
-            # 2.a) FK ile gerçekten bu challenge'a bağlı olan goal (challenge yaratıcısı için)
-            goal_fk = getattr(challenge, "goal", None)
-
-            # 2.b) Aynı title + unit + target_value olan goallar (challenge'a join eden kullanıcılar için)
-            goals_match = Goal.objects.filter(
-                user=user,
-                title=challenge.title,
-                unit=challenge.unit,
-                target_value=challenge.target_value,
-            )
-
-            # FK goal'ünü de ekle (kullanıcı aynıysa)
-            goals_to_update = list(goals_match)
-            if goal_fk and goal_fk.user_id == user.id and goal_fk not in goals_to_update:
-                goals_to_update.append(goal_fk)
-
-            for goal in goals_to_update:
-                goal.current_value = value
-                if challenge.target_value and value >= challenge.target_value:
-                    goal.is_completed = True
-                goal.save()
-
-        except Exception as e:
-            print("Sync goal progress from challenge failed:", e)
+        with transaction.atomic():
+            # DİKKAT: progress_percent artık modelde @property ise
+            # burada asla set ETMİYORUZ.
+            instance.save()
+
+            if old_completed != instance.is_completed:
+                AchievementService.challenges_completed([user.pk], sign=1 if instance.is_completed else -1)
+
+            # 2) Bağlı goal senkronu + badge: outbox olayı (fitware.outbox handler'ları)
+            EventOutbox.publish("challenge_progress", {
+                "joined_id": instance.pk,
+                "challenge_id": challenge.pk,
+                "goal_id": instance.goal_id,
+                "user_id": user.pk,
+                "value": value,
+                "reached": instance.is_completed,
+                "completed": instance.is_completed and not old_completed,
+            })
+
+        transaction.on_commit(lambda: LeaderboardService.invalidate(challenge.pk))
+        # Canlı yayın: bu challenge'ı dinleyenlere (birleştirilmiş) delta gönder
+        transaction.on_commit(lambda: get_broker().publish_progress(instance, old_value))
 
         return instance
 
@@ -192,6 +160,89 @@ class ChallengeViewSet(viewsets.ModelViewSet):
     queryset = Challenge.objects.all().order_by("-created_at")
     serializer_class = ChallengeSerializer
     permission_classes = [AllowAny]
+    pagination_class = OptionalPageNumberPagination
+    LEADERBOARD_PAGE_SIZE = 50
+    LEADERBOARD_MAX_PAGE_SIZE = 200
+    ORDERING_FIELDS = {
+        "participants": "participant_count",
+        "created_at": "created_at",
+        "due_date": "due_date",
+    }
+    ENDING_SOON_DAYS = 7
+
+    def get_queryset(self):
+        """
+        Liste başına sabit sorgu: katılımcı sayısı Challenge.participant_count sayacından
+        okunur, mevcut kullanıcının join kaydı ayrı tek sorguda yüklenir. Katılımcılar
+        yüklenmez; katılımcı sayısından bağımsızdır.
+        """
+        qs = Challenge.objects.order_by("-created_at")
+        user = self.request.user
+        if user.is_authenticated:
+            qs = qs.prefetch_related(
+                Prefetch(
+                    "challengejoined_set",
+                    queryset=ChallengeJoined.objects.filter(user=user),
+                    to_attr="my_joins",
+                )
+            )
+        return qs
+
+    def filter_queryset(self, queryset):
+        """
+        ?status=active|ended        (active: due_date bugün ya da sonrası, ya da bitiş tarihi yok)
+        ?ending_soon=true|<gün>     (bugünden itibaren N gün içinde bitenler, varsayılan 7)
+        ?unit=km  ?joined=true|false
+        ?ordering=-participants (popülerlik) | created_at | due_date, başında '-' ile azalan
+        """
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+        today = timezone.localdate()
+
+        status_param = params.get("status")
+        if status_param == "active":
+            queryset = queryset.filter(Q(due_date__gte=today) | Q(due_date__isnull=True))
+        elif status_param == "ended":
+            queryset = queryset.filter(due_date__lt=today)
+        elif status_param:
+            raise serializers.ValidationError({"status": "Must be 'active' or 'ended'."})
+
+        ending_soon = params.get("ending_soon")
+        if ending_soon:
+            if ending_soon.lower() == "true":
+                days = self.ENDING_SOON_DAYS
+            else:
+                try:
+                    days = int(ending_soon)
+                except ValueError:
+                    raise serializers.ValidationError({"ending_soon": "Must be 'true' or a number of days."})
+            queryset = queryset.filter(
+                due_date__gte=today, due_date__lte=today + datetime.timedelta(days=days)
+            )
+
+        unit = params.get("unit")
+        if unit:
+            queryset = queryset.filter(unit=unit)
+
+        joined = params.get("joined")
+        if joined:
+            if joined.lower() not in ("true", "false"):
+                raise serializers.ValidationError({"joined": "Must be 'true' or 'false'."})
+            user = self._get_effective_user(self.request)
+            my_challenges = ChallengeJoined.objects.filter(user=user).values("challenge_id")
+            if joined.lower() == "true":
+                queryset = queryset.filter(pk__in=my_challenges)
+            else:
+                queryset = queryset.exclude(pk__in=my_challenges)
+
+        ordering = params.get("ordering")
+        if ordering:
+            desc = ordering.startswith("-")
+            field = self.ORDERING_FIELDS.get(ordering.lstrip("-"))
+            if not field:
+                raise serializers.ValidationError({"ordering": f"Unknown ordering: {ordering}"})
+            queryset = queryset.order_by(f"{'-' if desc else ''}{field}", "-created_at")
+        return queryset
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -230,6 +281,8 @@ class ChallengeViewSet(viewsets.ModelViewSet):
             description=data.get("description", ""),
             target_value=data.get("target_value"),
             unit=data.get("unit") or "workouts",
+            # Goal tipi (ikon) challenge başlığından; ör. kilo verme challenge'ı vücut ağırlığı goal'ü olur
+            icon=goal_icon_for(data.get("title", ""), data.get("description", ""), data.get("unit") or "workouts"),
             # start_value ve current_value default 0, is_active default True
             is_completed=False,
         )
@@ -241,8 +294,13 @@ class ChallengeViewSet(viewsets.ModelViewSet):
             badge_name=badge_name,
         )
 
-        # 3) Oluşturan kişiyi otomatik olarak challenge'a join et
-        ChallengeJoined.objects.get_or_create(user=user, challenge=challenge)
+        # 3) Oluşturan kişiyi otomatik olarak challenge'a join et (goal'üne bağlı)
+        _, created = ChallengeJoined.objects.get_or_create(
+            user=user, challenge=challenge, defaults={"goal": goal}
+        )
+        if created:
+            ParticipantCounter.adjust(challenge.pk, 1)
+            challenge.participant_count += 1
 
     @action(detail=False, methods=["get"])
     def my(self, request):
@@ -253,7 +311,12 @@ class ChallengeViewSet(viewsets.ModelViewSet):
         if not user:
             return Response([], status=status.HTTP_200_OK)
 
-        qs = Challenge.objects.filter(challengejoined__user=user).distinct()
+        qs = self.filter_queryset(self.get_queryset()).filter(
+            pk__in=ChallengeJoined.objects.filter(user=user).values("challenge_id")
+        )
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -272,35 +335,46 @@ class ChallengeViewSet(viewsets.ModelViewSet):
             )
 
         challenge = self.get_object()
+        # Süresi dolmuş ama henüz finalize edilmemiş challenge da kapalı sayılır
+        if challenge.finalized_at or (challenge.due_date and challenge.due_date < local_today()):
+            return Response(
+                {"detail": "Challenge has ended"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         joined, created = ChallengeJoined.objects.get_or_create(
             user=user, challenge=challenge
         )
 
         if created:
+            ParticipantCounter.adjust(challenge.pk, 1)
+            transaction.on_commit(lambda: LeaderboardService.invalidate(challenge.pk))
+
             # Bu kullanıcı için aynı özelliklere sahip bir goal var mı?
-            existing_goal = Goal.objects.filter(
+            goal = Goal.objects.filter(
                 user=user,
                 title=challenge.title,
                 target_value=challenge.target_value,
                 unit=challenge.unit,
             ).first()
 
-            if not existing_goal and challenge.target_value is not None:
-                Goal.objects.create(
+            if not goal and challenge.target_value is not None:
+                goal = Goal.objects.create(
                     user=user,
                     title=challenge.title,
                     description=challenge.description or "",
                     target_value=challenge.target_value,
                     unit=challenge.unit or "workouts",
+                    icon=goal_icon_for(challenge.title, challenge.description or "", challenge.unit or "workouts"),
                     is_completed=False,
                 )
 
-        serializer = self.get_serializer(challenge)
-        return Response(serializer.data)
+            # Join kaydını goal'e bağla; progress senkronu bu bağı kullanır
+            if goal:
+                joined.goal = goal
+                joined.save(update_fields=["goal", "updated_at"])
 
-        challenge = self.get_object()
-        ChallengeJoined.objects.get_or_create(user=user, challenge=challenge)
-        serializer = self.get_serializer(challenge)
+        # Önceden yüklenen join/katılımcı bilgisi eskidi; tazeden oku
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data)
 
     @action(detail=True, methods=["post"])
@@ -316,8 +390,10 @@ class ChallengeViewSet(viewsets.ModelViewSet):
             )
 
         challenge = self.get_object()
+        # Sayaç post_delete sinyaliyle düşer (fitware.participants)
         ChallengeJoined.objects.filter(user=user, challenge=challenge).delete()
-        serializer = self.get_serializer(challenge)
+        transaction.on_commit(lambda: LeaderboardService.invalidate(challenge.pk))
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data)
 
     @action(detail=True, methods=["post"], url_path="update-progress")
@@ -334,14 +410,50 @@ class ChallengeViewSet(viewsets.ModelViewSet):
             )
 
         challenge = self.get_object()
-        joined, _ = ChallengeJoined.objects.get_or_create(
+        # Süresi dolmuş ama henüz finalize edilmemiş challenge da kapalı sayılır
+        if challenge.finalized_at or (challenge.due_date and challenge.due_date < local_today()):
+            return Response(
+                {"detail": "Challenge has ended"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        joined, created = ChallengeJoined.objects.get_or_create(
             user=user, challenge=challenge
         )
+        if created:
+            ParticipantCounter.adjust(challenge.pk, 1)
 
         serializer = ChallengeProgressSerializer(data=request.data)
         if serializer.is_valid():
             serializer.update(joined, serializer.validated_data)
-            out = self.get_serializer(challenge)
+            out = self.get_serializer(self.get_object())
             return Response(out.data)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=True, methods=["get"])
+    def leaderboard(self, request, pk=None):
+        """
+        GET /api/challenges/{id}/leaderboard/?page=1&page_size=50
+        Sıralı katılımcılar (progress azalan, eşitlikte önce ulaşan) + çağıranın kendi sırası
+        """
+        # get_object() kullanıcının join kaydını da yükler; burada sadece challenge lazım
+        challenge = get_object_or_404(Challenge, pk=pk)
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+            page_size = int(request.query_params.get("page_size", self.LEADERBOARD_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {"detail": "page and page_size must be integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        page_size = max(1, min(page_size, self.LEADERBOARD_MAX_PAGE_SIZE))
+
+        user = request.user if request.user.is_authenticated else None
+        return Response({
+            "challenge": challenge.pk,
+            "count": ChallengeJoined.objects.filter(challenge=challenge).count(),
+            "page": page,
+            "page_size": page_size,
+            "results": LeaderboardService.page(challenge, (page - 1) * page_size, page_size),
+            "me": LeaderboardService.rank_of(challenge, user) if user else None,
+        })
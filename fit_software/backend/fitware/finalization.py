@@ -0,0 +1,149 @@
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
+
+from .achievements import AchievementService
+from .goals import Goal, local_today
+from .models import Badge, Challenge, ChallengeJoined, ChallengeResult
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class ChallengeFinalizer:
+    """
+    due_date'i geçmiş challenge'ları toplu olarak kapatır. Her batch için
+    katılımcı sayısından bağımsız sabit sayıda sorgu çalışır:
+    tamamlananları işaretle → sıralamayı dondur → bağlı goal'leri pasifleştir
+    → badge'leri toplu ver → finalized_at işaretle.
+    """
+
+    BATCH_SIZE = 200
+    INSERT_CHUNK = 2000
+
+    @staticmethod
+    def expired(today):
+        return (
+            Challenge.objects
+            .filter(finalized_at__isnull=True, due_date__lt=today)
+            .order_by('due_date', 'pk')
+        )
+
+    @staticmethod
+    def run(today=None, batch_size=BATCH_SIZE):
+        """Tüm süresi dolmuş challenge'ları batch batch kapatır; toplam sayaçları döner"""
+        today = today or local_today()
+        totals = {'challenges': 0, 'results': 0, 'completed': 0, 'goals_deactivated': 0, 'badges': 0}
+        while True:
+            stats = ChallengeFinalizer.finalize_batch(today, batch_size)
+            if not stats['challenges']:
+                return totals
+            for key, value in stats.items():
+                totals[key] += value
+
+    @staticmethod
+    def finalize_batch(today, batch_size=BATCH_SIZE):
+        from .leaderboards import LeaderboardService
+
+        with transaction.atomic():
+            # SKIP LOCKED sıralı sorgunun kendisine uygulanır: başka bir finalizer'ın tuttuğu
+            # satırlar atlanır ve LIMIT sıradaki kilitsiz challenge'larla dolar
+            ids = list(
+                ChallengeFinalizer.expired(today)
+                .select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return {'challenges': 0, 'results': 0, 'completed': 0, 'goals_deactivated': 0, 'badges': 0}
+            now = timezone.now()
+            joins = ChallengeJoined.objects.filter(challenge_id__in=ids)
+
+            # 1) Hedefe ulaşmış ama işaretlenmemiş katılımlar (+ kullanıcı sayaçları)
+            reached = list(joins.filter(is_completed=False).filter(
+                Exists(Challenge.objects.filter(
+                    pk=OuterRef('challenge_id'),
+                    target_value__gt=0,
+                    target_value__lte=OuterRef('progress_value'),
+                ))
+            ).values_list('pk', 'user_id'))
+            completed = ChallengeJoined.objects.filter(pk__in=[pk for pk, _ in reached]).update(
+                is_completed=True, updated_at=now,
+            )
+            AchievementService.challenges_completed([user_id for _, user_id in reached])
+
+            # 2) Sıralama anlık görüntüsü (challenge başına Rank window)
+            ranked = (
+                joins.annotate(rank=Window(
+                    expression=Rank(),
+                    partition_by=[F('challenge_id')],
+                    order_by=LeaderboardService.ORDERING,
+                ))
+                .order_by()
+                .values_list('challenge_id', 'user_id', 'rank', 'progress_value', 'is_completed')
+            )
+            results = 0
+            chunk = []
+            for challenge_id, user_id, rank, value, done in ranked.iterator(chunk_size=ChallengeFinalizer.INSERT_CHUNK):
+                chunk.append(ChallengeResult(
+                    challenge_id=challenge_id, user_id=user_id, rank=rank,
+                    progress_value=value, is_completed=done,
+                ))
+                if len(chunk) >= ChallengeFinalizer.INSERT_CHUNK:
+                    results += len(ChallengeResult.objects.bulk_create(chunk, ignore_conflicts=True))
+                    chunk = []
+            if chunk:
+                results += len(ChallengeResult.objects.bulk_create(chunk, ignore_conflicts=True))
+
+            # 3) Challenge'a bağlı goal'ler artık takip edilmiyor
+            goals_deactivated = Goal.objects.filter(
+                Q(pk__in=joins.filter(goal__isnull=False).values('goal_id'))
+                | Q(pk__in=Challenge.objects.filter(pk__in=ids, goal__isnull=False).values('goal_id')),
+                is_active=True,
+            ).update(is_active=False, updated_at=now)
+
+            # 4) Badge'ler
+            badges = ChallengeFinalizer._award_badges(ids)
+
+            Challenge.objects.filter(pk__in=ids).update(finalized_at=now)
+            transaction.on_commit(lambda: LeaderboardService.invalidate(*ids))
+
+        return {
+            'challenges': len(ids),
+            'results': results,
+            'completed': completed,
+            'goals_deactivated': goals_deactivated,
+            'badges': badges,
+        }
+
+    @staticmethod
+    def _award_badges(challenge_ids):
+        """
+        Tamamlayanlara challenge badge'i + challenge sayısı kilometre taşları.
+        Mevcut badge'ler tek sorguda okunur, yeniler tek bulk INSERT ile yazılır.
+        """
+        from .badges import BadgeService
+
+        winners = list(
+            ChallengeJoined.objects
+            .filter(challenge_id__in=challenge_ids, is_completed=True)
+            .values_list('user_id', 'challenge__badge_name')
+        )
+        user_ids = {user_id for user_id, _ in winners}
+        if not user_ids:
+            return 0
+
+        wanted = {(user_id, badge) for user_id, badge in winners if badge}
+        rules = BadgeService.rules_for('challenges')
+        for user_id, counters in AchievementService.get_many(user_ids).items():
+            for rule in rules:
+                if counters.challenges_completed >= rule['threshold']:
+                    wanted.add((user_id, rule['name']))
+
+        existing = set(
+            Badge.objects.filter(user_id__in=user_ids, badge_type__in={b for _, b in wanted})
+            .values_list('user_id', 'badge_type')
+        )
+        new = [Badge(user_id=user_id, badge_type=badge) for user_id, badge in sorted(wanted - existing)]
+        Badge.objects.bulk_create(new, ignore_conflicts=True)
+        return len(new)
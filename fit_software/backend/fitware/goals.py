@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, DateTimeField, Exists, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Abs, Round
 from django.conf import settings
 from django.contrib.auth.models import User
 from rest_framework import serializers, viewsets, status
@@ -13,6 +15,19 @@ import json
 import requests
 import pytz
 
+from .pagination import OptionalPageNumberPagination
+from .throttling import SuggestRateThrottle
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def local_today():
+    """settings.TIME_ZONE (Europe/Istanbul) göre bugünün tarihi"""
+    local_tz = pytz.timezone(settings.TIME_ZONE)
+    return timezone.now().astimezone(local_tz).date()
+
+
 # =============================================================================
 # MODELS
 # =============================================================================
@@ -61,11 +76,20 @@ class Goal(models.Model):
         # Yeni kayıtsa ve start_value 0 ise, başlangıç değerini current yap
         if not self.pk and self.start_value == 0:
             self.start_value = self.current_value
+        self.clear_progress_annotations()
         super().save(*args, **kwargs)
 
+    def clear_progress_annotations(self):
+        # Değerler değişmiş olabilir; queryset annotation'ları artık geçersiz
+        self.__dict__.pop('annotated_progress', None)
+        self.__dict__.pop('annotated_remaining', None)
+
     @property
     def progress(self):
         """Hata korumalı progress hesabı"""
+        annotated = self.__dict__.get('annotated_progress')
+        if annotated is not None:
+            return annotated
         try:
             if self.start_value == self.target_value:
                 return 100.0 if self.current_value == self.target_value else 0.0
@@ -95,9 +119,240 @@ class Goal(models.Model):
 
     @property
     def remaining(self):
+        annotated = self.__dict__.get('annotated_remaining')
+        if annotated is not None:
+            return annotated
         return round(abs(self.target_value - self.current_value), 1)
 
 
+def progress_expression():
+    """Goal.progress property'sinin veritabanı karşılığı (sıralama / filtre için)"""
+    start, current, target = F('start_value'), F('current_value'), F('target_value')
+    return Case(
+        When(start_value=target, then=Case(
+            When(current_value=target, then=Value(100.0)),
+            default=Value(0.0),
+        )),
+        # Durum 1: Azaltma (Kilo verme vb.)
+        When(start_value__gt=target, current_value__lte=target, then=Value(100.0)),
+        When(start_value__gt=target, current_value__gte=start, then=Value(0.0)),
+        When(start_value__gt=target, then=Round((start - current) / (start - target) * 100, precision=1)),
+        # Durum 2: Artırma (Koşu, Ağırlık vb.)
+        When(current_value__gte=target, then=Value(100.0)),
+        When(current_value__lte=start, then=Value(0.0)),
+        default=Round((current - start) / (target - start) * 100, precision=1),
+        output_field=FloatField(),
+    )
+
+
+def annotate_progress(queryset):
+    return queryset.annotate(
+        annotated_progress=progress_expression(),
+        annotated_remaining=Round(Abs(F('target_value') - F('current_value')), precision=1),
+    )
+
+
+# Anahtar kelime → (icon, tip, birim, hedef, gün). Suggest fallback'i ve challenge'dan açılan
+# goal'lerin tipi buradan okunur; ikon goal tipidir (bkz. BodyMetricService.GOAL_TYPE_METRICS)
+GOAL_KEYWORDS = [
+    (("run", "jog", "5k", "10k"), ("🏃", "Running", "km", 5, 7)),
+    (("cycle", "bike", "cycling"), ("🚲", "Cycling", "km", 20, 7)),
+    (("swim", "swimming"), ("🏊", "Swimming", "laps", 20, 7)),
+    (("lose", "weight loss", "fat", "slim"), ("📉", "Weight Loss", "kg", 2, 14)),
+    (("gain", "bulk", "weight gain"), ("📈", "Weight Gain", "kg", 2, 30)),
+    (("calorie", "burn", "cardio"), ("🔥", "Cardio", "cal", 200, 7)),
+]
+DEFAULT_GOAL_SUGGESTION = ("💪", "Workout", "min", 30, 7)
+
+
+def classify_goal(text):
+    text = (text or "").lower()
+    for keywords, suggestion in GOAL_KEYWORDS:
+        if any(k in text for k in keywords):
+            return suggestion
+    return DEFAULT_GOAL_SUGGESTION
+
+
+def goal_icon_for(title, description, unit):
+    """Başlık/açıklamadan goal tipi (ikon); birimle uyuşmuyorsa varsayılan 🎯"""
+    from .body_metrics import BodyMetricService
+    icon, _, suggested_unit, _, _ = classify_goal(f"{title} {description}")
+    if unit == suggested_unit or BodyMetricService.goal_metric(icon, unit):
+        return icon
+    return Goal._meta.get_field('icon').default
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class GoalProgressService:
+    """Goal progress güncellemeleri ve yan etkileri (profil, challenge, badge, log)"""
+
+    LBS_TO_KG = 0.453592
+
+    @staticmethod
+    def apply(updates):
+        """
+        updates: [(goal, new_value), ...]
+        Tek transaction'da goal'ler bulk_update edilir, geçmiş tek INSERT ile yazılır ve
+        her goal için bir `goal_progress` olayı outbox'a düşer; profil ağırlığı, challenge
+        senkronu, badge ve aktivite logu bu olaylardan commit sonrası işlenir.
+        Yeni tamamlanan goal'leri döner.
+        """
+        from .achievements import AchievementService
+        from .body_metrics import BodyMetricService
+        from .outbox import EventOutbox
+        from .progress import ProgressHistory
+
+        if not updates:
+            return []
+
+        now = timezone.now()
+        goals = []
+        completed = []
+        events = []
+        body_points = []
+        for goal, value in updates:
+            goal.current_value = value
+            goal.updated_at = now
+            goal.clear_progress_annotations()
+            newly_completed = not goal.is_completed and value >= goal.target_value
+            if newly_completed:
+                goal.is_completed = True
+                completed.append(goal)
+            events.append({
+                'goal_id': goal.pk,
+                'user_id': goal.user_id,
+                'value': value,
+                'unit': goal.unit,
+                'completed': newly_completed,
+            })
+            point = BodyMetricService.from_goal(goal, value)
+            if point:
+                body_points.append((goal.user_id, *point))
+            goals.append(goal)
+
+        with transaction.atomic():
+            Goal.objects.bulk_update(goals, ['current_value', 'is_completed', 'updated_at'])
+            ProgressHistory.record_many([(g.pk, g.current_value) for g in goals], 'goal')
+            AchievementService.goals_completed([g.user_id for g in completed])
+            BodyMetricService.record_many(body_points, 'goal')
+            EventOutbox.publish_many('goal_progress', events)
+        return completed
+
+    @staticmethod
+    def sync_profile_weight(user_id, value, unit, as_of=None):
+        """
+        kg/lbs değerini profile (kg) yazar; sadece boy/kilo daha önce girilmişse.
+        as_of (olay zamanı) verilirse ağırlık o andan sonra değişmişse dokunulmaz.
+        """
+        from .models import Profile
+        weight_in_kg = value * GoalProgressService.LBS_TO_KG if unit == 'lbs' else value
+        profiles = Profile.objects.filter(user_id=user_id, weight__gt=0, height__gt=0)
+        if as_of is not None:
+            profiles = profiles.filter(Q(weight_updated_at__isnull=True) | Q(weight_updated_at__lte=as_of))
+        profiles.update(weight=weight_in_kg, weight_updated_at=as_of or timezone.now())
+
+    @staticmethod
+    def as_of(rows, key, now=None):
+        """
+        rows: {id: olay zamanı}. (Olaydan sonra güncellenmemiş satırlar filtresi,
+        updated_at'i olay zamanına çeken Case). Geciken ya da replay edilen olay yeni değeri ezmez.
+        """
+        now = now or timezone.now()
+        fresh = Q()
+        stamps = []
+        for pk, at in rows.items():
+            fresh |= Q(**{key: pk, 'updated_at__lte': at}) if at else Q(**{key: pk})
+            stamps.append(When(**{key: pk}, then=Value(at or now)))
+        return fresh, Case(*stamps, default=Value(now), output_field=DateTimeField())
+
+    @staticmethod
+    def sync_goals_from_challenges(payloads):
+        """
+        challenge_progress olaylarından bağlı goal'leri günceller (goal başına son değer).
+        Olaydan sonra değişmiş goal'ler atlanır. Tamamlanma koşullu UPDATE ile işaretlenir;
+        böylece tekrar işlenen olay sayacı şişirmez.
+        """
+        from .achievements import AchievementService
+        from .progress import ProgressHistory
+
+        latest = {p['goal_id']: p for p in payloads if p.get('goal_id')}
+        if not latest:
+            return
+        fresh, stamped = GoalProgressService.as_of({goal_id: p.get('at') for goal_id, p in latest.items()}, 'pk')
+        latest = {goal_id: latest[goal_id] for goal_id in Goal.objects.filter(fresh).values_list('pk', flat=True)}
+        if not latest:
+            return
+        Goal.objects.filter(pk__in=latest).update(
+            current_value=Case(
+                *[When(pk=goal_id, then=Value(float(p['value']))) for goal_id, p in latest.items()],
+                output_field=FloatField(),
+            ),
+            updated_at=stamped,
+        )
+        reached = Goal.objects.filter(
+            pk__in=[goal_id for goal_id, p in latest.items() if p.get('reached')], is_completed=False,
+        )
+        newly_completed = list(reached.values_list('pk', 'user_id'))
+        if newly_completed:
+            Goal.objects.filter(pk__in=[pk for pk, _ in newly_completed]).update(is_completed=True)
+            AchievementService.goals_completed([user_id for _, user_id in newly_completed])
+        ProgressHistory.record_many([(goal_id, p['value']) for goal_id, p in latest.items()], 'challenge')
+
+    @staticmethod
+    def sync_challenges(goal_ids, as_of=None):
+        """
+        Goal'lere bağlı ChallengeJoined kayıtlarını tek UPDATE ile günceller.
+        as_of: {goal_id: olay zamanı}; verilirse olaydan sonra değişmiş join'ler atlanır.
+        Kapanmış ya da süresi dolmuş challenge'lara dokunulmaz (update_progress ile aynı kural):
+        sonuçlar ve sayaçlar finalize sonrası değişmez.
+        """
+        from .achievements import AchievementService
+        from .leaderboards import LeaderboardService
+        from .models import Challenge, ChallengeJoined
+
+        def goal_value(ref):
+            return Subquery(Goal.objects.filter(pk=ref).values('current_value')[:1])
+
+        joins = (
+            ChallengeJoined.objects
+            .filter(goal_id__in=goal_ids, challenge__finalized_at__isnull=True)
+            .filter(Q(challenge__due_date__isnull=True) | Q(challenge__due_date__gte=local_today()))
+        )
+        stamped = timezone.now()
+        if as_of:
+            fresh, stamped = GoalProgressService.as_of(as_of, 'goal_id')
+            joins = joins.filter(fresh)
+        was_completed = dict(joins.values_list('pk', 'is_completed'))
+        joins = ChallengeJoined.objects.filter(pk__in=was_completed)
+        targeted = Challenge.objects.filter(pk=OuterRef('challenge_id'), target_value__gt=0)
+        # Pozitif hedefi olmayan challenge'larda tamamlanma bilgisi olduğu gibi kalır
+        joins.update(
+            progress_value=goal_value(OuterRef('goal_id')),
+            is_completed=Case(
+                When(
+                    Exists(targeted),
+                    then=Exists(targeted.filter(target_value__lte=goal_value(OuterRef(OuterRef('goal_id'))))),
+                ),
+                default=F('is_completed'),
+            ),
+            updated_at=stamped,
+        )
+        # Tamamlanma geçişleri sayaçlara; etkilenen challenge'ların top-N sıralaması eski
+        challenge_ids = set()
+        gained, lost = [], []
+        for pk, user_id, challenge_id, done in joins.values_list('pk', 'user_id', 'challenge_id', 'is_completed'):
+            challenge_ids.add(challenge_id)
+            if done != was_completed.get(pk, done):
+                (gained if done else lost).append(user_id)
+        AchievementService.challenges_completed(gained)
+        AchievementService.challenges_completed(lost, sign=-1)
+        if challenge_ids:
+            transaction.on_commit(lambda: LeaderboardService.invalidate(*challenge_ids))
+
+
 # =============================================================================
 # SERIALIZERS
 # =============================================================================
@@ -137,87 +392,17 @@ class GoalUpdateProgressSerializer(serializers.Serializer):
 
     def update(self, instance, validated_data):
         # instance: Goal
-        value = validated_data["current_value"]
-        old_completed = instance.is_completed
-
-        instance.current_value = value
-
-        # 1) Kilo hedefleri için profil ağırlığını güncelle
-        if instance.unit in ["kg", "lbs"]:
-            from .models import Profile
-
-            # lbs ise kg'ye çevir
-            if instance.unit == "kg":
-                weight_in_kg = value
-            else:
-                weight_in_kg = value * 0.453592
-
-            try:
-                profile = Profile.objects.get(user=instance.user)
-                # Only update if user has already set their weight/height
-                if profile.weight and profile.height:
-                    # Convert lbs to kg if needed
-                    weight_in_kg = instance.current_value
-                    if instance.unit == 'lbs':
-                        weight_in_kg = instance.current_value * 0.453592  # lbs to kg conversion
-                    
-                    profile.weight = weight_in_kg
-                    profile.save()
-            except Profile.DoesNotExist:
-                # Profile doesn't exist yet, skip weight update
-                pass
-        
-        # Check if goal is completed
-        if not instance.is_completed and instance.current_value >= instance.target_value:
-            instance.is_completed = True
-            # Award badge for milestone achievements
-            from .badges import BadgeService
-            BadgeService.check_milestone_badges(instance.user)
-            
-            # Log activity for completed goal
-            local_tz = pytz.timezone(settings.TIME_ZONE)
-            today = timezone.now().astimezone(local_tz).date()
-            ActivityLog.objects.get_or_create(
-                user=instance.user,
-                date=today,
-                action_type='goal_completed'
-            )
-        
-        instance.save()
-
-        # 2) Bu goal'e bağlı tüm challenge'ları bul ve goal sahibinin join kaydını güncelle
-        try:
-            from .models import Challenge, ChallengeJoined
-
-            user = instance.user
-
-            # 4.a) FK ile gerçekten bu goal'e bağlı olan challengelar
-            qs_fk = Challenge.objects.filter(goal=instance)
-
-            # 4.b) Her ihtimale karşı, aynı title + unit + target_value olanlar
-            qs_match = Challenge.objects.filter(
-                title=instance.title,
-                unit=instance.unit,
-                target_value=instance.target_value,
-            )
-
-            # İki queryset'i birleştir, tekrarları önlemek için distinct
-            qs_all = (qs_fk | qs_match).distinct()
+        GoalProgressService.apply([(instance, validated_data["current_value"])])
+        return instance
 
-            for ch in qs_all:
-                cj = ChallengeJoined.objects.filter(user=user, challenge=ch).first()
-                if not cj:
-                    continue
 
-                cj.progress_value = value
-                if ch.target_value:
-                    cj.is_completed = value >= ch.target_value
-                cj.save()
+class GoalBulkProgressItemSerializer(serializers.Serializer):
+    goal_id = serializers.IntegerField()
+    current_value = serializers.FloatField(min_value=0)
 
-        except Exception as e:
-            print("Sync challenge progress failed:", e)
 
-        return instance
+class GoalBulkUpdateProgressSerializer(serializers.Serializer):
+    updates = GoalBulkProgressItemSerializer(many=True, allow_empty=False, max_length=500)
 
 
 # =============================================================================
@@ -230,34 +415,76 @@ class GoalViewSet(viewsets.ModelViewSet):
 
     serializer_class = GoalSerializer
     permission_classes = [AllowAny]
+    pagination_class = OptionalPageNumberPagination
+
+    ORDERING_FIELDS = {
+        'progress': 'annotated_progress',
+        'remaining': 'annotated_remaining',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
 
     def get_queryset(self):
         if self.request.user.is_authenticated:
-            return Goal.objects.filter(user=self.request.user)
-        return Goal.objects.all()
+            qs = Goal.objects.filter(user=self.request.user)
+        else:
+            qs = Goal.objects.all()
+        return annotate_progress(qs)
+
+    def filter_queryset(self, queryset):
+        """
+        ?ordering=progress|-progress|remaining|created_at|...  (veritabanında sıralanır)
+        ?min_progress=80  ?max_progress=10
+        """
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+
+        for param, lookup in (('min_progress', 'gte'), ('max_progress', 'lte')):
+            raw = params.get(param)
+            if raw in (None, ''):
+                continue
+            try:
+                bound = float(raw)
+            except ValueError:
+                raise serializers.ValidationError({param: 'Must be a number.'})
+            queryset = queryset.filter(**{f'annotated_progress__{lookup}': bound})
+
+        ordering = params.get('ordering')
+        if ordering:
+            desc = ordering.startswith('-')
+            field = self.ORDERING_FIELDS.get(ordering.lstrip('-'))
+            if not field:
+                raise serializers.ValidationError({'ordering': f'Unknown ordering: {ordering}'})
+            queryset = queryset.order_by(f"{'-' if desc else ''}{field}", '-id')
+        return queryset
 
     # Log kaydetme yardımcısı
     def _log_activity(self, action_type):
         try:
+            from .activity import activity_recorder
             user = self.request.user if self.request.user.is_authenticated else User.objects.first()
-            local_tz = pytz.timezone(settings.TIME_ZONE)
-            today = timezone.now().astimezone(local_tz).date()
-            # Aynı kullanıcı, aynı gün, aynı action_type için tek kayıt (get_or_create)
-            ActivityLog.objects.get_or_create(
-                user=user,
-                date=today,
-                action_type=action_type
-            )
+            # Aynı kullanıcı, aynı gün, aynı action_type için tek kayıt (tamponlu, çakışmayı yok sayar)
+            activity_recorder.record(user, action_type)
         except Exception as e:
             print(f"Log Error: {e}")  # Log hatası olsa bile sistemi durdurma
 
     def perform_create(self, serializer):
+        from .achievements import AchievementService
         if self.request.user.is_authenticated:
-            serializer.save(user=self.request.user)
+            goal = serializer.save(user=self.request.user)
         else:
-            serializer.save(user=User.objects.first())
+            goal = serializer.save(user=User.objects.first())
+        if goal.is_completed:
+            AchievementService.goals_completed([goal.user_id])
         self._log_activity('create_goal')
 
+    def perform_update(self, serializer):
+        from .achievements import AchievementService
+        was_completed = serializer.instance.is_completed
+        goal = serializer.save()
+        if goal.is_completed != was_completed:
+            AchievementService.goals_completed([goal.user_id], sign=1 if goal.is_completed else -1)
+
     @action(detail=True, methods=['post'], url_path='update-progress')
     def update_progress(self, request, pk=None):
         goal = self.get_object()
@@ -268,9 +495,61 @@ class GoalViewSet(viewsets.ModelViewSet):
             return Response({'success': True, 'goal': GoalSerializer(goal).data})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], url_path='bulk-update-progress')
+    def bulk_update_progress(self, request):
+        """
+        POST /api/goals/bulk-update-progress/
+        Body: { "updates": [ {"goal_id": 1, "current_value": 12.5}, ... ] }
+        Hepsi tek transaction'da uygulanır; bilinmeyen goal varsa hiçbiri uygulanmaz.
+        """
+        serializer = GoalBulkUpdateProgressSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Aynı goal birden fazla geldiyse son değer geçerli
+        values = {item['goal_id']: item['current_value'] for item in serializer.validated_data['updates']}
+
+        with transaction.atomic():
+            goals = list(self.get_queryset().select_for_update().filter(pk__in=values))
+            missing = sorted(set(values) - {g.pk for g in goals})
+            if missing:
+                return Response(
+                    {'error': 'Unknown goal ids.', 'goal_ids': missing},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            completed = GoalProgressService.apply([(g, values[g.pk]) for g in goals])
+
+        self._log_activity('update_progress')
+        return Response({
+            'success': True,
+            'updated': len(goals),
+            'completed': [g.pk for g in completed],
+            'goals': GoalSerializer(goals, many=True).data,
+        })
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """
+        GET /api/goals/{id}/history/?from=2026-01-01&to=2026-02-01&bucket=auto&points=200
+        bucket: auto | raw | hour | day | week | month (gruplama sunucuda yapılır)
+        """
+        from .progress import ProgressHistory, parse_series_params
+
+        goal = self.get_object()
+        try:
+            start, end, bucket, max_points = parse_series_params(request.query_params)
+        except ValueError as e:
+            return Response({'error': f'Invalid parameter: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        bucket, points = ProgressHistory.series(goal, start, end, bucket, max_points)
+        return Response({'goal': goal.id, 'unit': goal.unit, 'bucket': bucket, 'points': points})
+
     @action(detail=False, methods=['get'])
     def active(self, request):
-        active_goals = self.get_queryset().filter(is_active=True, is_completed=False)
+        active_goals = self.filter_queryset(self.get_queryset()).filter(is_active=True, is_completed=False)
+        page = self.paginate_queryset(active_goals)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
         return Response(self.get_serializer(active_goals, many=True).data)
 
     @action(detail=False, methods=['post'])
@@ -278,16 +557,9 @@ class GoalViewSet(viewsets.ModelViewSet):
         """Log user's daily visit for streak tracking"""
         try:
             user = request.user if request.user.is_authenticated else User.objects.first()
-            # Convert UTC to local timezone
-            from django.conf import settings
-            local_tz = pytz.timezone(settings.TIME_ZONE)
-            today = timezone.now().astimezone(local_tz).date()
-            # Create activity log for today if it doesn't exist
-            activity_log, created = ActivityLog.objects.get_or_create(
-                user=user,
-                date=today,
-                action_type='visit'
-            )
+            today = local_today()
+            # Yanıt DB'deki gerçek duruma dayanır; streak post_save sinyaliyle güncellenir
+            _, created = ActivityLog.objects.get_or_create(user=user, date=today, action_type='visit')
             return Response({
                 'success': True,
                 'message': 'Visit logged' if created else 'Already logged today',
@@ -301,13 +573,44 @@ class GoalViewSet(viewsets.ModelViewSet):
         """Son 30+ günün aktivite loglarını getir"""
         try:
             user = request.user if request.user.is_authenticated else User.objects.first()
-            start_date = timezone.now().date() - datetime.timedelta(days=35)
+            start_date = local_today() - datetime.timedelta(days=35)
             logs = ActivityLog.objects.filter(user=user, date__gte=start_date).order_by('-date')
             return Response(ActivityLogSerializer(logs, many=True).data)
         except Exception:
             return Response([])  # Hata olursa boş liste dön
 
-    @action(detail=False, methods=['post'], url_path='suggest')
+    @action(detail=False, methods=['get'], url_path='activity-calendar')
+    def activity_calendar(self, request):
+        """
+        GET /api/goals/activity-calendar/?year=2026&encoding=bitmap|rle
+        Yıllık aktiviteyi action_type başına sıkıştırılmış dizi olarak döner.
+        """
+        from .activity import build_activity_calendar
+        try:
+            year = int(request.query_params.get('year') or local_today().year)
+        except (TypeError, ValueError):
+            return Response({'error': 'year must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1970 <= year <= 9998:
+            return Response({'error': 'year out of range'}, status=status.HTTP_400_BAD_REQUEST)
+
+        encoding = request.query_params.get('encoding') or 'bitmap'
+        if encoding not in ('bitmap', 'rle'):
+            return Response({'error': "encoding must be 'bitmap' or 'rle'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user if request.user.is_authenticated else User.objects.first()
+        return Response(build_activity_calendar(user, year, encoding))
+
+    @action(detail=False, methods=['get'])
+    def streak(self, request):
+        """Sunucu tarafında tutulan güncel / en uzun streak (tek satır okuma)"""
+        from .streaks import StreakService, StreakSerializer
+        user = request.user if request.user.is_authenticated else User.objects.first()
+        if not user:
+            return Response({'current_streak': 0, 'longest_streak': 0, 'last_active_date': None, 'active_today': False})
+        streak = StreakService.get_streak(user)
+        return Response(StreakSerializer(streak).data)
+
+    @action(detail=False, methods=['post'], url_path='suggest', throttle_classes=[SuggestRateThrottle])
     def suggest(self, request):
         """
         Returns a suggestion for a goal based on the title/description.
@@ -498,24 +801,7 @@ class GoalViewSet(viewsets.ModelViewSet):
             return Response(groq_result, status=status.HTTP_200_OK)
 
         # ---- Keyword-based suggestion (fallback) ----
-        icon = "💪"
-        gtype = "Workout"
-        unit = "min"
-        target_value = 30
-        timeline_days = 7
-
-        if any(k in combined for k in ["run", "jog", "5k", "10k"]):
-            icon, gtype, unit, target_value, timeline_days = "🏃", "Running", "km", 5, 7
-        elif any(k in combined for k in ["cycle", "bike", "cycling"]):
-            icon, gtype, unit, target_value, timeline_days = "🚲", "Cycling", "km", 20, 7
-        elif any(k in combined for k in ["swim", "swimming"]):
-            icon, gtype, unit, target_value, timeline_days = "🏊", "Swimming", "laps", 20, 7
-        elif any(k in combined for k in ["lose", "weight loss", "fat", "slim"]):
-            icon, gtype, unit, target_value, timeline_days = "📉", "Weight Loss", "kg", 2, 14
-        elif any(k in combined for k in ["gain", "bulk", "weight gain"]):
-            icon, gtype, unit, target_value, timeline_days = "📈", "Weight Gain", "kg", 2, 30
-        elif any(k in combined for k in ["calorie", "burn", "cardio"]):
-            icon, gtype, unit, target_value, timeline_days = "🔥", "Cardio", "cal", 200, 7
+        icon, gtype, unit, target_value, timeline_days = classify_goal(combined)
 
         return Response({
             "recognized": True,
@@ -535,12 +821,13 @@ class GoalViewSet(viewsets.ModelViewSet):
         from .badges import BadgeService, BadgeSerializer
         from .models import Badge
         try:
-            BadgeService.check_milestone_badges(request.user)
+            awarded = BadgeService.check_milestone_badges(request.user)
             badges = Badge.objects.filter(user=request.user).order_by('-awarded_at')
             return Response({
                 'success': True,
                 'message': 'Badges checked and awarded',
-                'badges': BadgeSerializer(badges, many=True).data
+                'badges': BadgeSerializer(badges, many=True).data,
+                'new_badges': [b.badge_type for b in awarded],
             })
         except Exception as e:
             return Response({
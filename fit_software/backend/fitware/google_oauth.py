@@ -0,0 +1,180 @@
+import logging
+import re
+import threading
+import time
+
+import jwt
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def http_session():
+    """
+    Süreç boyunca paylaşılan requests.Session: Google'a giden bağlantılar (TLS dahil)
+    havuzda tutulur ve yeniden kullanılır. Bağlantı hatalarında kısa tekrar denemesi yapar.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=getattr(settings, 'GOOGLE_HTTP_POOL_SIZE', 10),
+                    max_retries=Retry(total=2, connect=2, read=0, backoff_factor=0.2,
+                                      allowed_methods=None, status_forcelist=()),
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class GoogleAuthError(Exception):
+    """Callback'in kullanıcıya döneceği hata kodunu taşır (error=<code>)"""
+
+    def __init__(self, code, message=''):
+        super().__init__(message or code)
+        self.code = code
+
+
+class GoogleOIDC:
+    """
+    Authorization code'u token'a çevirir ve dönen id_token'ı Google'ın JWKS anahtarlarıyla
+    yerelde doğrular; userinfo isteğine gerek kalmaz.
+
+    JWKS, Cache-Control max-age (yoksa GOOGLE_JWKS_CACHE_SECONDS) süresince süreçte tutulur.
+    Bilinmeyen bir `kid` gelirse (anahtar rotasyonu) en fazla JWKS_MIN_REFRESH_SECONDS'ta
+    bir yeniden çekilir.
+    """
+
+    JWKS_MIN_REFRESH_SECONDS = 60
+    ALGORITHMS = ['RS256']
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+
+    # ---- token exchange ----
+    def exchange_code(self, code):
+        try:
+            response = http_session().post(
+                settings.GOOGLE_TOKEN_URL,
+                data={
+                    "code": code,
+                    "client_id": settings.GOOGLE_CLIENT_ID,
+                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                    "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+                    "grant_type": "authorization_code",
+                },
+                timeout=settings.GOOGLE_HTTP_TIMEOUT,
+            )
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as exc:
+            logger.warning("Google token exchange failed: %s", exc)
+            raise GoogleAuthError('token_exchange_failed') from exc
+
+    # ---- JWKS ----
+    def signing_key(self, kid):
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._expires_at:
+                self._refresh(now)
+            elif kid not in self._keys and now - self._fetched_at >= self.JWKS_MIN_REFRESH_SECONDS:
+                self._refresh(now)
+            key = self._keys.get(kid)
+        if key is None:
+            raise GoogleAuthError('invalid_id_token', f"Unknown signing key: {kid}")
+        return key
+
+    def _refresh(self, now):
+        try:
+            response = http_session().get(settings.GOOGLE_JWKS_URL, timeout=settings.GOOGLE_HTTP_TIMEOUT)
+            response.raise_for_status()
+            keys = {
+                jwk['kid']: jwt.PyJWK(jwk).key
+                for jwk in response.json().get('keys', [])
+                if jwk.get('kid') and jwk.get('use', 'sig') == 'sig'
+            }
+        except (requests.RequestException, ValueError, jwt.PyJWKError) as exc:
+            logger.warning("Fetching Google JWKS failed: %s", exc)
+            if not self._keys:
+                raise GoogleAuthError('jwks_fetch_failed') from exc
+            # Eski anahtarlarla devam; bir sonraki denemeyi biraz ertele
+            self._expires_at = now + self.JWKS_MIN_REFRESH_SECONDS
+            return
+        match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+        ttl = int(match.group(1)) if match else getattr(settings, 'GOOGLE_JWKS_CACHE_SECONDS', 3600)
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + ttl
+
+    def clear(self):
+        with self._lock:
+            self._keys = {}
+            self._expires_at = self._fetched_at = 0.0
+
+    # ---- id_token ----
+    def verify_id_token(self, id_token, nonce=None):
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except jwt.InvalidTokenError as exc:
+            raise GoogleAuthError('invalid_id_token', str(exc)) from exc
+        key = self.signing_key(header.get('kid'))
+        try:
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=self.ALGORITHMS,
+                audience=settings.GOOGLE_CLIENT_ID,
+                issuer=settings.GOOGLE_ISSUERS,
+                leeway=getattr(settings, 'GOOGLE_ID_TOKEN_LEEWAY', 30),
+                options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']},
+            )
+        except jwt.InvalidTokenError as exc:
+            logger.warning("Google id_token rejected: %s", exc)
+            raise GoogleAuthError('invalid_id_token', str(exc)) from exc
+
+        if nonce is not None and claims.get('nonce') != nonce:
+            raise GoogleAuthError('invalid_id_token', 'nonce mismatch')
+        if not claims.get('email'):
+            raise GoogleAuthError('missing_email')
+        if not claims.get('email_verified'):
+            raise GoogleAuthError('email_not_verified')
+        return claims
+
+    def authenticate(self, code, nonce=None):
+        """Code -> doğrulanmış id_token claim'leri (email, given_name, family_name, ...)"""
+        token_data = self.exchange_code(code)
+        id_token = token_data.get('id_token')
+        if not id_token:
+            logger.error("Google token response missing id_token: %s", sorted(token_data))
+            raise GoogleAuthError('missing_id_token')
+        return self.verify_id_token(id_token, nonce=nonce)
+
+    async def aauthenticate(self, code, nonce=None):
+        # HTTP çağrıları event loop dışında, paylaşılan havuzla yapılır (thread_sensitive=False:
+        # ASGI'de diğer istekler bu çağrıyı beklemez)
+        return await sync_to_async(self.authenticate, thread_sensitive=False)(code, nonce)
+
+
+google_oidc = GoogleOIDC()
@@ -0,0 +1,242 @@
+import datetime
+import logging
+import time
+
+from django.db import IntegrityError, OperationalError, connection, models, transaction
+from django.db.models import Avg, Count, F, Max
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class Job(models.Model):
+    """Veritabanında tutulan (harici broker gerektirmeyen) arka plan işi"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    # Aynı anahtarla bekleyen tek iş olur (örn. kullanıcı başına badge kontrolü)
+    dedup_key = models.CharField(max_length=100, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    # Büyük olan önce alınır
+    priority = models.SmallIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Son denemenin süresi (metrik)
+    duration_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=models.Q(status='pending'),
+                name='job_unique_pending_dedup_key',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                F('status'), F('priority').desc(), F('run_after'), F('id'),
+                name='job_claim_idx',
+            ),
+            models.Index(fields=['kind', 'status', 'finished_at'], name='job_kind_metrics_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class JobQueue:
+    """
+    Basit kalıcı iş kuyruğu. İşler commit sonrası süreç içi arka plan havuzunda
+    hemen denenir; süreç çökse bile kayıt kaldığı için `run_workers` komutu tamamlar.
+
+    Alma: PostgreSQL'de SELECT ... FOR UPDATE SKIP LOCKED (worker'lar birbirini beklemez),
+    SQLite'ta koşullu UPDATE. Hata alan iş max_attempts'a kadar üstel gecikmeyle yeniden denenir.
+    """
+
+    handlers = {}
+    CLAIM_ORDER = ['-priority', 'run_after', 'pk']
+    BACKOFF_BASE_SECONDS = 5
+    BACKOFF_MAX_SECONDS = 3600
+    # Bu süreden uzun 'running' kalan iş çöken bir worker'dan kalmıştır
+    STALE_AFTER = datetime.timedelta(minutes=15)
+    # SQLite'ta tablo kilidi çözülene kadar durum yazımı bu kadar kez denenir
+    LOCKED_WRITE_RETRIES = 8
+    PRUNE_BATCH_SIZE = 1000
+
+    @classmethod
+    def register(cls, kind, atomic=True):
+        """
+        atomic=False: handler dış transaction'a sarılmaz. Kendi batch'lerini ayrı ayrı commit
+        eden (ve arada ağ I/O yapan) işler için; aksi halde tüm batch'ler tek transaction olur.
+        """
+        def decorator(func):
+            func.job_atomic = atomic
+            cls.handlers[kind] = func
+            return func
+        return decorator
+
+    @staticmethod
+    def enqueue(kind, payload=None, dedup_key=None, priority=0, max_attempts=3, delay=None, kick=True):
+        """İşi kuyruğa ekler; aynı dedup_key ile bekleyen iş varsa yenisi yazılmaz"""
+        Job.objects.bulk_create(
+            [Job(
+                kind=kind, payload=payload or {}, dedup_key=dedup_key,
+                priority=priority, max_attempts=max_attempts,
+                run_after=timezone.now() + (delay or datetime.timedelta()),
+            )],
+            ignore_conflicts=True,
+        )
+        if kick and not delay:
+            from .background import run_in_background
+            run_in_background(JobQueue.run_pending)
+
+    @staticmethod
+    def claim(limit):
+        """Vadesi gelmiş en fazla `limit` işi 'running' yapar; alınan id'leri döner"""
+        now = timezone.now()
+        due = Job.objects.filter(status='pending', run_after__lte=now).order_by(*JobQueue.CLAIM_ORDER)
+        running = {'status': 'running', 'started_at': now, 'attempts': F('attempts') + 1}
+
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                ids = list(due.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+                Job.objects.filter(pk__in=ids).update(**running)
+            return ids
+
+        # SQLite: satır kilidi yok; işi sadece bir çalıştırıcı alabilsin diye koşullu UPDATE
+        claimed = []
+        try:
+            for pk in list(due.values_list('pk', flat=True)[:limit]):
+                if Job.objects.filter(pk=pk, status='pending').update(**running):
+                    claimed.append(pk)
+        except OperationalError as exc:
+            # Tablo başka bir çalıştırıcının yazması yüzünden kilitli; alınanlarla devam et
+            logger.debug("Job claim interrupted by a locked table: %s", exc)
+        return claimed
+
+    @staticmethod
+    def _write(func):
+        """
+        Durum yazımını çalıştırır. SQLite'ta (satır kilidi yok) başka bir çalıştırıcı tabloya
+        yazarken "database table is locked" alınabilir; yazım kısa, artan aralıklarla tekrarlanır.
+        """
+        for attempt in range(JobQueue.LOCKED_WRITE_RETRIES):
+            try:
+                return func()
+            except OperationalError as exc:
+                if connection.vendor != 'sqlite' or 'locked' not in str(exc) \
+                        or attempt == JobQueue.LOCKED_WRITE_RETRIES - 1:
+                    raise
+                time.sleep(0.01 * 2 ** attempt)
+
+    @staticmethod
+    def run_pending(limit=100):
+        """Vadesi gelmiş bekleyen işleri çalıştırır; çalıştırılan iş sayısını döner"""
+        ids = JobQueue.claim(limit)
+        for job in Job.objects.filter(pk__in=ids).order_by(*JobQueue.CLAIM_ORDER):
+            JobQueue._execute(job)
+        return len(ids)
+
+    @staticmethod
+    def backoff(attempts):
+        return datetime.timedelta(seconds=min(
+            JobQueue.BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), JobQueue.BACKOFF_MAX_SECONDS,
+        ))
+
+    @staticmethod
+    def _execute(job):
+        handler = JobQueue.handlers.get(job.kind)
+        started = time.monotonic()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job.kind}'")
+            if getattr(handler, 'job_atomic', True):
+                with transaction.atomic():
+                    handler(**job.payload)
+            else:
+                handler(**job.payload)
+        except Exception as exc:
+            duration_ms = int((time.monotonic() - started) * 1000)
+            JobQueue._failed(job, exc, retry=handler is not None, duration_ms=duration_ms)
+            return False
+        duration_ms = int((time.monotonic() - started) * 1000)
+        logger.info("Job %s done in %dms", job, duration_ms)
+        JobQueue._write(lambda: Job.objects.filter(pk=job.pk).update(
+            status='done', finished_at=timezone.now(), duration_ms=duration_ms,
+        ))
+        return True
+
+    @staticmethod
+    def _failed(job, exc, retry, duration_ms):
+        now = timezone.now()
+        if retry and job.attempts < job.max_attempts:
+            logger.warning("Job %s failed (attempt %s/%s), retrying: %s", job, job.attempts, job.max_attempts, exc)
+
+            def requeue():
+                with transaction.atomic():
+                    Job.objects.filter(pk=job.pk).update(
+                        status='pending', last_error=str(exc), duration_ms=duration_ms,
+                        run_after=now + JobQueue.backoff(job.attempts),
+                    )
+            try:
+                JobQueue._write(requeue)
+                return
+            except IntegrityError:
+                # Bu arada aynı dedup_key ile yeni bir iş kuyruğa girdi; o tekrar deneyecek
+                exc = f"{exc} (superseded by a newer pending job)"
+        else:
+            logger.warning("Job %s failed: %s", job, exc)
+        JobQueue._write(lambda: Job.objects.filter(pk=job.pk).update(
+            status='failed', last_error=str(exc), finished_at=now, duration_ms=duration_ms,
+        ))
+
+    @staticmethod
+    def requeue_stale(older_than=None):
+        """Çöken worker'dan 'running' kalmış işleri tekrar kuyruğa alır"""
+        cutoff = timezone.now() - (older_than or JobQueue.STALE_AFTER)
+        requeued = 0
+        for job in Job.objects.filter(status='running', started_at__lt=cutoff):
+            JobQueue._failed(job, "Worker lost while running", retry=True, duration_ms=None)
+            requeued += 1
+        return requeued
+
+    @staticmethod
+    def prune(before, batch_size=PRUNE_BATCH_SIZE):
+        """`before`'dan önce biten done/failed işleri pk sırasıyla batch batch siler; sayısını döner"""
+        finished = Job.objects.filter(status__in=('done', 'failed'), finished_at__lt=before).order_by('pk')
+        deleted = 0
+        while True:
+            ids = list(finished.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += Job.objects.filter(pk__in=ids).delete()[0]
+
+    @staticmethod
+    def metrics(since=None):
+        """Tür ve durum başına iş sayısı ile ortalama / en uzun süre (ms)"""
+        qs = Job.objects.all()
+        if since is not None:
+            qs = qs.filter(created_at__gte=since)
+        return list(
+            qs.order_by().values('kind', 'status')
+            .annotate(count=Count('id'), avg_ms=Avg('duration_ms'), max_ms=Max('duration_ms'))
+            .order_by('kind', 'status')
+        )
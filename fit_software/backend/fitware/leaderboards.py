@@ -0,0 +1,194 @@
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import F, Q, Window
+from django.db.models.functions import Rank
+
+from .models import ChallengeJoined, ChallengeResult
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+def display_name(user):
+    if not user:
+        return ""
+    full = f"{user.first_name} {user.last_name}".strip()
+    return full or user.username or user.email or ""
+
+
+class LeaderboardService:
+    """
+    Challenge sıralaması: progress_value azalan, eşitlikte önce ulaşan (updated_at artan).
+
+    İlk TOP_N satır ve kullanıcı sıraları cache'te, challenge başına bir sürüm numarasıyla
+    anahtarlanarak tutulur. Her yazma (commit sonrası) sürümü artırır; eski anahtarlar
+    okunmaz olur ve zaman aşımıyla düşer. Yerinde get → değiştir → set yapılmadığı için
+    eşzamanlı güncellemeler birbirini ezemez. Derin sayfalar window function ile DB'den okunur.
+
+    Sürüm artışı yalnız cache'i paylaşan süreçlerce görülür. Varsayılan LocMem cache süreç
+    içidir: diğer worker'lar eski top-N'i zaman aşımına kadar sunar. Bu yüzden LocMem'de
+    girdiler LEADERBOARD_LOCAL_CACHE_SECONDS kadar tutulur; çok süreçli kurulumda CACHES
+    paylaşılan bir backend'e (Redis) ayarlanmalı.
+    """
+
+    TOP_N = 100
+    CACHE_TIMEOUT = 300
+    ORDERING = [F("progress_value").desc(), F("updated_at").asc()]
+
+    # ---- cache ----
+    @staticmethod
+    def cache_timeout():
+        if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+            return getattr(settings, 'LEADERBOARD_LOCAL_CACHE_SECONDS', 5)
+        return LeaderboardService.CACHE_TIMEOUT
+
+    @staticmethod
+    def _version_key(challenge_id):
+        return f"leaderboard:version:{challenge_id}"
+
+    @staticmethod
+    def _version(challenge_id):
+        key = LeaderboardService._version_key(challenge_id)
+        version = cache.get(key)
+        if version is None:
+            # Sürüm anahtarı düşmüşse sıfırdan başlamak eski girdileri geri getirebilir
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key)
+        return version
+
+    @staticmethod
+    def _key(challenge_id, *parts):
+        version = LeaderboardService._version(challenge_id)
+        return ":".join(str(p) for p in ("leaderboard", challenge_id, version, *parts))
+
+    @staticmethod
+    def invalidate(*challenge_ids):
+        """Sürümü artırır; çağıranlar bunu commit sonrasına bırakır (transaction.on_commit)"""
+        for cid in challenge_ids:
+            key = LeaderboardService._version_key(cid)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), None)
+
+    @staticmethod
+    def _entry(cj, target_value, updated_at=None):
+        percent = 0
+        if target_value and target_value > 0:
+            percent = min(100, round(cj.progress_value / target_value * 100, 1))
+        return {
+            "user_id": cj.user_id,
+            "display_name": display_name(cj.user),
+            "progress_value": cj.progress_value,
+            "progress_percent": percent,
+            "is_completed": cj.is_completed,
+            "updated_at": cj.updated_at if updated_at is None else updated_at,
+        }
+
+    @staticmethod
+    def _sort_key(entry):
+        return (-entry["progress_value"], entry["updated_at"])
+
+    @staticmethod
+    def top(challenge):
+        """İlk TOP_N girdi (cache'ten; yoksa tek window sorgusuyla doldurulur)"""
+        key = LeaderboardService._key(challenge.pk, "top")
+        entries = cache.get(key)
+        if entries is None:
+            rows = LeaderboardService.ranked(challenge)[:LeaderboardService.TOP_N]
+            entries = [LeaderboardService._entry(cj, challenge.target_value) for cj in rows]
+            cache.set(key, entries, LeaderboardService.cache_timeout())
+        return entries
+
+    # ---- DB ----
+    @staticmethod
+    def ranked(challenge):
+        return (
+            ChallengeJoined.objects
+            .filter(challenge=challenge)
+            .select_related("user")
+            .annotate(rank=Window(expression=Rank(), order_by=LeaderboardService.ORDERING))
+            .order_by(*LeaderboardService.ORDERING)
+        )
+
+    @staticmethod
+    def page(challenge, offset, limit):
+        """[offset, offset+limit) aralığındaki sıralı girdiler"""
+        if challenge.finalized_at:
+            # Süresi dolmuş: dondurulmuş sonuçlar
+            rows = (
+                ChallengeResult.objects.filter(challenge=challenge)
+                .select_related("user")
+                .order_by("rank", "pk")[offset:offset + limit]
+            )
+            return [LeaderboardService._result_entry(r, challenge.target_value) for r in rows]
+
+        if offset + limit <= LeaderboardService.TOP_N:
+            entries = LeaderboardService.top(challenge)
+            entries = LeaderboardService._with_ranks(entries)
+            return entries[offset:offset + limit]
+
+        results = []
+        for cj in LeaderboardService.ranked(challenge)[offset:offset + limit]:
+            entry = LeaderboardService._entry(cj, challenge.target_value)
+            entry["rank"] = cj.rank
+            results.append(entry)
+        return results
+
+    @staticmethod
+    def _with_ranks(entries):
+        ranked = []
+        previous = None
+        for position, entry in enumerate(entries, start=1):
+            key = LeaderboardService._sort_key(entry)
+            rank = ranked[-1]["rank"] if key == previous else position
+            ranked.append({**entry, "rank": rank})
+            previous = key
+        return ranked
+
+    @staticmethod
+    def _result_entry(result, target_value):
+        entry = LeaderboardService._entry(result, target_value, updated_at=result.created_at)
+        entry["rank"] = result.rank
+        return entry
+
+    @staticmethod
+    def rank_of(challenge, user):
+        """
+        Kullanıcının sırası. Top-N içindeyse cache'teki listeden, değilse sürümlü cache'ten;
+        ikisi de yoksa önündekiler sayılır (indeks üzerinden COUNT) ve sonuç cache'lenir.
+        """
+        if challenge.finalized_at:
+            result = ChallengeResult.objects.filter(challenge=challenge, user=user).select_related("user").first()
+            return LeaderboardService._result_entry(result, challenge.target_value) if result else None
+
+        entries = LeaderboardService._with_ranks(LeaderboardService.top(challenge))
+        for entry in entries:
+            if entry["user_id"] == user.pk:
+                return entry
+        if len(entries) < LeaderboardService.TOP_N:
+            # Liste eksiksiz ve kullanıcı yok: katılmamış
+            return None
+
+        key = LeaderboardService._key(challenge.pk, "rank", user.pk)
+        entry = cache.get(key)
+        if entry is None:
+            entry = LeaderboardService._rank_from_db(challenge, user) or {}
+            cache.set(key, entry, LeaderboardService.cache_timeout())
+        return entry or None
+
+    @staticmethod
+    def _rank_from_db(challenge, user):
+        joined = ChallengeJoined.objects.filter(challenge=challenge, user=user).select_related("user").first()
+        if not joined:
+            return None
+        ahead = ChallengeJoined.objects.filter(challenge=challenge).filter(
+            Q(progress_value__gt=joined.progress_value)
+            | Q(progress_value=joined.progress_value, updated_at__lt=joined.updated_at)
+        ).count()
+        entry = LeaderboardService._entry(joined, challenge.target_value)
+        entry["rank"] = ahead + 1
+        return entry
@@ -0,0 +1,272 @@
+import datetime
+import logging
+import smtplib
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.signals import setting_changed
+from django.db import connection, models, transaction
+from django.db.models import F, Min, Q
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .jobs import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class OutgoingEmail(models.Model):
+    """Gönderilmeyi bekleyen e-posta. İstek sadece satırı yazar; gönderimi arka plan işi yapar."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    from_email = models.CharField(max_length=200, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at', 'id'], name='email_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class MailSender:
+    """
+    Süreç boyunca tek SMTP bağlantısını açık tutan gönderici.
+
+    - Bağlantı batch'ler arasında yeniden kullanılır; EMAIL_CONNECTION_IDLE_SECONDS
+      boyunca kullanılmazsa kapatılıp bir sonraki gönderimde yeniden açılır.
+    - Sunucu bağlantıyı düşürdüyse bir kez yeniden bağlanıp tekrar dener.
+    - EMAIL_RATE_PER_SECOND > 0 ise mesajlar bu hızı aşmayacak şekilde aralıklanır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self._last_used = 0.0
+        self._next_slot = 0.0
+
+    def send(self, messages):
+        """Mesajları sırayla gönderir; her mesaj için hata metnini (başarılıysa None) döner"""
+        errors = []
+        with self._lock:
+            for message in messages:
+                self._throttle()
+                errors.append(self._send_one(message))
+        return errors
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _send_one(self, message):
+        for retry in (True, False):
+            try:
+                self._open().send_messages([message])
+                self._last_used = time.monotonic()
+                return None
+            except smtplib.SMTPServerDisconnected as exc:
+                error = exc
+            except smtplib.SMTPException as exc:
+                # Alıcı reddi vb.: bağlantı sağlam, sadece bu mesaj başarısız
+                # (SMTPException da OSError alt sınıfı; önce yakalanmalı)
+                return str(exc) or exc.__class__.__name__
+            except OSError as exc:
+                error = exc
+            except Exception as exc:
+                return str(exc) or exc.__class__.__name__
+            # Bağlantı koptu / açılamadı; bir kez yeni bağlantıyla dene
+            self._close()
+            if not retry:
+                return str(error) or error.__class__.__name__
+
+    def _open(self):
+        idle = getattr(settings, 'EMAIL_CONNECTION_IDLE_SECONDS', 30)
+        if self._connection is not None and time.monotonic() - self._last_used > idle:
+            self._close()
+        if self._connection is None:
+            conn = get_connection(fail_silently=False)
+            conn.open()
+            self._connection = conn
+            self._last_used = time.monotonic()
+        return self._connection
+
+    def _close(self):
+        conn, self._connection = self._connection, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception as exc:
+                logger.debug("Error while closing mail connection: %s", exc)
+
+    def _throttle(self):
+        rate = getattr(settings, 'EMAIL_RATE_PER_SECOND', 0)
+        if rate <= 0:
+            return
+        now = time.monotonic()
+        if self._next_slot > now:
+            time.sleep(self._next_slot - now)
+            now = self._next_slot
+        self._next_slot = now + 1.0 / rate
+
+
+mail_sender = MailSender()
+
+
+@receiver(setting_changed)
+def reset_mail_connection(setting, **kwargs):
+    # override_settings ile backend / host değişirse eski bağlantı kullanılmasın
+    if setting.startswith('EMAIL_'):
+        mail_sender.close()
+
+
+class MailQueue:
+    """
+    E-postaları tabloya yazar ve gönderimi iş kuyruğuna bırakır; çağıran SMTP'yi beklemez.
+
+    Flush işi bekleyen e-postaları batch batch alır ve `mail_sender` üzerinden (tek
+    bağlantı, hız sınırıyla) gönderir. Hata alan e-posta MAX_ATTEMPTS'a kadar
+    üstel gecikmeyle yeniden denenir.
+
+    Claim ve sonuç güncellemesi her batch için ayrı, kısa transaction'larda commit olur;
+    SMTP süresince açık transaction / satır kilidi tutulmaz (flush dış transaction içinde
+    çağrılmamalı). Gönderilen ya da kalıcı olarak başarısız olan e-postanın gövdesi (ör.
+    şifre sıfırlama linki) silinir; eski kayıtlar `prune` (`prune_mail` komutu) ile temizlenir.
+    """
+
+    FLUSH_JOB = 'mail.flush'
+    MAX_ATTEMPTS = 5
+    BACKOFF_BASE_SECONDS = 30
+    # Bu süreden uzun 'sending' kalan e-posta çöken bir worker'dan kalmıştır
+    STALE_AFTER = datetime.timedelta(minutes=10)
+    PRUNE_BATCH_SIZE = 1000
+
+    @staticmethod
+    def queue(to, subject, body, from_email=None):
+        from_email = from_email or getattr(settings, 'DEFAULT_FROM_EMAIL', None) or 'no-reply@fitware.local'
+        OutgoingEmail.objects.create(to_email=to, subject=subject, body=body, from_email=from_email)
+        JobQueue.enqueue(MailQueue.FLUSH_JOB, dedup_key=MailQueue.FLUSH_JOB, priority=3)
+
+    @staticmethod
+    def claim(limit):
+        """En fazla `limit` e-postayı 'sending' yapar; alınan satırları döner"""
+        now = timezone.now()
+        due = (
+            OutgoingEmail.objects
+            .filter(
+                Q(status='pending', available_at__lte=now)
+                | Q(status='sending', claimed_at__lt=now - MailQueue.STALE_AFTER)
+            )
+            .order_by('pk')
+        )
+        sending = {'status': 'sending', 'claimed_at': now, 'attempts': F('attempts') + 1}
+
+        if connection.features.has_select_for_update_skip_locked:
+            with transaction.atomic():
+                ids = list(due.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+                OutgoingEmail.objects.filter(pk__in=ids).update(**sending)
+        else:
+            # SQLite: aynı satırı iki çalıştırıcı almasın diye koşullu UPDATE
+            ids = [
+                pk for pk in due.values_list('pk', flat=True)[:limit]
+                if due.filter(pk=pk).update(**sending)
+            ]
+        return list(OutgoingEmail.objects.filter(pk__in=ids).order_by('pk'))
+
+    @staticmethod
+    def flush(batch_size=None, max_batches=None):
+        """Bekleyen e-postaları gönderir; (gönderilen, hata alan) sayılarını döner"""
+        batch_size = batch_size or getattr(settings, 'EMAIL_BATCH_SIZE', 50)
+        sent = failed = batches = 0
+        while max_batches is None or batches < max_batches:
+            emails = MailQueue.claim(batch_size)
+            if not emails:
+                break
+            messages = [
+                EmailMessage(e.subject, e.body, e.from_email, [e.to_email])
+                for e in emails
+            ]
+            errors = mail_sender.send(messages)
+
+            now = timezone.now()
+            ok = [e.pk for e, error in zip(emails, errors) if error is None]
+            with transaction.atomic():
+                OutgoingEmail.objects.filter(pk__in=ok).update(status='sent', sent_at=now, last_error='', body='')
+                for email, error in zip(emails, errors):
+                    if error is None:
+                        continue
+                    logger.warning("Email #%s to %s failed (attempt %s): %s",
+                                   email.pk, email.to_email, email.attempts, error)
+                    retry = email.attempts < MailQueue.MAX_ATTEMPTS
+                    delay = MailQueue.BACKOFF_BASE_SECONDS * 2 ** (email.attempts - 1)
+                    OutgoingEmail.objects.filter(pk=email.pk).update(
+                        status='pending' if retry else 'failed',
+                        last_error=error,
+                        available_at=now + datetime.timedelta(seconds=delay),
+                        **({} if retry else {'body': ''}),
+                    )
+            sent += len(ok)
+            failed += len(emails) - len(ok)
+            batches += 1
+        return sent, failed
+
+    @staticmethod
+    def prune(before=None, batch_size=PRUNE_BATCH_SIZE):
+        """
+        `before`'dan (varsayılan EMAIL_RETENTION_DAYS gün önce) eski sent/failed kayıtları
+        pk sırasıyla batch batch siler; silinen sayısını döner
+        """
+        if before is None:
+            days = getattr(settings, 'EMAIL_RETENTION_DAYS', 30)
+            before = timezone.now() - datetime.timedelta(days=days)
+        old = OutgoingEmail.objects.filter(status__in=('sent', 'failed'), created_at__lt=before).order_by('pk')
+        deleted = 0
+        while True:
+            ids = list(old.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += OutgoingEmail.objects.filter(pk__in=ids).delete()[0]
+
+    @staticmethod
+    def next_retry_at():
+        return OutgoingEmail.objects.filter(status='pending').aggregate(at=Min('available_at'))['at']
+
+
+# =============================================================================
+# HANDLERS
+# =============================================================================
+
+@JobQueue.register(MailQueue.FLUSH_JOB, atomic=False)
+def flush_mail_job():
+    MailQueue.flush()
+    # Geri çekilen e-postalar için vadesi geldiğinde tekrar çalışacak iş planla
+    retry_at = MailQueue.next_retry_at()
+    if retry_at is not None:
+        JobQueue.enqueue(
+            MailQueue.FLUSH_JOB, dedup_key=MailQueue.FLUSH_JOB, priority=3,
+            delay=max(retry_at - timezone.now(), datetime.timedelta(seconds=1)),
+        )
@@ -0,0 +1,56 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import BasicAuthentication, SessionAuthentication, TokenAuthentication
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from fitware.authentication import RouteScopedAuthentication, user_cache
+
+
+class Command(BaseCommand):
+    help = 'Measures per-request authentication overhead: DRF default chain vs the cached JWT fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Authenticated requests per variant')
+        parser.add_argument('--path', default='/api/goals/', help='Request path used for the benchmark')
+
+    def handle(self, *args, **options):
+        n = options['requests']
+        variants = [
+            ('default chain (uncached JWT)', [SessionAuthentication, TokenAuthentication,
+                                              JWTAuthentication, BasicAuthentication]),
+            ('route-scoped cached JWT', [RouteScopedAuthentication]),
+        ]
+        # Geçici kullanıcı; ölçüm sonunda geri alınır
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench-auth', email='bench-auth@fitware.local')
+            header = f'Bearer {AccessToken.for_user(user)}'
+            factory = APIRequestFactory()
+            user_cache.clear()
+
+            for label, classes in variants:
+                elapsed, queries = self.run_variant(factory, options['path'], header, classes, n)
+                self.stdout.write(
+                    f"{label:<30} {elapsed / n * 1e6:8.1f} us/request  {queries / n:5.2f} queries/request"
+                )
+            transaction.set_rollback(True)
+        user_cache.clear()
+
+    @staticmethod
+    def run_variant(factory, path, header, classes, n):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            for _ in range(n):
+                request = Request(
+                    factory.get(path, HTTP_AUTHORIZATION=header),
+                    authenticators=[cls() for cls in classes],
+                )
+                assert request.user.is_authenticated
+            elapsed = time.perf_counter() - started
+        return elapsed, len(ctx.captured_queries)
@@ -0,0 +1,24 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from fitware.progress import ProgressHistory
+
+
+class Command(BaseCommand):
+    help = 'Compacts goal progress events older than N days into one point per goal per day'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Keep full resolution for the last N days')
+        parser.add_argument('--batch-size', type=int, default=500, help='Max rows deleted per statement')
+
+    def handle(self, *args, **options):
+        before = timezone.now() - datetime.timedelta(days=options['days'])
+        started = time.monotonic()
+        kept, deleted = ProgressHistory.compact(before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Compacted events before {before:%Y-%m-%d}: {kept} daily points, "
+            f"{deleted} events removed in {time.monotonic() - started:.2f}s"
+        ))
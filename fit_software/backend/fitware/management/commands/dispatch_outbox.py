@@ -0,0 +1,61 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from fitware.outbox import EventOutbox
+
+
+class Command(BaseCommand):
+    help = 'Dispatches pending outbox events to their handlers; --replay re-processes past events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=EventOutbox.BATCH_SIZE,
+                            help='Events handled per transaction')
+        parser.add_argument('--replay', action='store_true',
+                            help='Mark matching events as unprocessed before dispatching')
+        parser.add_argument('--since', help='With --replay: only events created at/after this date or datetime')
+        parser.add_argument('--topic', help='With --replay / --retry-dead: only this topic')
+        parser.add_argument('--handler',
+                            help='With --replay: re-run this handler (module.name) even where it already succeeded')
+        parser.add_argument('--dead', action='store_true',
+                            help='List events that exhausted their attempts and exit')
+        parser.add_argument('--retry-dead', action='store_true',
+                            help='Re-queue events that exhausted their attempts before dispatching')
+
+    def handle(self, *args, **options):
+        if options['dead']:
+            summary = EventOutbox.dead_summary()
+            for row in summary:
+                self.stdout.write(
+                    f"{row['topic']}: {row['count']} dead since {row['oldest']:%Y-%m-%d %H:%M} "
+                    f"(last error: {row['last_error'] or '-'})"
+                )
+            self.stdout.write(f"{sum(row['count'] for row in summary)} dead events")
+            return
+
+        if options['retry_dead']:
+            self.stdout.write(f"Re-queued {EventOutbox.retry_dead(topic=options['topic'])} dead events")
+
+        if options['replay']:
+            since = None
+            if options['since']:
+                since = parse_datetime(options['since'])
+                if since is None:
+                    day = parse_date(options['since'])
+                    if day is None:
+                        raise CommandError(f"Invalid --since value: {options['since']}")
+                    since = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+            replayed = EventOutbox.replay(since=since, topic=options['topic'], handler=options['handler'])
+            self.stdout.write(f"Marked {replayed} events for replay")
+
+        started = time.monotonic()
+        handled = EventOutbox.dispatch(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Dispatched {handled} events in {time.monotonic() - started:.2f}s"
+        ))
+        dead = EventOutbox.dead().count()
+        if dead:
+            self.stdout.write(self.style.WARNING(f"{dead} dead events; inspect with --dead"))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from fitware.finalization import ChallengeFinalizer
+
+
+class Command(BaseCommand):
+    help = 'Finalizes challenges whose due date has passed (run periodically, e.g. from cron every few minutes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=ChallengeFinalizer.BATCH_SIZE,
+                            help='Challenges finalized per transaction')
+        parser.add_argument('--today', help='Treat this date (YYYY-MM-DD) as today')
+
+    def handle(self, *args, **options):
+        today = parse_date(options['today']) if options['today'] else None
+        started = time.monotonic()
+        totals = ChallengeFinalizer.run(today=today, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Finalized {totals['challenges']} challenges: {totals['results']} results, "
+            f"{totals['completed']} completions, {totals['goals_deactivated']} goals deactivated, "
+            f"{totals['badges']} badges in {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,26 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from fitware.jobs import JobQueue
+
+
+class Command(BaseCommand):
+    help = 'Deletes finished (done / failed) background jobs older than the retention period (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Keep this many days of history (default: JOB_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=JobQueue.PRUNE_BATCH_SIZE,
+                            help='Rows deleted per query')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        days = options['days'] if options['days'] is not None else getattr(settings, 'JOB_RETENTION_DAYS', 7)
+        deleted = JobQueue.prune(timezone.now() - datetime.timedelta(days=days), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {deleted} jobs in {time.monotonic() - started:.2f}s"
+        ))
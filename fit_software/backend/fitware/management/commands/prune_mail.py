@@ -0,0 +1,27 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from fitware.mailer import MailQueue
+
+
+class Command(BaseCommand):
+    help = 'Deletes sent / failed queued emails older than the retention period (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Keep this many days of history (default: EMAIL_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=MailQueue.PRUNE_BATCH_SIZE,
+                            help='Rows deleted per query')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        before = None
+        if options['days'] is not None:
+            before = timezone.now() - datetime.timedelta(days=options['days'])
+        deleted = MailQueue.prune(before=before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {deleted} emails in {time.monotonic() - started:.2f}s"
+        ))
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from fitware.throttling import DatabaseBucketStore, get_store
+
+
+class Command(BaseCommand):
+    help = 'Deletes rate limit buckets that have refilled (run from cron with DatabaseBucketStore)'
+
+    def handle(self, *args, **options):
+        store = get_store()
+        if not isinstance(store, DatabaseBucketStore):
+            # Bellek içi bucket'lar süreç içinde, cache'tekiler timeout ile temizlenir
+            self.stdout.write(f"{store.__class__.__name__} expires buckets by itself; nothing to do")
+            return
+        started = time.monotonic()
+        deleted = store.prune()
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {deleted} buckets in {time.monotonic() - started:.2f}s"
+        ))
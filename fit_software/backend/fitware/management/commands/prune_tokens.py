@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from fitware.tokens import TokenPruner
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired outstanding / blacklisted refresh tokens in small batches (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=TokenPruner.BATCH_SIZE,
+                            help='Tokens deleted per transaction')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after N batches (the next run continues)')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between batches to spread the load')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        outstanding, blacklisted = TokenPruner.prune(
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {outstanding} outstanding and {blacklisted} blacklisted tokens "
+            f"in {time.monotonic() - started:.2f}s"
+        ))
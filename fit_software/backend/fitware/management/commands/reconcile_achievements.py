@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from fitware.achievements import AchievementService
+
+
+class Command(BaseCommand):
+    help = 'Recomputes per-user achievement counters from source tables and fixes any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='Only reconcile this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        changed = AchievementService.reconcile(options['users'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled achievement counters: {changed} rows changed in {time.monotonic() - started:.2f}s"
+        ))
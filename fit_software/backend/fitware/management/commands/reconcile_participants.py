@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from fitware.participants import ParticipantCounter
+
+
+class Command(BaseCommand):
+    help = 'Recomputes Challenge.participant_count from ChallengeJoined rows and fixes any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--challenge', type=int, action='append', dest='challenges',
+                            help='Only reconcile this challenge id (repeatable)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        changed = ParticipantCounter.reconcile(options['challenges'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled participant counters: {changed} challenges changed in {time.monotonic() - started:.2f}s"
+        ))
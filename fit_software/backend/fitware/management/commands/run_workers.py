@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from fitware.jobs import JobQueue
+
+
+class Command(BaseCommand):
+    help = 'Runs background job workers against the database queue (N threads claiming with SKIP LOCKED)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Number of worker threads')
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per worker pass')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds a worker waits when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+        parser.add_argument('--stats', action='store_true', help='Print per-kind job metrics and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._print_stats()
+            return
+
+        stop = threading.Event()
+        ran = [0]
+        lock = threading.Lock()
+
+        def worker():
+            while not stop.is_set():
+                close_old_connections()
+                try:
+                    count = JobQueue.run_pending(limit=options['batch_size'])
+                finally:
+                    close_old_connections()
+                with lock:
+                    ran[0] += count
+                if not count:
+                    if options['once']:
+                        return
+                    stop.wait(options['sleep'])
+
+        requeued = JobQueue.requeue_stale()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs")
+
+        started = time.monotonic()
+        concurrency = max(1, options['concurrency'])
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='fitware-worker') as pool:
+            futures = [pool.submit(worker) for _ in range(concurrency)]
+            try:
+                while not all(f.done() for f in futures):
+                    time.sleep(options['sleep'])
+                    if not options['once'] and JobQueue.requeue_stale():
+                        self.stdout.write("Requeued stale jobs")
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping workers...")
+                stop.set()
+            for future in futures:
+                future.result()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {ran[0]} jobs with {concurrency} workers in {time.monotonic() - started:.2f}s"
+        ))
+
+    def _print_stats(self):
+        for row in JobQueue.metrics():
+            avg = f"{row['avg_ms']:.0f}ms" if row['avg_ms'] is not None else "-"
+            longest = f"{row['max_ms']}ms" if row['max_ms'] is not None else "-"
+            self.stdout.write(f"{row['kind']:<30} {row['status']:<8} {row['count']:>6}  avg {avg}  max {longest}")
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0010_userstreak'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalProgressEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.FloatField()),
+                ('source', models.CharField(choices=[('goal', 'Goal update'), ('challenge', 'Challenge sync'), ('profile', 'Profile weight sync')], default='goal', max_length=20)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_daily', models.BooleanField(default=False)),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_events', to='fitware.goal')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['goal', 'recorded_at'], name='goalprogress_goal_time_idx')],
+            },
+        ),
+    ]
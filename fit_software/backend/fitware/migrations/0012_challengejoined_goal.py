@@ -0,0 +1,58 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def link_joined_goals(apps, schema_editor):
+    """Mevcut join kayıtlarını eski title + unit + target_value eşleşmesiyle goal'lere bağla"""
+    ChallengeJoined = apps.get_model('fitware', 'ChallengeJoined')
+    Goal = apps.get_model('fitware', 'Goal')
+
+    joins = (
+        ChallengeJoined.objects.filter(goal__isnull=True)
+        .select_related('challenge', 'challenge__goal')
+        .order_by('pk')
+    )
+    batch = []
+    for cj in joins.iterator(chunk_size=500):
+        ch = cj.challenge
+        goal_id = None
+        if ch.goal_id and ch.goal.user_id == cj.user_id:
+            goal_id = ch.goal_id
+        else:
+            goal_id = (
+                Goal.objects.filter(
+                    user_id=cj.user_id,
+                    title=ch.title,
+                    unit=ch.unit,
+                    target_value=ch.target_value,
+                )
+                .order_by('created_at')
+                .values_list('pk', flat=True)
+                .first()
+            )
+        if goal_id:
+            cj.goal_id = goal_id
+            batch.append(cj)
+        if len(batch) >= 500:
+            ChallengeJoined.objects.bulk_update(batch, ['goal'])
+            batch = []
+    if batch:
+        ChallengeJoined.objects.bulk_update(batch, ['goal'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0011_goalprogressevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challengejoined',
+            name='goal',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='challenge_joins', to='fitware.goal'),
+        ),
+        migrations.RunPython(link_joined_goals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('fitware', '0012_challengejoined_goal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BodyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('weight', 'Weight (kg)')], default='weight', max_length=20)),
+                ('value', models.FloatField()),
+                ('source', models.CharField(choices=[('profile', 'Profile update'), ('goal', 'Goal progress'), ('manual', 'Manual entry')], default='manual', max_length=20)),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='body_metrics', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'metric', 'recorded_at'], name='bodymetric_user_metric_idx')],
+            },
+        ),
+    ]
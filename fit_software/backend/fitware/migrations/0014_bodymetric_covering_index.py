@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0013_bodymetric'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='bodymetric',
+            name='bodymetric_user_metric_idx',
+        ),
+        migrations.AlterField(
+            model_name='bodymetric',
+            name='metric',
+            field=models.CharField(choices=[('weight', 'Weight (kg)'), ('body_fat', 'Body Fat %'), ('waist', 'Waist (cm)'), ('hips', 'Hips (cm)'), ('chest', 'Chest (cm)'), ('height', 'Height (cm)')], default='weight', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='bodymetric',
+            index=models.Index(fields=['user', 'metric', 'recorded_at', 'value'], name='bodymetric_covering_idx'),
+        ),
+    ]
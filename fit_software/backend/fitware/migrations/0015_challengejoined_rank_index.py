@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0014_bodymetric_covering_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='challengejoined',
+            index=models.Index(fields=['challenge', '-progress_value', 'updated_at'], name='challengejoined_rank_idx'),
+        ),
+    ]
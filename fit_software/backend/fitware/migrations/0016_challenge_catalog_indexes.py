@@ -0,0 +1,51 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_participant_counts(apps, schema_editor):
+    """participant_count'u mevcut join kayıtlarından tek UPDATE ile doldur"""
+    Challenge = apps.get_model('fitware', 'Challenge')
+    ChallengeJoined = apps.get_model('fitware', 'ChallengeJoined')
+    counts = (
+        ChallengeJoined.objects.filter(challenge_id=OuterRef('pk'))
+        .order_by()
+        .values('challenge_id')
+        .annotate(n=Count('id'))
+        .values('n')
+    )
+    Challenge.objects.update(participant_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0015_challengejoined_rank_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='challenge',
+            name='participant_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['-created_at'], name='challenge_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['due_date', '-created_at'], name='challenge_due_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['unit', 'due_date'], name='challenge_unit_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(fields=['-participant_count', '-created_at'], name='challenge_popular_idx'),
+        ),
+        migrations.RunPython(backfill_participant_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0016_challenge_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='goalprogressevent',
+            name='source',
+            field=models.CharField(choices=[('goal', 'Goal update'), ('challenge', 'Challenge sync'), ('profile', 'Profile weight sync'), ('workout', 'Workout completion')], default='goal', max_length=20),
+        ),
+    ]
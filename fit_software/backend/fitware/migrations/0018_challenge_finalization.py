@@ -0,0 +1,53 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('fitware', '0017_alter_goalprogressevent_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChallengeResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('progress_value', models.FloatField(default=0)),
+                ('is_completed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='challenge',
+            name='finalized_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='challenge',
+            index=models.Index(condition=models.Q(('finalized_at__isnull', True)), fields=['due_date'], name='challenge_pending_expiry_idx'),
+        ),
+        migrations.AddField(
+            model_name='challengeresult',
+            name='challenge',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='fitware.challenge'),
+        ),
+        migrations.AddField(
+            model_name='challengeresult',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='challenge_results', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='challengeresult',
+            index=models.Index(fields=['challenge', 'rank'], name='challengeresult_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='challengeresult',
+            constraint=models.UniqueConstraint(fields=('challenge', 'user'), name='challengeresult_unique_user'),
+        ),
+    ]
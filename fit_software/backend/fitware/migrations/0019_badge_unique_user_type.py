@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-19 06:00
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def dedupe_badges(apps, schema_editor):
+    """Kısıt eklenmeden önce aynı (user, badge_type) için sadece ilk verileni tut"""
+    Badge = apps.get_model('fitware', 'Badge')
+    duplicates = (
+        Badge.objects.values('user_id', 'badge_type')
+        .order_by()
+        .annotate(first_id=Min('id'), n=Count('id'))
+        .filter(n__gt=1)
+    )
+    for row in duplicates.iterator():
+        Badge.objects.filter(user_id=row['user_id'], badge_type=row['badge_type']).exclude(
+            id=row['first_id']
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0018_challenge_finalization'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_badges, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='badge',
+            constraint=models.UniqueConstraint(fields=('user', 'badge_type'), name='badge_unique_user_type'),
+        ),
+    ]
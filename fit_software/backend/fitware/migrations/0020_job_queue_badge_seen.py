@@ -0,0 +1,50 @@
+# Generated by Django 4.2.16 on 2026-10-19 06:04
+
+from django.db import migrations, models
+import django.utils.timezone
+from django.db.models import F
+
+
+def mark_existing_badges_seen(apps, schema_editor):
+    """Mevcut badge'ler kullanıcıya zaten gösterildi sayılır"""
+    Badge = apps.get_model('fitware', 'Badge')
+    Badge.objects.update(seen_at=F('awarded_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0019_badge_unique_user_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='badge',
+            name='seen_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('dedup_key', models.CharField(blank=True, max_length=100, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('dedup_key',), name='job_unique_pending_dedup_key'),
+        ),
+        migrations.RunPython(mark_existing_badges_seen, migrations.RunPython.noop),
+    ]
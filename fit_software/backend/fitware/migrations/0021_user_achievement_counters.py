@@ -0,0 +1,76 @@
+# Generated by Django 4.2.16 on 2026-10-19 06:09
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    """Mevcut kullanıcıların sayaçlarını kaynak tablolardan grup başına birer sorguyla doldur"""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Counters = apps.get_model('fitware', 'UserAchievementCounters')
+    Goal = apps.get_model('fitware', 'Goal')
+    ChallengeJoined = apps.get_model('fitware', 'ChallengeJoined')
+    WorkoutSession = apps.get_model('workouts', 'WorkoutSession')
+    WorkoutSet = apps.get_model('workouts', 'WorkoutSet')
+
+    def grouped(qs, user_field, **aggregates):
+        return {row.pop(user_field): row for row in qs.order_by().values(user_field).annotate(**aggregates)}
+
+    goals = grouped(Goal.objects.filter(is_completed=True), 'user_id', n=Count('id'))
+    challenges = grouped(ChallengeJoined.objects.filter(is_completed=True), 'user_id', n=Count('id'))
+    sessions = grouped(
+        WorkoutSession.objects.filter(is_completed=True), 'user_id',
+        n=Count('id'), minutes=Sum('duration_minutes'),
+    )
+    sets = grouped(
+        WorkoutSet.objects.filter(workout_exercise__workout__is_completed=True),
+        'workout_exercise__workout__user_id',
+        n=Count('id'), rep_count=Sum('reps'), volume=Sum(F('weight_kg') * F('reps')),
+    )
+    empty = {}
+    Counters.objects.bulk_create([
+        Counters(
+            user_id=user_id,
+            goals_completed=goals.get(user_id, empty).get('n') or 0,
+            challenges_completed=challenges.get(user_id, empty).get('n') or 0,
+            workouts_completed=sessions.get(user_id, empty).get('n') or 0,
+            total_duration_minutes=sessions.get(user_id, empty).get('minutes') or 0,
+            total_sets=sets.get(user_id, empty).get('n') or 0,
+            total_reps=sets.get(user_id, empty).get('rep_count') or 0,
+            total_volume_kg=sets.get(user_id, empty).get('volume') or 0,
+        )
+        for user_id in User.objects.values_list('pk', flat=True).iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('fitware', '0020_job_queue_badge_seen'),
+        ('workouts', '0005_workoutsession_progress_applied'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserAchievementCounters',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('goals_completed', models.IntegerField(default=0)),
+                ('challenges_completed', models.IntegerField(default=0)),
+                ('workouts_completed', models.IntegerField(default=0)),
+                ('total_duration_minutes', models.IntegerField(default=0)),
+                ('total_sets', models.IntegerField(default=0)),
+                ('total_reps', models.IntegerField(default=0)),
+                ('total_volume_kg', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='achievements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(models.OrderBy(models.F('workouts_completed'), descending=True), models.F('user'), name='achv_workouts_idx'), models.Index(models.OrderBy(models.F('goals_completed'), descending=True), models.F('user'), name='achv_goals_idx'), models.Index(models.OrderBy(models.F('challenges_completed'), descending=True), models.F('user'), name='achv_challenges_idx'), models.Index(models.OrderBy(models.F('total_volume_kg'), descending=True), models.F('user'), name='achv_volume_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.16 on 2026-10-19 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0021_user_achievement_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_status_run_after_idx',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='duration_ms',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='max_attempts',
+            field=models.PositiveIntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='priority',
+            field=models.SmallIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(models.F('status'), models.OrderBy(models.F('priority'), descending=True), models.F('run_after'), models.F('id'), name='job_claim_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['kind', 'status', 'finished_at'], name='job_kind_metrics_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0025_rate_limits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='delivered_to',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0026_outbox_delivered_to'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ratelimitbucket',
+            name='full_at',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+    ]
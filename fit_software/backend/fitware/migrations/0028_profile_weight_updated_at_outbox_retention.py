@@ -0,0 +1,22 @@
+# Generated by Django 4.2.16 on 2026-10-19 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fitware', '0027_rate_limit_bucket_full_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='weight_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['processed_at'], name='outbox_processed_idx'),
+        ),
+    ]
@@ -2,6 +2,16 @@ from django.db import models
 from django.contrib.auth.models import User
 
 from .goals import Goal
+from .streaks import UserStreak
+from .progress import GoalProgressEvent
+from .body_metrics import BodyMetric
+from .jobs import Job
+from .outbox import OutboxEvent
+from .achievements import UserAchievementCounters
+from .mailer import OutgoingEmail
+from .throttling import RateLimitBucket, RateLimitRule
+from . import activity  # noqa: F401  (request_finished -> ActivityLog flush)
+from . import participants  # noqa: F401  (ChallengeJoined post_delete -> participant_count)
 
 
 # PROFILE
@@ -19,6 +29,8 @@ class Profile(models.Model):
     )
     height = models.FloatField(help_text="Height in cm", null=True, blank=True)
     weight = models.FloatField(help_text="Weight in kg", null=True, blank=True)
+    # Ağırlığın son yazıldığı an (profil ya da goal senkronu); geciken olaylar eski değeri yazmasın
+    weight_updated_at = models.DateTimeField(null=True, blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
 
     def __str__(self):
@@ -74,6 +86,26 @@ class Challenge(models.Model):
         blank=True,
     )
 
+    # Join/leave ile F() üzerinden güncellenen sayaç; popülerlik sıralaması buradan okunur
+    participant_count = models.PositiveIntegerField(default=0)
+
+    # due_date geçip sonuçlar dondurulduğunda finalize_challenges komutu doldurur
+    finalized_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at"], name="challenge_created_idx"),
+            models.Index(fields=["due_date", "-created_at"], name="challenge_due_created_idx"),
+            models.Index(fields=["unit", "due_date"], name="challenge_unit_due_idx"),
+            models.Index(fields=["-participant_count", "-created_at"], name="challenge_popular_idx"),
+            # Sadece henüz finalize edilmemişler: süresi dolanlar bu küçük indeksten bulunur
+            models.Index(
+                fields=["due_date"],
+                name="challenge_pending_expiry_idx",
+                condition=models.Q(finalized_at__isnull=True),
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -94,8 +126,24 @@ class ChallengeJoined(models.Model):
     # 🔹 YENİ: bu kullanıcı challenge’ı bitirmiş mi?
     is_completed = models.BooleanField(default=False)
 
+    # Kullanıcının bu challenge için takip ettiği Goal (progress senkronu bu bağ üzerinden)
+    goal = models.ForeignKey(
+        Goal,
+        on_delete=models.SET_NULL,
+        related_name="challenge_joins",
+        null=True,
+        blank=True,
+    )
+
     class Meta:
         unique_together = ("user", "challenge")
+        indexes = [
+            # Leaderboard sıralaması ve "benden öndekiler" sayımı bu indeksten okunur
+            models.Index(
+                fields=["challenge", "-progress_value", "updated_at"],
+                name="challengejoined_rank_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} -> {self.challenge.title}"
@@ -110,6 +158,27 @@ class ChallengeJoined(models.Model):
         )
 
 
+#  CHALLENGE RESULT (süresi dolan challenge'ın dondurulmuş sıralaması)
+class ChallengeResult(models.Model):
+    challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name="results")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="challenge_results")
+    rank = models.PositiveIntegerField()
+    progress_value = models.FloatField(default=0)
+    is_completed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["challenge", "user"], name="challengeresult_unique_user"),
+        ]
+        indexes = [
+            models.Index(fields=["challenge", "rank"], name="challengeresult_rank_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.user.username} -> {self.challenge.title}"
+
+
 #  MOVEMENT 
 class Movement(models.Model):
     name = models.CharField(max_length=100)
@@ -143,6 +212,14 @@ class Badge(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     badge_type = models.CharField(max_length=100)
     awarded_at = models.DateTimeField(auto_now_add=True)
+    # Kullanıcıya gösterildiği an; boşsa /api/badges/new/ ile teslim edilmeyi bekler
+    seen_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # Eşzamanlı kontrollerde aynı badge iki kez verilmesin
+            models.UniqueConstraint(fields=["user", "badge_type"], name="badge_unique_user_type"),
+        ]
 
     def __str__(self):
         return f"{self.badge_type} - {self.user.username}"
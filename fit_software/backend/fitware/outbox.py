@@ -0,0 +1,353 @@
+import datetime
+import itertools
+import logging
+
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Max, Min
+from django.utils import timezone
+
+from .jobs import JobQueue
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class OutboxEvent(models.Model):
+    """
+    Domain olayı. Değişikliği yapan transaction içinde yazılır; böylece olay ya
+    değişiklikle birlikte kalıcı olur ya da hiç oluşmaz. Dispatcher işledikçe processed_at dolar.
+    """
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Olayı başarıyla işlemiş handler'lar: tekrar denemede / replay'de yeniden çağrılmazlar
+    delivered_to = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'],
+                condition=models.Q(processed_at__isnull=True),
+                name='outbox_unprocessed_idx',
+            ),
+            # prune_outbox taraması
+            models.Index(fields=['processed_at'], name='outbox_processed_idx'),
+            models.Index(fields=['topic', 'created_at'], name='outbox_topic_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} #{self.pk}"
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class EventOutbox:
+    """
+    Transactional outbox. `publish` olayı aynı transaction'da yazar ve commit sonrası
+    çalışacak tek bir dispatch işi kuyruğa atar. Dispatcher olayları id sırasıyla batch
+    batch okur; ardışık aynı topic'li olaylar tek grup olur ve her handler grubun payload
+    listesiyle bir kez çağrılır. Gruplar id sırasıyla işlenir, topic'ler arası sıra korunur.
+
+    Sıra garantisi yalnızca handler ve grup içindir: hata alan grup geri çekilirken sonraki
+    olaylar (aynı topic dahil) işlenmeye devam eder, yani tekrar denenen olay daha yeni
+    olaylardan sonra teslim edilebilir. Bu yüzden mutlak değer yazan handler'lar aşağıdaki
+    `at` kontrolüne dayanır; sıraya bağlı yeni handler'lar da aynı şeyi yapmalı.
+
+    Teslim handler başına kayıtlıdır (`delivered_to`): handler'ın yan etkileri ile kaydı
+    aynı savepoint'te commit olur. Hata alan grupta yalnızca başarısız handler'lar tekrar
+    denenir; replay de sadece olayı henüz işlememiş handler'ları çağırır (`handler=` verilirse
+    o handler'ın kaydı silinip yeniden çalıştırılır).
+
+    Handler'lara giden payload'lara olayın `event_id` ve `at` (created_at) değerleri eklenir.
+    Mutlak değer yazan handler'lar (goal / profil senkronu) `at`'ten sonra güncellenmiş
+    satırlara dokunmaz; geciken, tekrar denenen ya da replay edilen olay yeni değeri ezmez.
+
+    MAX_ATTEMPTS'a ulaşan olaylar "dead" sayılır ve bir daha alınmaz;
+    `dispatch_outbox --dead` ile listelenir, `--retry-dead` ile tekrar kuyruğa girer.
+    İşlenmiş olaylar OUTBOX_RETENTION_DAYS sonra `prune_outbox` ile silinir; replay bu
+    pencereyle sınırlıdır.
+    """
+
+    handlers = {}
+    BATCH_SIZE = 200
+    MAX_ATTEMPTS = 5
+    BACKOFF_BASE_SECONDS = 10
+    DISPATCH_JOB = 'outbox.dispatch'
+    PRUNE_BATCH_SIZE = 1000
+
+    @classmethod
+    def subscribe(cls, topic):
+        def decorator(func):
+            cls.handlers.setdefault(topic, []).append(func)
+            return func
+        return decorator
+
+    @staticmethod
+    def handler_key(handler):
+        return f"{handler.__module__}.{handler.__qualname__}"
+
+    @staticmethod
+    def publish(topic, payload):
+        EventOutbox.publish_many(topic, [payload])
+
+    @staticmethod
+    def publish_many(topic, payloads):
+        """Olayları tek INSERT ile yazar; dispatch işi tekilleştirilmiş olarak kuyruğa girer"""
+        if not payloads:
+            return
+        OutboxEvent.objects.bulk_create([OutboxEvent(topic=topic, payload=p) for p in payloads])
+        JobQueue.enqueue(EventOutbox.DISPATCH_JOB, dedup_key=EventOutbox.DISPATCH_JOB, priority=5)
+
+    @staticmethod
+    def pending():
+        return OutboxEvent.objects.filter(processed_at__isnull=True, attempts__lt=EventOutbox.MAX_ATTEMPTS)
+
+    @staticmethod
+    def dead():
+        return OutboxEvent.objects.filter(processed_at__isnull=True, attempts__gte=EventOutbox.MAX_ATTEMPTS)
+
+    @staticmethod
+    def next_retry_at():
+        return EventOutbox.pending().aggregate(at=Min('available_at'))['at']
+
+    @staticmethod
+    def dispatch(batch_size=BATCH_SIZE, max_batches=None):
+        """Bekleyen olayları batch batch işler; işlenen olay sayısını döner"""
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            handled = EventOutbox._dispatch_batch(batch_size)
+            if not handled:
+                return total
+            total += handled
+            batches += 1
+        return total
+
+    @staticmethod
+    def _dispatch_batch(batch_size):
+        now = timezone.now()
+        with transaction.atomic():
+            due = EventOutbox.pending().filter(available_at__lte=now).order_by('pk')
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            events = list(due[:batch_size])
+            if not events:
+                return 0
+
+            done = []
+            for topic, group in itertools.groupby(events, key=lambda e: e.topic):
+                group = list(group)
+                errors = EventOutbox._deliver(topic, group)
+                if not errors:
+                    done.extend(e.pk for e in group)
+                    continue
+                # Grup üstel gecikmeyle tekrar denenir; başarılı handler'lar tekrar çağrılmaz
+                attempts = max(e.attempts for e in group) + 1
+                delay = EventOutbox.BACKOFF_BASE_SECONDS * 2 ** min(attempts - 1, 10)
+                OutboxEvent.objects.filter(pk__in=[e.pk for e in group]).update(
+                    attempts=F('attempts') + 1,
+                    last_error='; '.join(errors),
+                    available_at=now + datetime.timedelta(seconds=delay),
+                )
+                if attempts >= EventOutbox.MAX_ATTEMPTS:
+                    logger.error("Outbox events %s (%s) gave up after %s attempts: %s",
+                                 [e.pk for e in group], topic, attempts, '; '.join(errors))
+            OutboxEvent.objects.filter(pk__in=done).update(processed_at=now)
+        return len(events)
+
+    @staticmethod
+    def _deliver(topic, events):
+        """
+        Topic'in handler'larını, olayı henüz işlememiş olanlar için çağırır. Başarılı handler'ın
+        teslim kaydı yan etkileriyle aynı savepoint'te yazılır. Hata mesajlarını döner.
+        """
+        errors = []
+        for handler in EventOutbox.handlers.get(topic, []):
+            key = EventOutbox.handler_key(handler)
+            pending = [e for e in events if key not in e.delivered_to]
+            if not pending:
+                continue
+            payloads = [dict(e.payload, event_id=e.pk, at=e.created_at) for e in pending]
+            try:
+                with transaction.atomic():
+                    handler(payloads)
+                    for event in pending:
+                        event.delivered_to = event.delivered_to + [key]
+                    OutboxEvent.objects.bulk_update(pending, ['delivered_to'])
+            except Exception as exc:
+                for event in pending:
+                    if key in event.delivered_to:
+                        event.delivered_to = [k for k in event.delivered_to if k != key]
+                logger.warning("Outbox handler %s failed for %s (%s events): %s",
+                               handler.__name__, topic, len(pending), exc)
+                errors.append(f"{handler.__name__}: {exc}")
+        return errors
+
+    @staticmethod
+    def replay(since=None, topic=None, handler=None):
+        """
+        Geçmiş olayları yeniden işlenecek şekilde işaretler; sayısını döner. Olayı zaten
+        işlemiş handler'lar atlanır; `handler` (modül.ad) verilirse o handler yeniden çalışır.
+        """
+        qs = OutboxEvent.objects.all()
+        if since is not None:
+            qs = qs.filter(created_at__gte=since)
+        if topic:
+            qs = qs.filter(topic=topic)
+        if handler:
+            changed = []
+            for event in qs.only('pk', 'delivered_to').iterator():
+                if handler in event.delivered_to:
+                    event.delivered_to = [k for k in event.delivered_to if k != handler]
+                    changed.append(event)
+            OutboxEvent.objects.bulk_update(changed, ['delivered_to'], batch_size=500)
+        return qs.update(processed_at=None, attempts=0, last_error='', available_at=timezone.now())
+
+    @staticmethod
+    def retry_dead(topic=None):
+        """Dead olayları tekrar kuyruğa alır; sayısını döner"""
+        qs = EventOutbox.dead()
+        if topic:
+            qs = qs.filter(topic=topic)
+        return qs.update(attempts=0, available_at=timezone.now())
+
+    @staticmethod
+    def prune(before, batch_size=PRUNE_BATCH_SIZE):
+        """`before`'dan önce işlenmiş olayları pk sırasıyla batch batch siler; sayısını döner"""
+        processed = OutboxEvent.objects.filter(processed_at__lt=before).order_by('pk')
+        deleted = 0
+        while True:
+            ids = list(processed.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += OutboxEvent.objects.filter(pk__in=ids).delete()[0]
+
+    @staticmethod
+    def dead_summary():
+        """Topic başına dead olay sayısı, en eskisi ve son hata"""
+        rows = (
+            EventOutbox.dead().order_by().values('topic')
+            .annotate(count=Count('id'), oldest=Min('created_at'), last_id=Max('id'))
+            .order_by('topic')
+        )
+        errors = dict(OutboxEvent.objects.filter(pk__in=[r['last_id'] for r in rows]).values_list('pk', 'last_error'))
+        return [{**row, 'last_error': errors.get(row.pop('last_id'), '')} for row in rows]
+
+
+# =============================================================================
+# HANDLERS
+# =============================================================================
+
+def _award_badges(user_ids):
+    from .badges import BadgeService
+    for user_id in user_ids:
+        BadgeService.check_milestone_badges(user_id)
+
+
+def _log_activity(user_ids, action_type):
+    from .activity import activity_recorder
+    for user_id in user_ids:
+        activity_recorder.record(user_id, action_type)
+    activity_recorder.flush()
+
+
+def _completed_users(payloads):
+    return {p['user_id'] for p in payloads if p.get('completed')}
+
+
+# ---- workout_completed: {session_id, user_id} ----
+@EventOutbox.subscribe('workout_completed')
+def apply_workout_progress(payloads):
+    from .workout_progress import WorkoutProgressFanout
+    for payload in payloads:
+        WorkoutProgressFanout.apply_session(payload['session_id'])
+
+
+@EventOutbox.subscribe('workout_completed')
+def award_workout_badges(payloads):
+    _award_badges({p['user_id'] for p in payloads})
+
+
+@EventOutbox.subscribe('workout_completed')
+def log_workout_activity(payloads):
+    _log_activity({p['user_id'] for p in payloads}, 'workout_completed')
+
+
+# ---- goal_progress: {goal_id, user_id, value, unit, completed} ----
+@EventOutbox.subscribe('goal_progress')
+def sync_goal_challenges(payloads):
+    from .goals import GoalProgressService
+    as_of = {p['goal_id']: p.get('at') for p in payloads}
+    GoalProgressService.sync_challenges(list(as_of), as_of=as_of)
+
+
+@EventOutbox.subscribe('goal_progress')
+def sync_goal_profile_weight(payloads):
+    from .body_metrics import BodyMetricService
+    from .goals import Goal, GoalProgressService
+    # Sadece vücut ağırlığı goal'leri (kg cinsinden kuvvet hedefi profili ezmez); kullanıcının son değeri geçerli
+    weight_goals = set(
+        Goal.objects.filter(BodyMetricService.goals_q('weight'), pk__in=[p['goal_id'] for p in payloads])
+        .values_list('pk', flat=True)
+    )
+    latest = {p['user_id']: p for p in payloads if p['goal_id'] in weight_goals}
+    if not latest:
+        return
+    # Olaydan sonra goal ya da profil ağırlığı yeniden değiştiyse eski değer yazılmaz
+    fresh, _ = GoalProgressService.as_of({p['goal_id']: p.get('at') for p in latest.values()}, 'pk')
+    fresh_goals = set(Goal.objects.filter(fresh).values_list('pk', flat=True))
+    for user_id, payload in latest.items():
+        if payload['goal_id'] in fresh_goals:
+            GoalProgressService.sync_profile_weight(user_id, payload['value'], payload['unit'], as_of=payload.get('at'))
+
+
+@EventOutbox.subscribe('goal_progress')
+def award_goal_badges(payloads):
+    _award_badges(_completed_users(payloads))
+
+
+@EventOutbox.subscribe('goal_progress')
+def log_goal_activity(payloads):
+    _log_activity(_completed_users(payloads), 'goal_completed')
+
+
+# ---- challenge_progress: {joined_id, challenge_id, goal_id, user_id, value, reached, completed} ----
+@EventOutbox.subscribe('challenge_progress')
+def sync_challenge_goals(payloads):
+    from .goals import GoalProgressService
+    GoalProgressService.sync_goals_from_challenges(payloads)
+
+
+@EventOutbox.subscribe('challenge_progress')
+def award_challenge_badges(payloads):
+    _award_badges(_completed_users(payloads))
+
+
+# ---- profile_weight_changed: {user_id, weight_kg} ----
+@EventOutbox.subscribe('profile_weight_changed')
+def sync_profile_weight_goals(payloads):
+    from .profile import sync_weight_to_goals
+    latest = {p['user_id']: p for p in payloads}
+    for user_id, payload in latest.items():
+        sync_weight_to_goals(user_id, payload['weight_kg'], as_of=payload.get('at'))
+
+
+# Dispatcher iş kuyruğu üzerinden çalışır (commit sonrası süreç içi havuz / run_workers)
+@JobQueue.register(EventOutbox.DISPATCH_JOB, atomic=False)
+def dispatch_outbox_job():
+    EventOutbox.dispatch()
+    # Geri çekilen olaylar için vadesi geldiğinde tekrar çalışacak iş planla
+    retry_at = EventOutbox.next_retry_at()
+    if retry_at is not None:
+        JobQueue.enqueue(
+            EventOutbox.DISPATCH_JOB, dedup_key=EventOutbox.DISPATCH_JOB, priority=5,
+            delay=max(retry_at - timezone.now(), datetime.timedelta(seconds=1)),
+        )
@@ -0,0 +1,49 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class ParticipantCounter:
+    """
+    Challenge.participant_count sayacı.
+
+    Join view'leri yeni katılımda artırır; her ChallengeJoined silinmesi (leave, kullanıcı
+    ya da goal cascade'i dahil) post_delete sinyaliyle düşer. Kalan kaymalar (ör. doğrudan
+    SQL ile yapılan değişiklikler) `reconcile_participants` komutuyla düzeltilir.
+    """
+
+    @staticmethod
+    def adjust(challenge_id, delta):
+        """Sayaç yarış koşulsuz F() ile güncellenir; sıfırın altına inmez"""
+        from .models import Challenge
+        if delta > 0:
+            Challenge.objects.filter(pk=challenge_id).update(participant_count=F('participant_count') + delta)
+        elif delta < 0:
+            Challenge.objects.filter(pk=challenge_id, participant_count__gte=-delta).update(
+                participant_count=F('participant_count') + delta
+            )
+
+    @staticmethod
+    def reconcile(challenge_ids=None):
+        """Sayacı gerçek katılımcı sayısıyla tek UPDATE'te eşitler; düzeltilen challenge sayısını döner"""
+        from .models import Challenge, ChallengeJoined
+        actual = Coalesce(Subquery(
+            ChallengeJoined.objects.filter(challenge=OuterRef('pk'))
+            .order_by().values('challenge').annotate(n=Count('pk')).values('n')
+        ), 0)
+        drifted = Challenge.objects.annotate(actual=actual).exclude(participant_count=F('actual'))
+        if challenge_ids:
+            drifted = drifted.filter(pk__in=challenge_ids)
+        ids = list(drifted.values_list('pk', flat=True))
+        if ids:
+            Challenge.objects.filter(pk__in=ids).update(participant_count=actual)
+        return len(ids)
+
+
+@receiver(post_delete, sender='fitware.ChallengeJoined')
+def discount_deleted_participant(sender, instance, **kwargs):
+    ParticipantCounter.adjust(instance.challenge_id, -1)
@@ -3,8 +3,48 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, FloatField, Value, When
+from django.utils import timezone
 from .models import Profile
-from .goals import Goal
+from .goals import Goal, GoalProgressService
+from .body_metrics import BodyMetricService
+from .progress import ProgressHistory
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+def sync_weight_to_goals(user_id, new_weight, as_of=None):
+    """
+    Profil ağırlığını (kg) aktif kg/lbs goal'lere tek UPDATE ile yayar
+    ve bir vücut ağırlığı noktası kaydeder. Goal sayısından bağımsız sabit sorgu.
+    `profile_weight_changed` olayının handler'ı (fitware.outbox); as_of olay zamanıdır,
+    o andan sonra güncellenmiş goal'lere dokunulmaz.
+    """
+    # Vücut ağırlığı goal'leri (Weight Loss / Gain tipi, kg/lbs); kg cinsinden kuvvet hedefleri hariç
+    weight_goals = Goal.objects.filter(
+        BodyMetricService.goals_q('weight'),
+        user_id=user_id,
+        is_active=True,
+    )
+    if as_of is not None:
+        weight_goals = weight_goals.filter(updated_at__lte=as_of)
+
+    weight_in_lbs = round(new_weight / GoalProgressService.LBS_TO_KG, 1)
+    updated = weight_goals.update(
+        current_value=Case(
+            When(unit='lbs', then=Value(weight_in_lbs)),
+            default=Value(new_weight),
+            output_field=FloatField(),
+        ),
+        updated_at=as_of or timezone.now(),
+    )
+    if updated:
+        # Damgalanan updated_at (as_of) filtreyi hâlâ sağlar; aynı satırlar okunur
+        ProgressHistory.record_many(weight_goals.values_list('id', 'current_value'), 'profile')
+
+    BodyMetricService.record(user_id, 'weight', new_weight, source='profile', recorded_at=as_of)
 
 # =============================================================================
 # SERIALIZERS
@@ -87,7 +127,8 @@ class ProfileViewSet(viewsets.ModelViewSet):
         # Create profile with current user
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(user=request.user)
+        profile = serializer.save(user=request.user)
+        self._record_body_metrics(profile, {'weight': None, 'height': None})
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
     
@@ -102,30 +143,31 @@ class ProfileViewSet(viewsets.ModelViewSet):
             return Response(None, status=status.HTTP_404_NOT_FOUND)
     
     def perform_update(self, serializer):
-        """Update profile and sync weight to related goals"""
+        """Update profile; weight changes reach goals through the outbox"""
+        from .outbox import EventOutbox
         old_weight = serializer.instance.weight
-        super().perform_update(serializer)
-        
-        # Check if weight was updated
-        new_weight = serializer.instance.weight
-        if old_weight != new_weight and new_weight is not None:
-            self._sync_weight_to_goals(serializer.instance.user, new_weight)
-    
-    def _sync_weight_to_goals(self, user, new_weight):
-        """Sync profile weight to active weight-related goals"""
-        # Weight-related units
-        weight_units = ['kg', 'lbs']
-        
-        # Update current_value for active goals with weight units
-        active_weight_goals = Goal.objects.filter(
-            user=user,
-            is_active=True,
-            unit__in=weight_units
-        )
-        
-        for goal in active_weight_goals:
-            goal.current_value = new_weight
-            goal.save()
+        old_height = serializer.instance.height
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+            # Check if weight was updated
+            new_weight = serializer.instance.weight
+            if old_weight != new_weight and new_weight is not None:
+                Profile.objects.filter(pk=serializer.instance.pk).update(weight_updated_at=timezone.now())
+                EventOutbox.publish('profile_weight_changed', {
+                    'user_id': serializer.instance.user_id,
+                    'weight_kg': new_weight,
+                })
+            self._record_body_metrics(serializer.instance, {'height': old_height})
+
+    def _record_body_metrics(self, profile, old_values):
+        """Değişen profil ölçülerini (weight/height) vücut ölçüsü serisine ekler"""
+        points = [
+            (profile.user_id, field, getattr(profile, field))
+            for field, old in old_values.items()
+            if getattr(profile, field) and getattr(profile, field) != old
+        ]
+        BodyMetricService.record_many(points, 'profile')
     
     def update(self, request, *args, **kwargs):
         """Update existing profile"""
@@ -0,0 +1,180 @@
+import datetime
+
+import pytz
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Avg, Count, Max, Min
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .goals import Goal
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class GoalProgressEvent(models.Model):
+    """Goal.current_value her değiştiğinde eklenen (append-only) geçmiş kaydı"""
+    SOURCE_CHOICES = [
+        ('goal', 'Goal update'),
+        ('challenge', 'Challenge sync'),
+        ('profile', 'Profile weight sync'),
+        ('workout', 'Workout completion'),
+    ]
+
+    goal = models.ForeignKey(Goal, on_delete=models.CASCADE, related_name='progress_events')
+    value = models.FloatField()
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='goal')
+    recorded_at = models.DateTimeField(default=timezone.now)
+    # Retention job'ının gün sonu noktasına indirdiği kayıtlar
+    is_daily = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['goal', 'recorded_at'], name='goalprogress_goal_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.goal_id}: {self.value} @ {self.recorded_at:%Y-%m-%d %H:%M}"
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+BUCKETS = {
+    'hour': (TruncHour, datetime.timedelta(hours=1)),
+    'day': (TruncDay, datetime.timedelta(days=1)),
+    'week': (TruncWeek, datetime.timedelta(weeks=1)),
+    'month': (TruncMonth, datetime.timedelta(days=31)),
+}
+DEFAULT_MAX_POINTS = 200
+
+
+def parse_series_params(params):
+    """
+    ?from=&to= (tarih ya da datetime), ?bucket=, ?points= → (start, end, bucket, max_points)
+    Hatalı parametrede ValueError fırlatır.
+    """
+    def parse_bound(name, end_of_day=False):
+        raw = params.get(name)
+        if not raw:
+            return None
+        value = parse_datetime(raw)
+        if value is None:
+            day = parse_date(raw)
+            if day is None:
+                raise ValueError(name)
+            value = datetime.datetime.combine(day, datetime.time.max if end_of_day else datetime.time.min)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+    start = parse_bound('from')
+    end = parse_bound('to', end_of_day=True)
+    try:
+        max_points = int(params.get('points') or DEFAULT_MAX_POINTS)
+    except ValueError:
+        raise ValueError('points')
+    bucket = params.get('bucket') or 'auto'
+    if bucket not in ('auto', 'raw', *BUCKETS):
+        raise ValueError('bucket')
+    return start, end, bucket, max(1, min(max_points, 1000))
+
+
+def bucketed_series(qs, bucket='auto', max_points=DEFAULT_MAX_POINTS):
+    """
+    recorded_at/value alanlı bir queryset'i örnekler. bucket='auto' ise nokta sayısı
+    max_points'i geçmeyecek en küçük aralık seçilir; gruplama veritabanında yapılır.
+    """
+    if bucket == 'auto':
+        bucket = _pick_bucket(qs, max_points)
+
+    if bucket == 'raw':
+        rows = qs.order_by('recorded_at').values_list('recorded_at', 'value')[:max_points]
+        points = [
+            {'t': t, 'value': v, 'min': v, 'max': v, 'count': 1}
+            for t, v in rows
+        ]
+        return bucket, points
+
+    trunc, _ = BUCKETS[bucket]
+    rows = (
+        qs.annotate(t=trunc('recorded_at'))
+        .values('t')
+        .annotate(avg=Avg('value'), low=Min('value'), high=Max('value'), n=Count('id'))
+        .order_by('t')
+    )
+    points = [
+        {'t': r['t'], 'value': round(r['avg'], 2), 'min': r['low'], 'max': r['high'], 'count': r['n']}
+        for r in rows
+    ]
+    return bucket, points
+
+
+def _pick_bucket(qs, max_points):
+    stats = qs.aggregate(n=Count('id'), first=Min('recorded_at'), last=Max('recorded_at'))
+    if stats['n'] <= max_points:
+        return 'raw'
+    span = stats['last'] - stats['first']
+    for name, (_, width) in BUCKETS.items():
+        if span / width <= max_points:
+            return name
+    return 'month'
+
+
+class ProgressHistory:
+    """Goal progress geçmişini yazma, örnekleme (downsampling) ve sıkıştırma"""
+
+    @staticmethod
+    def record(goal, value, source='goal'):
+        return GoalProgressEvent.objects.create(goal=goal, value=value, source=source)
+
+    @staticmethod
+    def record_many(goal_values, source):
+        """goal_values: [(goal_id, value), ...] → tek bulk INSERT"""
+        now = timezone.now()
+        GoalProgressEvent.objects.bulk_create([
+            GoalProgressEvent(goal_id=goal_id, value=value, source=source, recorded_at=now)
+            for goal_id, value in goal_values
+        ])
+
+    @staticmethod
+    def series(goal, start=None, end=None, bucket='auto', max_points=DEFAULT_MAX_POINTS):
+        qs = GoalProgressEvent.objects.filter(goal=goal)
+        if start:
+            qs = qs.filter(recorded_at__gte=start)
+        if end:
+            qs = qs.filter(recorded_at__lte=end)
+        return bucketed_series(qs, bucket, max_points)
+
+    @staticmethod
+    def compact(before, batch_size=500):
+        """
+        `before` tarihinden eski olayları (goal, yerel gün) başına tek noktaya indirir:
+        günün son değeri tutulur ve is_daily işaretlenir, diğerleri silinir.
+        """
+        local_tz = pytz.timezone(settings.TIME_ZONE)
+        old = GoalProgressEvent.objects.filter(recorded_at__lt=before, is_daily=False)
+        goal_ids = list(old.order_by().values_list('goal_id', flat=True).distinct())
+
+        kept = deleted = 0
+        for goal_id in goal_ids:
+            with transaction.atomic():
+                events = list(
+                    GoalProgressEvent.objects
+                    .filter(goal_id=goal_id, recorded_at__lt=before)
+                    .order_by('recorded_at', 'id')
+                    .values_list('id', 'recorded_at')
+                )
+                last_of_day = {}
+                for event_id, recorded_at in events:
+                    last_of_day[recorded_at.astimezone(local_tz).date()] = event_id
+                keep_ids = set(last_of_day.values())
+                drop_ids = [event_id for event_id, _ in events if event_id not in keep_ids]
+
+                kept += GoalProgressEvent.objects.filter(id__in=keep_ids, is_daily=False).update(is_daily=True)
+                for i in range(0, len(drop_ids), batch_size):
+                    deleted += GoalProgressEvent.objects.filter(id__in=drop_ids[i:i + batch_size]).delete()[0]
+        return kept, deleted
@@ -0,0 +1,331 @@
+import asyncio
+import io
+import json
+import re
+import threading
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class Subscription:
+    """Tek bir bağlantının mesaj kuyruğu; event loop dışından da güvenle beslenebilir"""
+
+    max_queue = 100
+
+    def __init__(self, backend, channel):
+        self.backend = backend
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+
+    def push(self, message):
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        # Yavaş istemci: en eski mesajı at, en güncelini tut
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class InProcessBackend:
+    """
+    Aynı süreçteki abonelere dağıtım. Çok süreçli dağıtım için aynı arayüzü
+    (subscribe / unsubscribe / publish) uygulayan bir backend REALTIME_BACKEND
+    ayarıyla takılabilir.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        sub = Subscription(self, channel)
+        with self._lock:
+            self._subscribers[channel].add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+    def publish(self, channel, message):
+        with self._lock:
+            subs = list(self._subscribers.get(channel, ()))
+        for sub in subs:
+            try:
+                sub.push(message)
+            except RuntimeError:
+                # Bağlantının event loop'u kapanmış
+                self.unsubscribe(sub)
+        return len(subs)
+
+
+# =============================================================================
+# BROKER
+# =============================================================================
+
+def challenge_channel(challenge_id):
+    return f"challenge:{challenge_id}"
+
+
+class ProgressBroker:
+    """
+    Challenge progress değişimlerini yayınlar. Aynı challenge için `interval`
+    saniye içinde gelen güncellemeler birleştirilir (kullanıcı başına son değer,
+    delta toplanır) ve tek mesaj olarak gönderilir. interval=0 ise anında yayınlar.
+    """
+
+    def __init__(self, backend=None, interval=None):
+        if backend is None:
+            backend = import_string(getattr(settings, 'REALTIME_BACKEND', 'fitware.realtime.InProcessBackend'))()
+        if interval is None:
+            interval = getattr(settings, 'REALTIME_COALESCE_SECONDS', 1.0)
+        self.backend = backend
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timers = {}
+
+    def publish_progress(self, joined, old_value):
+        from .leaderboards import display_name
+
+        challenge = joined.challenge
+        update = {
+            'user_id': joined.user_id,
+            'display_name': display_name(joined.user),
+            'progress_value': joined.progress_value,
+            'progress_percent': joined.progress_percent,
+            'is_completed': joined.is_completed,
+            'delta': joined.progress_value - (old_value or 0),
+        }
+
+        with self._lock:
+            updates = self._pending.setdefault(challenge.pk, {})
+            previous = updates.get(joined.user_id)
+            if previous:
+                update['delta'] += previous['delta']
+            updates[joined.user_id] = update
+
+            if self.interval <= 0:
+                schedule = False
+            else:
+                schedule = challenge.pk not in self._timers
+                if schedule:
+                    timer = threading.Timer(self.interval, self.flush, args=(challenge.pk,))
+                    timer.daemon = True
+                    self._timers[challenge.pk] = timer
+
+        if self.interval <= 0:
+            self.flush(challenge.pk)
+        elif schedule:
+            timer.start()
+
+    def flush(self, challenge_id=None):
+        """Bekleyen güncellemeleri yayınlar (challenge_id verilmezse hepsini)"""
+        with self._lock:
+            ids = [challenge_id] if challenge_id is not None else list(self._pending)
+            batches = []
+            for cid in ids:
+                timer = self._timers.pop(cid, None)
+                if timer and challenge_id is None:
+                    timer.cancel()
+                updates = self._pending.pop(cid, None)
+                if updates:
+                    batches.append((cid, list(updates.values())))
+
+        for cid, updates in batches:
+            self.backend.publish(challenge_channel(cid), {
+                'type': 'progress',
+                'challenge': cid,
+                'updates': updates,
+            })
+        return len(batches)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = ProgressBroker()
+    return _broker
+
+
+# =============================================================================
+# ASGI (SSE + WebSocket)
+# =============================================================================
+
+STREAM_PATH = re.compile(r'^/api/challenges/(?P<pk>\d+)/stream/?$')
+
+
+class ChallengeStreamApp:
+    """
+    /api/challenges/{id}/stream/ → challenge progress mesajları.
+    HTTP isteğine Server-Sent Events, WebSocket bağlantısına JSON text frame ile yanıt verir.
+    Bağlantı REST API gibi doğrulanır (401 / 4401); challenge yoksa 404 / 4404.
+    """
+
+    keepalive = 15
+
+    def __init__(self, broker=None):
+        self._broker = broker
+
+    @property
+    def broker(self):
+        return self._broker or get_broker()
+
+    @staticmethod
+    def matches(scope):
+        return scope['type'] in ('http', 'websocket') and STREAM_PATH.match(scope['path'])
+
+    async def __call__(self, scope, receive, send):
+        challenge_id = int(STREAM_PATH.match(scope['path']).group('pk'))
+        status = await sync_to_async(self.check_access)(scope, challenge_id)
+        if scope['type'] == 'websocket':
+            await self._serve_websocket(challenge_id, receive, send, status)
+        else:
+            await self._serve_sse(challenge_id, receive, send, status)
+
+    @staticmethod
+    def authenticate(scope):
+        """
+        REST API ile aynı doğrulama zinciri (RouteScopedAuthentication). Tarayıcıda
+        EventSource / WebSocket başlık gönderemediği için ?token=<access> da Bearer sayılır.
+        Doğrulanan kullanıcıyı ya da None döner.
+        """
+        from django.core.handlers.asgi import ASGIRequest
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework.request import Request
+
+        from .authentication import RouteScopedAuthentication
+
+        headers = list(scope.get('headers', []))
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        if token and not any(name == b'authorization' for name, _ in headers):
+            headers.append((b'authorization', f'Bearer {token[0]}'.encode()))
+        request = Request(ASGIRequest({**scope, 'method': 'GET', 'headers': headers}, io.BytesIO()))
+        try:
+            result = RouteScopedAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        return result[0] if result else None
+
+    @classmethod
+    def check_access(cls, scope, challenge_id):
+        """200, ya da 401 (doğrulanmamış) / 404 (challenge yok)"""
+        from .models import Challenge
+
+        user = cls.authenticate(scope)
+        if user is None or not user.is_authenticated:
+            return 401
+        if not Challenge.objects.filter(pk=challenge_id).exists():
+            return 404
+        return 200
+
+    @staticmethod
+    def _encode(message):
+        return json.dumps(message, cls=DjangoJSONEncoder)
+
+    async def _pump(self, challenge_id, receive, is_disconnect, emit, ping):
+        """Kanal mesajlarını istemciye aktarır; istemci ayrılınca abonelik kapanır"""
+        sub = self.broker.backend.subscribe(challenge_channel(challenge_id))
+
+        async def wait_disconnect():
+            while not is_disconnect(await receive()):
+                pass
+
+        watcher = asyncio.ensure_future(wait_disconnect())
+        try:
+            while not watcher.done():
+                getter = asyncio.ensure_future(sub.get())
+                done, _ = await asyncio.wait({getter, watcher}, timeout=self.keepalive,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    await emit(getter.result())
+                else:
+                    getter.cancel()
+                    if not watcher.done():
+                        await ping()
+        finally:
+            watcher.cancel()
+            sub.close()
+
+    async def _serve_sse(self, challenge_id, receive, send, status=200):
+        if status != 200:
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': [(b'content-type', b'application/json')],
+            })
+            detail = 'Authentication required.' if status == 401 else 'Not found.'
+            await send({'type': 'http.response.body', 'body': self._encode({'detail': detail}).encode()})
+            return
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+
+        async def body(chunk):
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+
+        async def emit(message):
+            await body(f"event: {message['type']}\ndata: {self._encode(message)}\n\n")
+
+        await body('retry: 3000\n\n')
+        await self._pump(
+            challenge_id, receive,
+            is_disconnect=lambda event: event['type'] == 'http.disconnect',
+            emit=emit,
+            ping=lambda: body(': ping\n\n'),
+        )
+
+    async def _serve_websocket(self, challenge_id, receive, send, status=200):
+        if (await receive())['type'] != 'websocket.connect':
+            return
+        await send({'type': 'websocket.accept'})
+        if status != 200:
+            # Kabulden sonra kapatılır ki istemci 4401 / 4404 kodunu görebilsin
+            await send({'type': 'websocket.close', 'code': 4000 + status})
+            return
+
+        async def emit(message):
+            await send({'type': 'websocket.send', 'text': self._encode(message)})
+
+        await self._pump(
+            challenge_id, receive,
+            is_disconnect=lambda event: event['type'] == 'websocket.disconnect',
+            emit=emit,
+            ping=lambda: emit({'type': 'ping'}),
+        )
+
+
+challenge_stream = ChallengeStreamApp()
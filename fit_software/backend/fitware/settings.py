@@ -151,17 +151,55 @@ MEDIA_ROOT = BASE_DIR / "media"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
+    # Zincir AUTHENTICATION_CHAIN'de; /api/ altındaki Bearer istekleri doğrudan JWT'ye gider
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.SessionAuthentication",
-        'rest_framework.authentication.TokenAuthentication',
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.BasicAuthentication",
+        "fitware.authentication.RouteScopedAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    # Önümüzdeki güvenilen reverse proxy sayısı. İstemci IP'si (rate limit) X-Forwarded-For'un
+    # sondan bu kadarıncı adresidir; 0 = REMOTE_ADDR. None bırakılırsa başlık istemciden
+    # geldiği gibi kullanılır ve IP bucket'ları atlatılabilir.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
 
+# --- Authentication (fitware/authentication.py) ---
+AUTHENTICATION_CHAIN = [
+    "rest_framework.authentication.SessionAuthentication",
+    'rest_framework.authentication.TokenAuthentication',
+    "fitware.authentication.CachedJWTAuthentication",
+    "rest_framework.authentication.BasicAuthentication",
+]
+AUTH_FAST_PATH_PREFIXES = ("/api/",)
+# JWT ile doğrulanan kullanıcı satırı süreç içinde bu kadar saniye önbellekte tutulur (0 = kapalı)
+AUTH_USER_CACHE_SECONDS = float(os.getenv("AUTH_USER_CACHE_SECONDS", "60"))
+
+# --- Cache ---
+# Leaderboard sürümleri, rate limit (CacheBucketStore) vb. için. Varsayılan LocMem süreç içidir:
+# birden çok worker/süreçle çalışırken REDIS_URL verilmeli, aksi halde her süreç kendi kopyasını
+# tutar (leaderboard bu durumda girdileri yalnız LEADERBOARD_LOCAL_CACHE_SECONDS saklar).
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+LEADERBOARD_LOCAL_CACHE_SECONDS = 5
+
+# --- Rate limiting (fitware/throttling.py) ---
+# Token bucket: "N/periyot" -> kapasite N, periyotta N jeton dolar. 'user' anahtarı
+# giriş yapılmamış uç noktalarda gönderilen e-postadır (login'de IP+e-posta; bkz.
+# AccountThrottleMixin). Admin'deki RateLimitRule kayıtları bu değerleri deploy gerektirmeden ezer.
+# DatabaseBucketStore kullanılıyorsa `prune_rate_limits` cron'dan çalıştırılmalı.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMITS = {
+    "login": {"ip": "20/min", "user": "5/min"},
+    "signup": {"ip": "10/hour"},
+    "password_reset": {"ip": "10/hour", "user": "3/hour"},
+    "ai_suggest": {"ip": "30/min", "user": "10/min"},
+}
+# Tek node: InProcessBucketStore; çok node: CacheBucketStore (paylaşılan cache) / DatabaseBucketStore
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "fitware.throttling.InProcessBucketStore")
+RATE_LIMIT_CACHE = "default"
+RATE_LIMIT_RULES_REFRESH_SECONDS = 30
 
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -194,6 +232,14 @@ GOOGLE_FRONTEND_REDIRECT = os.getenv(
     "GOOGLE_FRONTEND_REDIRECT",
     "http://localhost:5173/google-callback",
 )
+# Callback id_token'ı JWKS ile yerelde doğrular (fitware/google_oauth.py)
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+GOOGLE_JWKS_URL = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_ISSUERS = ("https://accounts.google.com", "accounts.google.com")
+GOOGLE_JWKS_CACHE_SECONDS = 3600
+GOOGLE_HTTP_TIMEOUT = float(os.getenv("GOOGLE_HTTP_TIMEOUT", "5"))
+# ASGI ile çalışırken callback'in async sürümü kullanılsın
+GOOGLE_OAUTH_ASYNC = os.getenv("GOOGLE_OAUTH_ASYNC", "false").lower() == "true"
 
 
 
@@ -208,5 +254,26 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+# Gönderim arka planda (fitware/mailer.py): tek SMTP bağlantısı batch'ler arasında açık kalır
+EMAIL_TIMEOUT = 10
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_RATE_PER_SECOND = float(os.getenv("EMAIL_RATE_PER_SECOND", "5"))
+EMAIL_CONNECTION_IDLE_SECONDS = float(os.getenv("EMAIL_CONNECTION_IDLE_SECONDS", "30"))
+# Gönderilen / başarısız kayıtlar bu süreden sonra `prune_mail` ile silinir
+EMAIL_RETENTION_DAYS = int(os.getenv("EMAIL_RETENTION_DAYS", "30"))
 
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
+
+# --- Realtime challenge progress (fitware/realtime.py) ---
+# Çok süreçli kurulumda aynı arayüzü uygulayan bir backend ile değiştirilebilir
+REALTIME_BACKEND = os.getenv("REALTIME_BACKEND", "fitware.realtime.InProcessBackend")
+# Aynı challenge için bu aralıkta gelen güncellemeler tek mesajda birleştirilir
+REALTIME_COALESCE_SECONDS = float(os.getenv("REALTIME_COALESCE_SECONDS", "1.0"))
+
+# --- Background tasks (fitware/background.py) ---
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "2"))
+BACKGROUND_TASKS_EAGER = os.getenv("BACKGROUND_TASKS_EAGER", "false").lower() == "true"
+# Biten (done/failed) Job kayıtları bu süreden sonra `prune_jobs` ile silinir
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+# İşlenmiş outbox olayları bu süreden sonra `prune_outbox` ile silinir (replay penceresi)
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "14"))
@@ -11,6 +11,16 @@ DATABASES = {
 
 # Testlerde mail gerçekten gitmesin
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+EMAIL_RATE_PER_SECOND = 0
 
 # (İstersen) debug açık kalsın
 DEBUG = True
+
+# Testlerde progress mesajları zamanlayıcı beklemeden yayınlansın
+REALTIME_COALESCE_SECONDS = 0
+
+# Testler aynı IP'den çok sayıda login/signup yapıyor; throttle testleri ayrıca açar
+RATE_LIMIT_ENABLED = False
+
+# Arka plan işleri commit sonrası aynı thread'de çalışsın
+BACKGROUND_TASKS_EAGER = True
@@ -0,0 +1,134 @@
+import datetime
+
+from django.db import models, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.contrib.auth.models import User
+from rest_framework import serializers
+
+from .goals import ActivityLog, local_today
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class UserStreak(models.Model):
+    """Kullanıcının güncel ve en uzun streak değerlerini tutan önbellek tablosu"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='streak')
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username}: {self.current_streak} (best {self.longest_streak})"
+
+    def current_as_of(self, today):
+        """Son aktif gün bugün ya da dün değilse zincir kırılmıştır"""
+        if not self.last_active_date or (today - self.last_active_date).days > 1:
+            return 0
+        return self.current_streak
+
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class StreakService:
+    """
+    ActivityLog yazıldıkça streak değerlerini artımlı olarak günceller.
+    Günler ActivityLog.date üzerinden (settings.TIME_ZONE yerel günü) hesaplanır.
+    """
+
+    @staticmethod
+    def record_activity(user_id, day):
+        """Bir kullanıcının `day` gününde aktif olduğunu işler (idempotent)"""
+        with transaction.atomic():
+            streak, created = UserStreak.objects.select_for_update().get_or_create(user_id=user_id)
+            if created:
+                # İlk kez: geçmiş logları da hesaba kat
+                StreakService._rebuild(streak)
+                return streak
+
+            last = streak.last_active_date
+            if last is not None and day < last:
+                # Geçmişe dönük kayıt (backfill) - nadir, tamamını yeniden hesapla
+                StreakService._rebuild(streak)
+                return streak
+
+            if last == day:
+                return streak
+            if last is not None and day - last == datetime.timedelta(days=1):
+                streak.current_streak += 1
+            else:
+                streak.current_streak = 1
+            streak.last_active_date = day
+            streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+            streak.save(update_fields=['current_streak', 'longest_streak', 'last_active_date', 'updated_at'])
+        return streak
+
+    @staticmethod
+    def get_streak(user):
+        """Tek satır okuma; kayıt yoksa geçmişten bir kez oluşturulur"""
+        streak = UserStreak.objects.filter(user=user).first()
+        if streak is None:
+            streak = StreakService.rebuild(user.id)
+        return streak
+
+    @staticmethod
+    def rebuild(user_id):
+        with transaction.atomic():
+            streak, _ = UserStreak.objects.select_for_update().get_or_create(user_id=user_id)
+            StreakService._rebuild(streak)
+        return streak
+
+    @staticmethod
+    def _rebuild(streak):
+        days = (
+            ActivityLog.objects.filter(user_id=streak.user_id)
+            .order_by('date')
+            .values_list('date', flat=True)
+            .distinct()
+        )
+        current = longest = 0
+        last = None
+        for day in days:
+            if last is not None and day - last == datetime.timedelta(days=1):
+                current += 1
+            else:
+                current = 1
+            longest = max(longest, current)
+            last = day
+
+        streak.current_streak = current
+        streak.longest_streak = longest
+        streak.last_active_date = last
+        streak.save()
+
+
+@receiver(post_save, sender=ActivityLog)
+def update_streak_on_activity(sender, instance, created, **kwargs):
+    if created:
+        StreakService.record_activity(instance.user_id, instance.date)
+
+
+# =============================================================================
+# SERIALIZERS
+# =============================================================================
+
+class StreakSerializer(serializers.ModelSerializer):
+    current_streak = serializers.SerializerMethodField()
+    active_today = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserStreak
+        fields = ['current_streak', 'longest_streak', 'last_active_date', 'active_today']
+
+    def _today(self):
+        return self.context.get('today') or local_today()
+
+    def get_current_streak(self, obj):
+        return obj.current_as_of(self._today())
+
+    def get_active_today(self, obj):
+        return obj.last_active_date == self._today()
@@ -1,6 +1,30 @@
 import pytest
 from rest_framework.test import APIClient
 
+@pytest.fixture(autouse=True)
+def reset_activity_recorder():
+    """Süreç içi "bugün loglandı" kümesi testler arasında taşınmasın (DB her testte geri alınıyor)"""
+    from fitware.activity import activity_recorder
+    activity_recorder.clear()
+    yield
+    activity_recorder.clear()
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Leaderboard top-N cache'i de aynı sebeple her testte sıfırlanır"""
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """JWT kullanıcı önbelleği de süreç içi; geri alınan kullanıcılar sonraki teste taşınmasın"""
+    from fitware.authentication import user_cache
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
 @pytest.fixture
 def api_client():
     return APIClient()
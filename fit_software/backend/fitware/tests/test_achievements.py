@@ -0,0 +1,129 @@
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from fitware.achievements import AchievementService
+
+pytestmark = pytest.mark.django_db
+
+
+def _counters(user):
+    return AchievementService.get(user.pk)
+
+
+def test_counters_follow_goal_challenge_and_workout_transitions(auth_client):
+    from exercises.models import Exercise
+    from workouts.models import WorkoutSession
+    Goal = apps.get_model("fitware", "Goal")
+    Challenge = apps.get_model("fitware", "Challenge")
+    user = User.objects.get(email="testuser@example.com")
+    assert _counters(user).goals_completed == 0
+
+    goal = Goal.objects.create(user=user, title="Run", target_value=10, unit="km")
+    auth_client.post(f"/api/goals/{goal.id}/update-progress/", {"current_value": 12}, format="json")
+    assert _counters(user).goals_completed == 1
+
+    ch = Challenge.objects.create(title="C", created_user=user, target_value=5, unit="km")
+    auth_client.post(f"/api/challenges/{ch.id}/update-progress/", {"progress_value": 6}, format="json")
+    assert _counters(user).challenges_completed == 1
+    auth_client.post(f"/api/challenges/{ch.id}/update-progress/", {"progress_value": 2}, format="json")
+    assert _counters(user).challenges_completed == 0
+
+    exercise = Exercise.objects.create(name="Squat", category="strength")
+    session = WorkoutSession.objects.create(user=user, title="Legs")
+    auth_client.post(f"/api/workouts/sessions/{session.id}/add_set/",
+                     {"exercise_id": exercise.id, "weight_kg": 100, "reps": 5}, format="json")
+    auth_client.post(f"/api/workouts/sessions/{session.id}/complete/", {"duration_minutes": 40}, format="json")
+    counters = _counters(user)
+    assert (counters.workouts_completed, counters.total_duration_minutes) == (1, 40)
+    assert (counters.total_sets, counters.total_reps, counters.total_volume_kg) == (1, 5, 500)
+
+    # tamamlanmış session'a set eklemek / düzenlemek toplamları günceller
+    r = auth_client.post(f"/api/workouts/sessions/{session.id}/add_set/",
+                         {"exercise_id": exercise.id, "weight_kg": 50, "reps": 10}, format="json")
+    auth_client.patch(f"/api/workouts/sessions/{session.id}/update_set/",
+                      {"set_id": r.data["id"], "reps": 8}, format="json")
+    counters = _counters(user)
+    assert (counters.total_sets, counters.total_reps, counters.total_volume_kg) == (2, 13, 900)
+
+    r = auth_client.get("/api/workouts/sessions/stats/", format="json")
+    assert (r.data["total_workouts"], r.data["total_volume_kg"], r.data["total_reps"]) == (1, 900, 13)
+
+    # artımlı güncellemeler kaynaklardan hesaplananla aynı
+    assert AchievementService.reconcile([user.pk]) == 0
+
+    auth_client.delete(f"/api/workouts/sessions/{session.id}/", format="json")
+    auth_client.delete(f"/api/goals/{goal.id}/", format="json")
+    counters = _counters(user)
+    assert (counters.workouts_completed, counters.total_sets, counters.goals_completed) == (0, 0, 0)
+    assert AchievementService.reconcile([user.pk]) == 0
+
+
+def test_counter_rows_exist_before_first_read(auth_client):
+    Counters = apps.get_model("fitware", "UserAchievementCounters")
+    runner = User.objects.create_user(username="new@ex.com", email="new@ex.com", password="x")
+    assert Counters.objects.filter(user=runner).exists()
+
+    # bulk_create ile açılan hesapların satırı yok: artış satırı kaynaklardan açar ve kaybolmaz
+    Goal = apps.get_model("fitware", "Goal")
+    ghost = User.objects.bulk_create([User(username="ghost@ex.com", email="ghost@ex.com")])[0]
+    Goal.objects.bulk_create([Goal(user=ghost, title=t, target_value=1, is_completed=True) for t in "AB"])
+    AchievementService.goals_completed([runner.pk, ghost.pk, ghost.pk])
+    assert Counters.objects.get(user=ghost).goals_completed == 2
+
+    r = auth_client.get("/api/achievements/leaderboard/?metric=goals", format="json")
+    assert [e["user_id"] for e in r.data["results"]] == [ghost.pk, runner.pk]
+
+
+def test_missing_counter_row_is_seeded_from_history(auth_client):
+    from workouts.models import WorkoutSession
+    Goal = apps.get_model("fitware", "Goal")
+    Counters = apps.get_model("fitware", "UserAchievementCounters")
+    user = User.objects.get(email="testuser@example.com")
+    # Sayaçlardan önceki geçmiş: satır yok, kaynaklarda tamamlanmış kayıtlar var
+    Goal.objects.create(user=user, title="Old", target_value=1, current_value=1, is_completed=True)
+    WorkoutSession.objects.create(user=user, title="Old", is_completed=True, duration_minutes=30)
+    Counters.objects.filter(user=user).delete()
+
+    goal = Goal.objects.create(user=user, title="Run", target_value=10, unit="km")
+    auth_client.post(f"/api/goals/{goal.id}/update-progress/", {"current_value": 12}, format="json")
+    counters = Counters.objects.get(user=user)
+    assert (counters.goals_completed, counters.workouts_completed, counters.total_duration_minutes) == (2, 1, 30)
+
+    # pre_delete'te satır açılmaz; ilk okuma silinmiş session'ı saymadan kurar
+    Counters.objects.filter(user=user).delete()
+    WorkoutSession.objects.filter(user=user).delete()
+    assert not Counters.objects.filter(user=user).exists()
+    assert (_counters(user).goals_completed, _counters(user).workouts_completed) == (2, 0)
+
+
+def test_reconcile_command_fixes_drift(auth_client):
+    Goal = apps.get_model("fitware", "Goal")
+    user = User.objects.get(email="testuser@example.com")
+    _counters(user)
+    # ORM ile doğrudan yazım sayaçları atlar
+    Goal.objects.create(user=user, title="G", target_value=1, is_completed=True)
+    assert _counters(user).goals_completed == 0
+
+    call_command("reconcile_achievements", "--user", str(user.pk))
+    assert _counters(user).goals_completed == 1
+
+
+def test_achievements_endpoint_and_leaderboard(auth_client):
+    Counters = apps.get_model("fitware", "UserAchievementCounters")
+    me = User.objects.get(email="testuser@example.com")
+    others = [User.objects.create_user(username=f"a{i}", email=f"a{i}@ex.com", password="x") for i in range(3)]
+    for user, workouts in zip([me, *others], [4, 9, 4, 0]):
+        Counters.objects.update_or_create(user=user, defaults={"workouts_completed": workouts})
+
+    r = auth_client.get("/api/achievements/", format="json")
+    assert r.data["workouts_completed"] == 4
+    assert r.data["streak"]["current_streak"] >= 0
+
+    r = auth_client.get("/api/achievements/leaderboard/?metric=workouts", format="json")
+    assert [(e["user_id"], e["rank"]) for e in r.data["results"]] == [
+        (others[0].pk, 1), (me.pk, 2), (others[1].pk, 2),
+    ]
+    r = auth_client.get("/api/achievements/leaderboard/?metric=nope", format="json")
+    assert r.status_code == 400
@@ -0,0 +1,210 @@
+import datetime
+
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+
+pytestmark = pytest.mark.django_db
+
+
+def _get_models():
+    ActivityLog = apps.get_model("fitware", "ActivityLog")
+    UserStreak = apps.get_model("fitware", "UserStreak")
+    return ActivityLog, UserStreak
+
+
+def _day(n):
+    return datetime.date(2026, 3, 1) + datetime.timedelta(days=n)
+
+
+# -----------------------
+# STREAKS
+# -----------------------
+
+def test_streak_increments_on_consecutive_days_and_resets_after_gap():
+    ActivityLog, UserStreak = _get_models()
+    user = User.objects.create_user(username="s@ex.com", email="s@ex.com", password="x")
+
+    for n in range(3):
+        ActivityLog.objects.create(user=user, date=_day(n), action_type="visit")
+    # aynı gün ikinci log streak'i değiştirmez
+    ActivityLog.objects.create(user=user, date=_day(2), action_type="login")
+
+    streak = UserStreak.objects.get(user=user)
+    assert streak.current_streak == 3
+    assert streak.longest_streak == 3
+
+    ActivityLog.objects.create(user=user, date=_day(5), action_type="visit")
+    streak.refresh_from_db()
+    assert streak.current_streak == 1
+    assert streak.longest_streak == 3
+    assert streak.last_active_date == _day(5)
+
+
+def test_streak_backfill_rebuilds_from_history():
+    ActivityLog, UserStreak = _get_models()
+    user = User.objects.create_user(username="b@ex.com", email="b@ex.com", password="x")
+
+    ActivityLog.objects.create(user=user, date=_day(0), action_type="visit")
+    ActivityLog.objects.create(user=user, date=_day(2), action_type="visit")
+    # eksik gün sonradan eklenirse zincir birleşir
+    ActivityLog.objects.create(user=user, date=_day(1), action_type="visit")
+
+    streak = UserStreak.objects.get(user=user)
+    assert streak.current_streak == 3
+    assert streak.longest_streak == 3
+
+
+def test_streak_longer_than_activity_window(auth_client, monkeypatch):
+    ActivityLog, _ = _get_models()
+    user = User.objects.get(email="testuser@example.com")
+    today = _day(60)
+    monkeypatch.setattr("fitware.streaks.local_today", lambda: today)
+
+    ActivityLog.objects.bulk_create([
+        ActivityLog(user=user, date=today - datetime.timedelta(days=n), action_type="visit")
+        for n in range(50)
+    ])
+
+    r = auth_client.get("/api/goals/streak/", format="json")
+    assert r.status_code == 200
+    assert r.data["current_streak"] == 50
+    assert r.data["longest_streak"] == 50
+    assert r.data["active_today"] is True
+
+
+def test_streak_endpoint_reports_broken_streak_as_zero(auth_client, monkeypatch):
+    ActivityLog, _ = _get_models()
+    user = User.objects.get(email="testuser@example.com")
+    ActivityLog.objects.create(user=user, date=_day(0), action_type="visit")
+    ActivityLog.objects.create(user=user, date=_day(1), action_type="visit")
+
+    monkeypatch.setattr("fitware.streaks.local_today", lambda: _day(4))
+    r = auth_client.get("/api/goals/streak/", format="json")
+    assert r.status_code == 200
+    assert r.data["current_streak"] == 0
+    assert r.data["longest_streak"] == 2
+
+
+# -----------------------
+# ACTIVITY RECORDER
+# -----------------------
+
+# transaction=True: transaction dışında kayıtlar doğrudan tampona girer
+@pytest.mark.django_db(transaction=True)
+def test_recorder_skips_db_for_repeats_and_flushes_in_bulk(django_assert_num_queries):
+    ActivityLog, _ = _get_models()
+    from fitware.activity import ActivityRecorder
+    user = User.objects.create_user(username="r@ex.com", email="r@ex.com", password="x")
+    recorder = ActivityRecorder()
+
+    with django_assert_num_queries(0):
+        assert recorder.record(user, "visit") is True
+        assert recorder.record(user, "visit") is False
+        assert recorder.record(user, "login") is True
+
+    assert recorder.flush() == 2
+    assert ActivityLog.objects.filter(user=user).count() == 2
+
+    # tekrarlar artık DB'ye hiç gitmez
+    with django_assert_num_queries(0):
+        assert recorder.record(user, "visit") is False
+        assert recorder.flush() == 0
+
+
+def test_recorder_ignores_rows_already_in_db():
+    ActivityLog, _ = _get_models()
+    from fitware.activity import ActivityRecorder
+    from fitware.goals import local_today
+    user = User.objects.create_user(username="c@ex.com", email="c@ex.com", password="x")
+    ActivityLog.objects.create(user=user, date=local_today(), action_type="visit")
+
+    recorder = ActivityRecorder()
+    recorder.record(user, "visit")
+    recorder.flush()
+    assert ActivityLog.objects.filter(user=user, action_type="visit").count() == 1
+
+
+def test_recorder_flushes_on_commit_outside_requests(django_capture_on_commit_callbacks):
+    ActivityLog, _ = _get_models()
+    from fitware.activity import ActivityRecorder
+    user = User.objects.create_user(username="j@ex.com", email="j@ex.com", password="x")
+    recorder = ActivityRecorder()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recorder.record(user, "workout")
+    assert ActivityLog.objects.filter(user=user, action_type="workout").exists()
+
+
+def test_recorder_drops_rows_of_rolled_back_transactions(django_capture_on_commit_callbacks):
+    from django.db import transaction
+    ActivityLog, _ = _get_models()
+    from fitware.activity import ActivityRecorder
+    user = User.objects.create_user(username="rb@ex.com", email="rb@ex.com", password="x")
+    recorder = ActivityRecorder()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                recorder.record(user, "workout")
+                raise RuntimeError
+    assert recorder.flush() == 0
+    assert not ActivityLog.objects.filter(user=user).exists()
+
+    # geri alınan kayıt anahtarı tüketmez: sonraki commit'te loglanır
+    with django_capture_on_commit_callbacks(execute=True):
+        assert recorder.record(user, "workout") is True
+    assert ActivityLog.objects.filter(user=user, action_type="workout").count() == 1
+
+
+def test_login_logs_activity_once_per_day(
+    api_client, signup_url, login_url, user_payload, django_capture_on_commit_callbacks,
+):
+    ActivityLog, UserStreak = _get_models()
+    api_client.post(signup_url, user_payload, format="json")
+    creds = {"email": user_payload["email"], "password": user_payload["password"]}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert api_client.post(login_url, creds, format="json").status_code == 200
+    with django_capture_on_commit_callbacks(execute=True):
+        assert api_client.post(login_url, creds, format="json").status_code == 200
+
+    user = User.objects.get(email=user_payload["email"])
+    assert ActivityLog.objects.filter(user=user, action_type="login").count() == 1
+    assert UserStreak.objects.get(user=user).current_streak == 1
+
+
+# -----------------------
+# ACTIVITY CALENDAR
+# -----------------------
+
+def test_activity_calendar_bitmap_and_rle(auth_client):
+    import base64
+    ActivityLog, _ = _get_models()
+    user = User.objects.get(email="testuser@example.com")
+    for day, action in [((1, 1), "visit"), ((1, 2), "visit"), ((1, 3), "visit"),
+                        ((1, 3), "workout_completed"), ((12, 31), "visit")]:
+        ActivityLog.objects.create(user=user, date=datetime.date(2025, *day), action_type=action)
+    # başka yılın kaydı dahil edilmez
+    ActivityLog.objects.create(user=user, date=datetime.date(2026, 1, 1), action_type="visit")
+
+    r = auth_client.get("/api/goals/activity-calendar/?year=2025", format="json")
+    assert r.status_code == 200
+    assert r.data["days"] == 365
+    visit = r.data["action_types"]["visit"]
+    assert visit["count"] == 4
+    bits = base64.b64decode(visit["data"])
+    assert len(bits) == 46
+    assert bits[0] == 0b111
+    assert bits[364 >> 3] & (1 << (364 & 7))
+    assert r.data["all"]["count"] == 4
+
+    r2 = auth_client.get("/api/goals/activity-calendar/?year=2025&encoding=rle", format="json")
+    assert r2.status_code == 200
+    assert r2.data["action_types"]["visit"]["data"] == [[0, 3], [364, 1]]
+    assert r2.data["action_types"]["workout_completed"]["data"] == [[2, 1]]
+
+
+def test_activity_calendar_rejects_bad_year(auth_client):
+    r = auth_client.get("/api/goals/activity-calendar/?year=abc", format="json")
+    assert r.status_code == 400
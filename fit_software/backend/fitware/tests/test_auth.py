@@ -3,7 +3,6 @@ from django.contrib.auth.models import User
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
-from unittest.mock import patch
 
 pytestmark = pytest.mark.django_db
 
@@ -34,12 +33,15 @@ def test_login_wrong_password(api_client, signup_url, login_url, user_payload):
     assert r2.status_code == 401
     assert "error" in r2.data
 
-@patch("fitware.urls.send_mail")
-def test_password_reset_request_existing_email_sends_mail(mock_send_mail, api_client, reset_request_url):
+def test_password_reset_request_existing_email_sends_mail(api_client, reset_request_url, mailoutbox,
+                                                          django_capture_on_commit_callbacks):
     User.objects.create_user(username="a@b.com", email="a@b.com", password="XyZ12345!!")
-    r = api_client.post(reset_request_url, {"email": "a@b.com"}, format="json")
+    with django_capture_on_commit_callbacks(execute=True):
+        r = api_client.post(reset_request_url, {"email": "a@b.com"}, format="json")
     assert r.status_code == 200
-    mock_send_mail.assert_called_once()
+    assert len(mailoutbox) == 1
+    assert mailoutbox[0].to == ["a@b.com"]
+    assert "/reset-password/" in mailoutbox[0].body
 
 def test_password_reset_confirm_success(api_client, reset_confirm_url, login_url):
     user = User.objects.create_user(username="reset@ex.com", email="reset@ex.com", password="OldPass123!")
@@ -883,8 +883,8 @@ class TestAcceptanceAuth:
     # -------------------------------------------------------------------------
     # ACC-02: Password Reset Flow
     # -------------------------------------------------------------------------
-    @patch("fitware.urls.send_mail")
-    def test_ACC02_password_reset_flow(self, mock_send_mail, client, created_user):
+    @patch("fitware.urls.MailQueue.queue")
+    def test_ACC02_password_reset_flow(self, mock_queue_mail, client, created_user):
         """
         ACC-02: Complete Password Reset Flow
         Workflow:
@@ -900,7 +900,7 @@ class TestAcceptanceAuth:
             "email": created_user.email
         }, format="json")
         assert reset_request_response.status_code == 200
-        mock_send_mail.assert_called_once()
+        mock_queue_mail.assert_called_once()
         
         # Step 2: Generate valid token
         generator = PasswordResetTokenGenerator()
@@ -942,8 +942,8 @@ class TestPasswordReset:
     # -------------------------------------------------------------------------
     # PR-01: Reset Request - Existing Email
     # -------------------------------------------------------------------------
-    @patch("fitware.urls.send_mail")
-    def test_PR01_reset_request_existing_email(self, mock_send_mail, client, created_user):
+    @patch("fitware.urls.MailQueue.queue")
+    def test_PR01_reset_request_existing_email(self, mock_queue_mail, client, created_user):
         """
         PR-01: Password Reset Request for Existing Email
         Expected: 200 OK, email sent
@@ -953,13 +953,13 @@ class TestPasswordReset:
         }, format="json")
         
         assert response.status_code == 200
-        mock_send_mail.assert_called_once()
+        mock_queue_mail.assert_called_once()
     
     # -------------------------------------------------------------------------
     # PR-02: Reset Request - Non-existing Email (Security)
     # -------------------------------------------------------------------------
-    @patch("fitware.urls.send_mail")
-    def test_PR02_reset_request_nonexisting_email(self, mock_send_mail, client):
+    @patch("fitware.urls.MailQueue.queue")
+    def test_PR02_reset_request_nonexisting_email(self, mock_queue_mail, client):
         """
         PR-02: Password Reset Request for Non-existing Email
         Expected: 200 OK (same response for security), no email sent
@@ -970,7 +970,7 @@ class TestPasswordReset:
         
         # Same response to prevent email enumeration
         assert response.status_code == 200
-        mock_send_mail.assert_not_called()
+        mock_queue_mail.assert_not_called()
     
     # -------------------------------------------------------------------------
     # PR-03: Reset Confirm - Invalid Token
@@ -0,0 +1,92 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from fitware.authentication import RouteScopedAuthentication
+from fitware.tokens import TokenPruner
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="jwt@ex.com", email="jwt@ex.com", password="XyZ12345!!")
+
+
+def _authenticate(header, path="/api/goals/"):
+    request = Request(
+        APIRequestFactory().get(path, HTTP_AUTHORIZATION=header),
+        authenticators=[RouteScopedAuthentication()],
+    )
+    return request.user
+
+
+def test_cached_user_skips_db_until_user_changes(user, django_assert_num_queries):
+    header = f"Bearer {AccessToken.for_user(user)}"
+    with django_assert_num_queries(1):
+        assert _authenticate(header).pk == user.pk
+    with django_assert_num_queries(0):
+        cached = _authenticate(header)
+    assert cached.email == "jwt@ex.com"
+
+    # şifre değişimi (save) önbelleği düşürür
+    user.set_password("Another123!!")
+    user.save()
+    with django_assert_num_queries(1):
+        assert _authenticate(header).password == user.password
+
+    user.is_active = False
+    user.save()
+    with pytest.raises(AuthenticationFailed, match="inactive"):
+        _authenticate(header)
+
+
+def test_fast_path_skips_other_authenticators_on_api_routes(user, monkeypatch):
+    calls = []
+    monkeypatch.setattr(SessionAuthentication, "authenticate", lambda self, request: calls.append(request.path))
+    header = f"Bearer {AccessToken.for_user(user)}"
+
+    assert _authenticate(header).pk == user.pk
+    assert calls == []
+    # /api/ dışında ya da Bearer olmayan isteklerde tam zincir çalışır
+    assert _authenticate(header, path="/admin/").pk == user.pk
+    assert not _authenticate("").is_authenticated
+    assert calls == ["/admin/", "/api/goals/"]
+
+
+def test_api_requests_still_authenticate_end_to_end(auth_client):
+    assert auth_client.get("/api/goals/", format="json").status_code == 200
+    auth_client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+    assert auth_client.get("/api/goals/", format="json").status_code in (401, 403)
+
+
+def test_bench_auth_command_reports_both_variants(capsys):
+    call_command("bench_auth", "--requests", "20")
+    out = capsys.readouterr().out
+    assert "default chain" in out and "cached JWT" in out
+    assert not User.objects.filter(username="bench-auth").exists()
+
+
+def test_prune_tokens_removes_only_expired_in_batches(user, capsys):
+    import datetime
+    from django.utils import timezone
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    now = timezone.now()
+    for i in range(5):
+        expires = now - datetime.timedelta(days=1) if i < 3 else now + datetime.timedelta(days=1)
+        token = OutstandingToken.objects.create(user=user, jti=f"jti-{i}", token="t", expires_at=expires)
+        if i % 2 == 0:
+            BlacklistedToken.objects.create(token=token)
+
+    assert TokenPruner.prune(batch_size=2, max_batches=1) == (2, 1)
+    call_command("prune_tokens", "--batch-size", "2")
+    assert "Removed 1 outstanding and 1 blacklisted tokens" in capsys.readouterr().out
+
+    assert sorted(OutstandingToken.objects.values_list("jti", flat=True)) == ["jti-3", "jti-4"]
+    assert list(BlacklistedToken.objects.values_list("token__jti", flat=True)) == ["jti-4"]
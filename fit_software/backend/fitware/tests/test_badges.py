@@ -0,0 +1,111 @@
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+
+from fitware.achievements import AchievementService
+from fitware.badges import BadgeService
+
+pytestmark = pytest.mark.django_db
+
+
+def _user_with_progress(goals=0, challenges=0):
+    Goal = apps.get_model("fitware", "Goal")
+    Challenge = apps.get_model("fitware", "Challenge")
+    ChallengeJoined = apps.get_model("fitware", "ChallengeJoined")
+    user = User.objects.create_user(username="b@ex.com", email="b@ex.com", password="x")
+    for i in range(goals):
+        Goal.objects.create(user=user, title=f"G{i}", target_value=1, is_completed=True)
+    for i in range(challenges):
+        ch = Challenge.objects.create(title=f"C{i}", created_user=user, target_value=1)
+        ChallengeJoined.objects.create(user=user, challenge=ch, is_completed=True)
+    return user
+
+
+def test_milestone_badges_awarded_with_constant_queries(django_assert_max_num_queries):
+    user = _user_with_progress(goals=10, challenges=1)
+    AchievementService.reconcile([user.pk])
+
+    # sayaç satırı tek okuma + sahip olunan badge'ler + tek INSERT
+    with django_assert_max_num_queries(3):
+        awarded = BadgeService.check_milestone_badges(user)
+    assert {b.badge_type for b in awarded} == {"🎯 Goal Crusher", "⭐ Goal Master", "🎪 Challenge Taker"}
+
+    # ikinci çağrı: yeni badge yok, INSERT de yok
+    with django_assert_max_num_queries(2):
+        assert BadgeService.check_milestone_badges(user) == []
+    assert user.badge_set.count() == 3
+
+
+def test_badge_unique_per_user_and_type(auth_client):
+    from django.db import IntegrityError, transaction
+    Badge = apps.get_model("fitware", "Badge")
+    user = User.objects.get(email="testuser@example.com")
+
+    r = auth_client.post("/api/badges/", {"badge_type": "Early Bird"}, format="json")
+    assert r.status_code == 201
+    r = auth_client.post("/api/badges/", {"badge_type": "Early Bird"}, format="json")
+    assert r.status_code == 400
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Badge.objects.create(user=user, badge_type="Early Bird")
+    # çakışan toplu yazım sessizce atlanır
+    Badge.objects.bulk_create([Badge(user=user, badge_type="Early Bird")], ignore_conflicts=True)
+    assert Badge.objects.filter(user=user, badge_type="Early Bird").count() == 1
+
+
+# -----------------------
+# JOB QUEUE
+# -----------------------
+
+def test_workout_completion_defers_badge_check_to_one_dispatch(auth_client, monkeypatch):
+    from fitware.jobs import Job, JobQueue
+    from fitware.outbox import OutboxEvent
+    from workouts.models import WorkoutSession
+    user = User.objects.get(email="testuser@example.com")
+    calls = []
+    monkeypatch.setattr(BadgeService, "check_milestone_badges", lambda u: calls.append(u))
+
+    # commit olmadığı için (test transaction'ı) olaylar ve dispatch işi sadece bekler
+    for i in range(3):
+        session = WorkoutSession.objects.create(user=user, title=f"S{i}")
+        r = auth_client.post(f"/api/workouts/sessions/{session.id}/complete/", {}, format="json")
+        assert r.status_code == 200
+        assert "new_badge" not in r.data
+    assert calls == []
+    assert OutboxEvent.objects.filter(topic="workout_completed", processed_at__isnull=True).count() == 3
+    assert Job.objects.filter(kind="outbox.dispatch", status="pending").count() == 1
+
+    # tek dispatch: üç olay bir batch'te, badge kontrolü kullanıcı başına bir kez
+    assert JobQueue.run_pending() == 1
+    assert calls == [user.pk]
+    assert not OutboxEvent.objects.filter(processed_at__isnull=True).exists()
+    job = Job.objects.get()
+    assert (job.status, job.attempts) == ("done", 1)
+
+
+def test_failed_job_is_recorded_and_queue_continues():
+    from fitware.jobs import Job, JobQueue
+    JobQueue.enqueue("no.such.kind", kick=False)
+    JobQueue.enqueue("outbox.dispatch", kick=False)
+
+    assert JobQueue.run_pending() == 2
+    failed = Job.objects.get(kind="no.such.kind")
+    assert failed.status == "failed" and "No handler" in failed.last_error
+    assert Job.objects.get(kind="outbox.dispatch").status == "done"
+
+
+def test_new_badges_are_delivered_until_marked_seen(auth_client):
+    user = User.objects.get(email="testuser@example.com")
+    Badge = apps.get_model("fitware", "Badge")
+    first = Badge.objects.create(user=user, badge_type="A")
+    Badge.objects.create(user=user, badge_type="B")
+
+    r = auth_client.get("/api/badges/new/", format="json")
+    assert {b["badge_type"] for b in r.data} == {"A", "B"}
+
+    r = auth_client.post("/api/badges/seen/", {"ids": [first.id]}, format="json")
+    assert r.data["marked"] == 1
+    assert [b["badge_type"] for b in auth_client.get("/api/badges/new/", format="json").data] == ["B"]
+
+    auth_client.post("/api/badges/seen/", {}, format="json")
+    assert auth_client.get("/api/badges/new/", format="json").data == []
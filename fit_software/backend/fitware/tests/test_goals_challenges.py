@@ -55,7 +55,7 @@ def test_goal_progress_decrease_case_model_property():
 
 
 @patch("fitware.badges.BadgeService.check_milestone_badges")
-def test_update_progress_marks_completed_and_logs_activity(mock_badge, auth_client):
+def test_update_progress_marks_completed_and_logs_activity(mock_badge, auth_client, django_capture_on_commit_callbacks):
     Goal, ActivityLog, _, _ = _get_models()
 
     # create goal via API
@@ -67,8 +67,9 @@ def test_update_progress_marks_completed_and_logs_activity(mock_badge, auth_clie
     goals = auth_client.get("/api/goals/", format="json").data
     goal_id = goals[0]["id"]
 
-    # update progress to reach target
-    r2 = auth_client.post(f"/api/goals/{goal_id}/update-progress/", {"current_value": 10}, format="json")
+    # update progress to reach target (yan etkiler commit sonrası outbox'tan)
+    with django_capture_on_commit_callbacks(execute=True):
+        r2 = auth_client.post(f"/api/goals/{goal_id}/update-progress/", {"current_value": 10}, format="json")
     assert r2.status_code == 200, r2.data
     assert r2.data["success"] is True
     assert r2.data["goal"]["is_completed"] is True
@@ -102,11 +103,12 @@ def test_log_visit_idempotent_same_day(auth_client):
     r1 = auth_client.post("/api/goals/log_visit/", {}, format="json")
     assert r1.status_code == 200
     assert r1.data["success"] is True
+    assert r1.data["message"] == "Visit logged"
 
     r2 = auth_client.post("/api/goals/log_visit/", {}, format="json")
     assert r2.status_code == 200
     assert r2.data["success"] is True
-    assert r2.data["message"] in ("Already logged today", "Visit logged")
+    assert r2.data["message"] == "Already logged today"
 
 
 def test_suggest_unknown_goal_returns_recognized_false(auth_client, monkeypatch):
@@ -136,7 +138,7 @@ def test_create_challenge_auto_creates_goal_and_joins_creator(auth_client):
     payload = {
         "title": "Weekly Run",
         "description": "Run total distance this week",
-        "due_date": "2025-12-31",
+        "due_date": "2099-12-31",
         "target_value": 10,
         "unit": "km",
         "badge": "Weekly Run Badge",
@@ -157,7 +159,7 @@ def test_create_challenge_auto_creates_goal_and_joins_creator(auth_client):
 
 def test_join_challenge_creates_goal_for_joiner_if_missing(auth_client, second_auth_client):
     # creator creates a challenge
-    payload = {"title": "10 Workouts", "description": "Complete workouts", "due_date": "2025-12-31", "target_value": 10, "unit": "workouts"}
+    payload = {"title": "10 Workouts", "description": "Complete workouts", "due_date": "2099-12-31", "target_value": 10, "unit": "workouts"}
     r = auth_client.post("/api/challenges/", payload, format="json")
     assert r.status_code in (200, 201), r.data
 
@@ -174,7 +176,7 @@ def test_join_challenge_creates_goal_for_joiner_if_missing(auth_client, second_a
 
 
 def test_join_challenge_twice_does_not_duplicate_goal(auth_client, second_auth_client):
-    payload = {"title": "Bike 20km", "description": "", "due_date": "2025-12-31", "target_value": 20, "unit": "km"}
+    payload = {"title": "Bike 20km", "description": "", "due_date": "2099-12-31", "target_value": 20, "unit": "km"}
     auth_client.post("/api/challenges/", payload, format="json")
     challenge_id = auth_client.get("/api/challenges/", format="json").data[0]["id"]
 
@@ -191,16 +193,17 @@ def test_join_challenge_twice_does_not_duplicate_goal(auth_client, second_auth_c
     assert count_after == count_before
 
 
-def test_update_challenge_progress_syncs_goal(auth_client, second_auth_client):
+def test_update_challenge_progress_syncs_goal(auth_client, second_auth_client, django_capture_on_commit_callbacks):
     # create challenge
-    auth_client.post("/api/challenges/", {"title": "Swim", "description": "", "due_date": "2025-12-31", "target_value": 20, "unit": "laps"}, format="json")
+    auth_client.post("/api/challenges/", {"title": "Swim", "description": "", "due_date": "2099-12-31", "target_value": 20, "unit": "laps"}, format="json")
     challenge_id = auth_client.get("/api/challenges/", format="json").data[0]["id"]
 
     # join second user
     second_auth_client.post(f"/api/challenges/{challenge_id}/join/", {}, format="json")
 
     # update progress from challenge side
-    r = second_auth_client.post(f"/api/challenges/{challenge_id}/update-progress/", {"progress_value": 7}, format="json")
+    with django_capture_on_commit_callbacks(execute=True):
+        r = second_auth_client.post(f"/api/challenges/{challenge_id}/update-progress/", {"progress_value": 7}, format="json")
     assert r.status_code == 200
     assert float(r.data["progress_value"]) == 7
 
@@ -212,7 +215,7 @@ def test_update_challenge_progress_syncs_goal(auth_client, second_auth_client):
 
 
 def test_leave_challenge_removes_participation(auth_client, second_auth_client):
-    auth_client.post("/api/challenges/", {"title": "LeaveTest", "description": "", "due_date": "2025-12-31", "target_value": 5, "unit": "km"}, format="json")
+    auth_client.post("/api/challenges/", {"title": "LeaveTest", "description": "", "due_date": "2099-12-31", "target_value": 5, "unit": "km"}, format="json")
     challenge_id = auth_client.get("/api/challenges/", format="json").data[0]["id"]
 
     second_auth_client.post(f"/api/challenges/{challenge_id}/join/", {}, format="json")
@@ -223,3 +226,365 @@ def test_leave_challenge_removes_participation(auth_client, second_auth_client):
     my = second_auth_client.get("/api/challenges/my/", format="json")
     assert my.status_code == 200
     assert all(ch["id"] != challenge_id for ch in my.data)
+
+
+def test_goal_progress_propagates_to_linked_challenge_join(auth_client, django_capture_on_commit_callbacks):
+    _, _, _, ChallengeJoined = _get_models()
+    auth_client.post("/api/challenges/", {"title": "Row", "description": "", "due_date": "2099-12-31", "target_value": 10, "unit": "km"}, format="json")
+    challenge_id = auth_client.get("/api/challenges/", format="json").data[0]["id"]
+
+    cj = ChallengeJoined.objects.get(challenge_id=challenge_id)
+    assert cj.goal is not None
+
+    # başlık değişse bile bağ korunur (title eşleşmesine dayanmıyor)
+    auth_client.patch(f"/api/goals/{cj.goal_id}/", {"title": "Renamed"}, format="json")
+    with django_capture_on_commit_callbacks(execute=True):
+        r = auth_client.post(f"/api/goals/{cj.goal_id}/update-progress/", {"current_value": 10}, format="json")
+    assert r.status_code == 200
+
+    cj.refresh_from_db()
+    assert cj.progress_value == 10
+    assert cj.is_completed is True
+
+
+def test_challenge_lists_use_constant_number_of_queries(auth_client):
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    _, _, Challenge, ChallengeJoined = _get_models()
+    me = User.objects.get(email="testuser@example.com")
+    others = [User.objects.create_user(username=f"u{i}", email=f"u{i}@ex.com", password="x") for i in range(3)]
+
+    def add_challenges(n):
+        for i in range(n):
+            ch = Challenge.objects.create(title=f"C{i}", created_user=me, target_value=10, unit="km", participant_count=4)
+            ChallengeJoined.objects.create(user=me, challenge=ch, progress_value=5)
+            for u in others:
+                ChallengeJoined.objects.create(user=u, challenge=ch)
+
+    def count_queries(url):
+        with CaptureQueriesContext(connection) as ctx:
+            r = auth_client.get(url, format="json")
+        assert r.status_code == 200
+        return len(ctx.captured_queries), r.data
+
+    add_challenges(2)
+    count_queries("/api/challenges/")  # JWT kullanıcı önbelleğini ısıt
+    small_list, _ = count_queries("/api/challenges/")
+    small_my, _ = count_queries("/api/challenges/my/")
+
+    add_challenges(5)
+    big_list, data = count_queries("/api/challenges/")
+    big_my, my_data = count_queries("/api/challenges/my/")
+
+    assert big_list == small_list
+    assert big_my == small_my
+    assert len(data) == len(my_data) == 7
+    first = data[0]
+    # katılımcı listesi liste cevabında yok; leaderboard endpoint'inden sayfalı gelir
+    assert first["participants"] == 4 and "participants_detail" not in first
+    assert first["is_joined"] is True
+    assert first["progress_value"] == 5 and first["progress_percent"] == 50
+
+
+def test_participant_counter_follows_join_and_leave(auth_client):
+    _, _, Challenge, _ = _get_models()
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIClient
+    auth_client.post("/api/challenges/", {"title": "Count", "description": "", "target_value": 5, "unit": "km"}, format="json")
+    ch = Challenge.objects.get(title="Count")
+    assert ch.participant_count == 1
+
+    other = APIClient()
+    other.force_authenticate(User.objects.create_user(username="o@ex.com", email="o@ex.com", password="x"))
+    r = other.post(f"/api/challenges/{ch.id}/join/", {}, format="json")
+    assert r.data["participants"] == 2
+    other.post(f"/api/challenges/{ch.id}/join/", {}, format="json")  # ikinci join sayılmaz
+    r = other.post(f"/api/challenges/{ch.id}/leave/", {}, format="json")
+    assert r.data["participants"] == 1
+    ch.refresh_from_db()
+    assert ch.participant_count == 1
+
+
+def test_participant_counter_follows_cascades_and_reconciles(auth_client, capsys):
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    _, _, Challenge, ChallengeJoined = _get_models()
+    auth_client.post("/api/challenges/", {"title": "Cascade", "description": "", "target_value": 5, "unit": "km"}, format="json")
+    ch = Challenge.objects.get(title="Cascade")
+    gone = User.objects.create_user(username="gone@ex.com", email="gone@ex.com", password="x")
+    ChallengeJoined.objects.create(user=gone, challenge=ch)
+    Challenge.objects.filter(pk=ch.pk).update(participant_count=2)
+
+    # kullanıcı silinince join cascade ile gider, sayaç düşer
+    gone.delete()
+    ch.refresh_from_db()
+    assert ch.participant_count == 1
+
+    Challenge.objects.filter(pk=ch.pk).update(participant_count=7)
+    call_command("reconcile_participants")
+    assert "1 challenges changed" in capsys.readouterr().out
+    ch.refresh_from_db()
+    assert ch.participant_count == 1
+
+
+def test_challenge_catalog_filters_ordering_and_pagination(auth_client):
+    import datetime
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    _, _, Challenge, ChallengeJoined = _get_models()
+    me = User.objects.get(email="testuser@example.com")
+    today = timezone.localdate()
+
+    def make(title, due, unit="km", count=0, join=False):
+        ch = Challenge.objects.create(title=title, created_user=me, due_date=due, unit=unit, target_value=10, participant_count=count)
+        if join:
+            ChallengeJoined.objects.create(user=me, challenge=ch)
+        return ch
+
+    make("past", today - datetime.timedelta(days=3), count=50)
+    make("soon", today + datetime.timedelta(days=2), count=10, join=True)
+    make("later", today + datetime.timedelta(days=40), unit="laps", count=30)
+    make("open", None, count=5)
+
+    def titles(query):
+        r = auth_client.get(f"/api/challenges/?{query}", format="json")
+        assert r.status_code == 200, r.data
+        data = r.data["results"] if isinstance(r.data, dict) else r.data
+        return [c["title"] for c in data]
+
+    assert titles("status=active&ordering=-participants") == ["later", "soon", "open"]
+    assert titles("status=ended") == ["past"]
+    assert titles("ending_soon=true") == ["soon"]
+    assert titles("unit=laps") == ["later"]
+    assert titles("joined=true") == ["soon"]
+    assert set(titles("joined=false")) == {"past", "later", "open"}
+
+    r = auth_client.get("/api/challenges/?ordering=-participants&page_size=2", format="json")
+    assert r.data["count"] == 4
+    assert [c["title"] for c in r.data["results"]] == ["past", "later"]
+
+    r = auth_client.get("/api/challenges/my/?page=1", format="json")
+    assert r.data["count"] == 1
+
+    for bad in ("status=soon", "ordering=banana", "joined=maybe", "ending_soon=x"):
+        assert auth_client.get(f"/api/challenges/?{bad}", format="json").status_code == 400
+
+
+# -----------------------
+# LEADERBOARD
+# -----------------------
+
+def _leaderboard_fixture(n):
+    from django.contrib.auth.models import User
+    _, _, Challenge, ChallengeJoined = _get_models()
+    me = User.objects.get(email="testuser@example.com")
+    ch = Challenge.objects.create(title="Board", created_user=me, target_value=100, unit="km")
+    ChallengeJoined.objects.create(user=me, challenge=ch, progress_value=35)
+    for i in range(n):
+        u = User.objects.create_user(username=f"lb{i}", email=f"lb{i}@ex.com", password="x")
+        ChallengeJoined.objects.create(user=u, challenge=ch, progress_value=i * 10)
+    return ch
+
+
+def test_leaderboard_ranks_paginates_and_reports_caller(auth_client):
+    ch = _leaderboard_fixture(8)  # 0..70, ben 35
+
+    r = auth_client.get(f"/api/challenges/{ch.id}/leaderboard/?page_size=3", format="json")
+    assert r.status_code == 200
+    assert r.data["count"] == 9
+    assert [e["progress_value"] for e in r.data["results"]] == [70, 60, 50]
+    assert [e["rank"] for e in r.data["results"]] == [1, 2, 3]
+    assert r.data["me"]["rank"] == 5 and r.data["me"]["progress_value"] == 35
+
+    r = auth_client.get(f"/api/challenges/{ch.id}/leaderboard/?page=2&page_size=3", format="json")
+    assert [e["progress_value"] for e in r.data["results"]] == [40, 35, 30]
+
+    assert auth_client.get(f"/api/challenges/{ch.id}/leaderboard/?page=x", format="json").status_code == 400
+
+
+def test_leaderboard_cache_follows_progress_updates(auth_client, monkeypatch, django_capture_on_commit_callbacks):
+    from fitware.leaderboards import LeaderboardService
+    monkeypatch.setattr(LeaderboardService, "TOP_N", 4)
+    ch = _leaderboard_fixture(6)  # 0..50, ben 35
+
+    top = auth_client.get(f"/api/challenges/{ch.id}/leaderboard/?page_size=4", format="json").data["results"]
+    assert [e["progress_value"] for e in top] == [50, 40, 35, 30]
+
+    # ilerleme commit sonrası cache sürümünü artırır; önceden ulaşan eşitlikte önde kalır
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_client.post(f"/api/challenges/{ch.id}/update-progress/", {"progress_value": 50}, format="json")
+    data = auth_client.get(f"/api/challenges/{ch.id}/leaderboard/?page_size=4", format="json").data
+    assert [e["progress_value"] for e in data["results"]] == [50, 50, 40, 30]
+    assert data["me"]["rank"] == 2
+
+    # top-N dışına düşünce liste DB'den yeniden kurulur
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_client.post(f"/api/challenges/{ch.id}/update-progress/", {"progress_value": 5}, format="json")
+    data = auth_client.get(f"/api/challenges/{ch.id}/leaderboard/?page_size=4", format="json").data
+    assert [e["progress_value"] for e in data["results"]] == [50, 40, 30, 20]
+    assert data["me"]["rank"] == 6
+
+    # derin sayfalar window sorgusundan gelir
+    deep = auth_client.get(f"/api/challenges/{ch.id}/leaderboard/?page=2&page_size=4", format="json").data
+    assert [(e["rank"], e["progress_value"]) for e in deep["results"]] == [(5, 10), (6, 5), (7, 0)]
+
+
+def test_leaderboard_rank_of_is_served_from_cache(auth_client, monkeypatch, django_assert_num_queries):
+    from django.contrib.auth.models import User
+    from fitware.leaderboards import LeaderboardService
+    monkeypatch.setattr(LeaderboardService, "TOP_N", 4)
+    ch = _leaderboard_fixture(6)  # 0..50, ben 35
+    me = User.objects.get(email="testuser@example.com")
+    low = User.objects.get(username="lb1")
+
+    assert LeaderboardService.rank_of(ch, me)["rank"] == 3
+    assert LeaderboardService.rank_of(ch, low)["rank"] == 6
+    # top-N içindekiler listeden, dışındakiler sürümlü cache'ten: COUNT yok
+    with django_assert_num_queries(0):
+        assert LeaderboardService.rank_of(ch, me)["rank"] == 3
+        assert LeaderboardService.rank_of(ch, low)["rank"] == 6
+
+    # yazma sürümü artırır; eski liste ve sıralar artık okunmaz
+    ChallengeJoined = apps.get_model("fitware", "ChallengeJoined")
+    ChallengeJoined.objects.filter(challenge=ch, user=low).update(progress_value=99)
+    LeaderboardService.invalidate(ch.pk)
+    assert LeaderboardService.rank_of(ch, low)["rank"] == 1
+    assert LeaderboardService.rank_of(ch, me)["rank"] == 4
+
+
+def test_leaderboard_uses_short_ttl_on_process_local_cache():
+    from django.test import override_settings
+    from fitware.leaderboards import LeaderboardService
+    # LocMem süreç içi: diğer worker'lar sürüm artışını görmez, girdiler kısa tutulur
+    assert LeaderboardService.cache_timeout() == 5
+    with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}):
+        assert LeaderboardService.cache_timeout() == LeaderboardService.CACHE_TIMEOUT
+
+
+# -----------------------
+# CHALLENGE FINALIZATION
+# -----------------------
+
+def test_goal_sync_leaves_finalized_and_expired_challenges_alone(auth_client):
+    import datetime
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from fitware.achievements import AchievementService
+    from fitware.goals import GoalProgressService
+    Goal, _, Challenge, ChallengeJoined = _get_models()
+    me = User.objects.get(email="testuser@example.com")
+    today = timezone.localdate()
+
+    joins = []
+    for title, due, finalized in [("Final", today, timezone.now()), ("Expired", today - datetime.timedelta(days=1), None),
+                                  ("Open", today, None)]:
+        ch = Challenge.objects.create(title=title, created_user=me, target_value=10, unit="km",
+                                      due_date=due, finalized_at=finalized)
+        goal = Goal.objects.create(user=me, title=title, target_value=10, unit="km", current_value=12)
+        joins.append(ChallengeJoined.objects.create(user=me, challenge=ch, goal=goal, progress_value=4))
+    AchievementService.reconcile([me.pk])
+    before = me.achievements.challenges_completed
+
+    GoalProgressService.sync_challenges([j.goal_id for j in joins])
+    assert [
+        (cj.progress_value, cj.is_completed) for cj in ChallengeJoined.objects.filter(pk__in=[j.pk for j in joins]).order_by("pk")
+    ] == [(4, False), (4, False), (12, True)]
+    me.achievements.refresh_from_db()
+    assert me.achievements.challenges_completed == before + 1
+
+    # süresi dolmuş challenge'a doğrudan ilerleme de yazılamaz
+    r = auth_client.post(f"/api/challenges/{joins[1].challenge_id}/update-progress/", {"progress_value": 9}, format="json")
+    assert r.status_code == 400
+
+
+def test_finalize_challenges_snapshots_results_and_awards_badges(auth_client, django_assert_max_num_queries):
+    import datetime
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.utils import timezone
+    from fitware.achievements import AchievementService
+    from fitware.finalization import ChallengeFinalizer
+    Goal, _, Challenge, ChallengeJoined = _get_models()
+    Badge = apps.get_model("fitware", "Badge")
+    ChallengeResult = apps.get_model("fitware", "ChallengeResult")
+    me = User.objects.get(email="testuser@example.com")
+    today = timezone.localdate()
+    users = [User.objects.create_user(username=f"f{i}", email=f"f{i}@ex.com", password="x") for i in range(4)]
+
+    expired = []
+    for n in range(3):
+        ch = Challenge.objects.create(title=f"Old{n}", created_user=me, target_value=10, unit="km",
+                                      badge_name=f"Old{n} Badge", due_date=today - datetime.timedelta(days=1))
+        for i, u in enumerate(users):
+            goal = Goal.objects.create(user=u, title=ch.title, target_value=10, unit="km")
+            ChallengeJoined.objects.create(user=u, challenge=ch, goal=goal, progress_value=i * 4)  # 0,4,8,12
+        expired.append(ch)
+    running = Challenge.objects.create(title="Running", created_user=me, target_value=10, due_date=today)
+    ChallengeJoined.objects.create(user=users[3], challenge=running, progress_value=20)
+    AchievementService.reconcile([u.pk for u in users])
+
+    with django_assert_max_num_queries(15):
+        stats = ChallengeFinalizer.finalize_batch(today)
+    assert stats["challenges"] == 3 and stats["completed"] == 3
+
+    results = ChallengeResult.objects.filter(challenge=expired[0]).order_by("rank")
+    assert [(r.user_id, r.rank, r.is_completed) for r in results] == [
+        (users[3].id, 1, True), (users[2].id, 2, False), (users[1].id, 3, False), (users[0].id, 4, False),
+    ]
+    assert not Goal.objects.filter(user__in=users, is_active=True, title__startswith="Old").exists()
+    winner_badges = set(Badge.objects.filter(user=users[3]).values_list("badge_type", flat=True))
+    assert {"Old0 Badge", "Old1 Badge", "Old2 Badge", "🎪 Challenge Taker"} <= winner_badges
+    assert not Badge.objects.filter(user=users[0]).exists()
+    assert users[3].achievements.challenges_completed == 3
+
+    running.refresh_from_db()
+    assert running.finalized_at is None
+
+    # tekrar çalıştırmak bir şey değiştirmez; leaderboard donmuş sonuçtan okunur
+    call_command("finalize_challenges")
+    assert Badge.objects.filter(user=users[3], badge_type="Old0 Badge").count() == 1
+    r = auth_client.get(f"/api/challenges/{expired[0].id}/leaderboard/", format="json")
+    assert [e["rank"] for e in r.data["results"]] == [1, 2, 3, 4]
+    r = auth_client.post(f"/api/challenges/{expired[0].id}/update-progress/", {"progress_value": 50}, format="json")
+    assert r.status_code == 400
+
+
+def test_challenge_goals_take_their_type_from_the_title(auth_client):
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIClient
+    _, _, _, ChallengeJoined = _get_models()
+    auth_client.post("/api/challenges/", {"title": "Lose 5 kg", "description": "", "target_value": 5, "unit": "kg"}, format="json")
+    auth_client.post("/api/challenges/", {"title": "Deadlift 200", "description": "", "target_value": 200, "unit": "kg"}, format="json")
+    auth_client.post("/api/challenges/", {"title": "Spring run", "description": "", "target_value": 50, "unit": "km"}, format="json")
+    lose = ChallengeJoined.objects.get(challenge__title="Lose 5 kg")
+    other = APIClient()
+    other.force_authenticate(User.objects.create_user(username="j@ex.com", email="j@ex.com", password="x"))
+    other.post(f"/api/challenges/{lose.challenge_id}/join/", {}, format="json")
+
+    from django.db.models import F
+    own = ChallengeJoined.objects.filter(user=F("challenge__created_user"))
+    icons = dict(own.values_list("challenge__title", "goal__icon"))
+    assert icons == {"Lose 5 kg": "📉", "Deadlift 200": "🎯", "Spring run": "🏃"}
+    # katılan kullanıcının goal'ü de aynı tipte açılır
+    joined = ChallengeJoined.objects.exclude(pk__in=own.values("pk")).get()
+    assert joined.goal.icon == "📉"
+
+
+def test_goal_sync_keeps_completion_of_challenges_without_target(auth_client):
+    from django.contrib.auth.models import User
+    from fitware.goals import GoalProgressService
+    Goal, _, Challenge, ChallengeJoined = _get_models()
+    me = User.objects.get(email="testuser@example.com")
+
+    joins = []
+    for title, target in [("Zero", 0), ("Negative", -1), ("Ten", 10)]:
+        ch = Challenge.objects.create(title=title, created_user=me, target_value=target, unit="km")
+        goal = Goal.objects.create(user=me, title=title, target_value=10, unit="km", current_value=3)
+        joins.append(ChallengeJoined.objects.create(user=me, challenge=ch, goal=goal, is_completed=True))
+
+    GoalProgressService.sync_challenges([j.goal_id for j in joins])
+    # hedefsiz challenge'larda tamamlanma değişmez; yalnız ilerleme senkronlanır
+    assert [
+        (cj.progress_value, cj.is_completed) for cj in ChallengeJoined.objects.filter(pk__in=[j.pk for j in joins]).order_by("pk")
+    ] == [(3, True), (3, True), (3, False)]
@@ -0,0 +1,180 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import jwt
+import pytest
+from asgiref.sync import async_to_sync
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.test import RequestFactory, override_settings
+
+from fitware.google_oauth import google_oidc
+from fitware.urls import google_callback_async
+
+pytestmark = pytest.mark.django_db
+
+CLIENT_ID = "fitware-test-client"
+
+
+class FakeOIDCProvider(ThreadingHTTPServer):
+    """Yerel sahte Google: /token id_token döner, /certs JWKS yayınlar"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeOIDCHandler)
+        self.requests = []
+        self.codes = {}
+        self.keys = {}
+        self.rotate_key()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def rotate_key(self):
+        kid = f"key-{len(self.keys) + 1}"
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.kid = kid
+
+    def issue_code(self, code, signing_key=None, **claims):
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com", "aud": CLIENT_ID, "sub": "1234",
+            "iat": now, "exp": now + 600, "email_verified": True, **claims,
+        }
+        self.codes[code] = jwt.encode(payload, signing_key or self.keys[self.kid], algorithm="RS256",
+                                      headers={"kid": self.kid})
+
+    def jwks(self):
+        keys = []
+        for kid, key in self.keys.items():
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+            keys.append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+        return {"keys": keys}
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeOIDCHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path, self.client_address[1]))
+        self._json(200, self.server.jwks(), [("Cache-Control", "public, max-age=3600")])
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        self.server.requests.append(("POST", self.path, self.client_address[1]))
+        id_token = self.server.codes.get(form.get("code", [""])[0])
+        if form.get("client_id") != [CLIENT_ID] or id_token is None:
+            return self._json(400, {"error": "invalid_grant"})
+        self._json(200, {"access_token": "at", "id_token": id_token, "token_type": "Bearer"})
+
+
+@pytest.fixture
+def provider():
+    with FakeOIDCProvider() as server:
+        with override_settings(
+            GOOGLE_CLIENT_ID=CLIENT_ID, GOOGLE_CLIENT_SECRET="secret",
+            GOOGLE_TOKEN_URL=f"{server.url}/token", GOOGLE_JWKS_URL=f"{server.url}/certs",
+        ):
+            google_oidc.clear()
+            yield server
+            google_oidc.clear()
+
+
+def _start_login(client):
+    r = client.get("/api/auth/google/login/")
+    query = parse_qs(urlparse(r["Location"]).query)
+    return query["state"][0], query["nonce"][0]
+
+
+def _callback(client, state, code="c1"):
+    r = client.get("/api/auth/google/callback/", {"state": state, "code": code})
+    assert r.status_code == 302
+    return parse_qs(urlparse(r["Location"]).query)
+
+
+def test_callback_verifies_id_token_locally_and_caches_jwks(client, provider):
+    state, nonce = _start_login(client)
+    provider.issue_code("c1", email="g@ex.com", given_name="Gül", family_name="Kaya", nonce=nonce)
+
+    params = _callback(client, state)
+    assert params["email"] == ["g@ex.com"] and "access" in params
+    user = User.objects.get(email="g@ex.com")
+    assert (user.first_name, user.has_usable_password()) == ("Gül", False)
+
+    state, nonce = _start_login(client)
+    provider.issue_code("c2", email="g@ex.com", nonce=nonce)
+    assert "access" in _callback(client, state, code="c2")
+
+    # userinfo çağrısı yok; JWKS bir kez çekildi, token istekleri aynı bağlantıyı kullandı
+    assert [(m, p) for m, p, _ in provider.requests] == [("POST", "/token"), ("GET", "/certs"), ("POST", "/token")]
+    assert len({port for _, _, port in provider.requests}) == 1
+
+
+@pytest.mark.parametrize("bad", ["audience", "signature", "nonce", "unverified"])
+def test_invalid_id_tokens_are_rejected(client, provider, bad):
+    state, nonce = _start_login(client)
+    claims = {"email": "x@ex.com", "nonce": nonce}
+    if bad == "audience":
+        claims["aud"] = "someone-else"
+    elif bad == "nonce":
+        claims["nonce"] = "replayed"
+    elif bad == "unverified":
+        claims["email_verified"] = False
+    signing_key = rsa.generate_private_key(public_exponent=65537, key_size=2048) if bad == "signature" else None
+    provider.issue_code("c1", signing_key=signing_key, **claims)
+
+    params = _callback(client, state)
+    assert params["error"] == ["email_not_verified" if bad == "unverified" else "invalid_id_token"]
+    assert not User.objects.filter(email="x@ex.com").exists()
+
+
+def test_rotated_signing_key_triggers_jwks_refetch(client, provider):
+    state, nonce = _start_login(client)
+    provider.issue_code("c1", email="r@ex.com", nonce=nonce)
+    _callback(client, state)
+
+    provider.rotate_key()
+    google_oidc._fetched_at -= google_oidc.JWKS_MIN_REFRESH_SECONDS
+    state, nonce = _start_login(client)
+    provider.issue_code("c2", email="r@ex.com", nonce=nonce)
+    assert "access" in _callback(client, state, code="c2")
+    assert [p for m, p, _ in provider.requests if m == "GET"] == ["/certs", "/certs"]
+
+
+def test_async_callback_view(provider):
+    request = RequestFactory().get("/api/auth/google/callback/", {"state": "s1", "code": "c1"})
+    SessionMiddleware(lambda r: None).process_request(request)
+    request.session.update({"google_oauth_state": "s1", "google_oauth_nonce": "n1"})
+    provider.issue_code("c1", email="async@ex.com", nonce="n1")
+
+    response = async_to_sync(google_callback_async)(request)
+    assert response.status_code == 302
+    assert "access=" in response["Location"]
+    assert User.objects.filter(email="async@ex.com").exists()
@@ -0,0 +1,135 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from fitware.jobs import Job, JobQueue
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    """Testlere özel handler'lar; kayıt tablosu test sonunda eski haline döner"""
+    monkeypatch.setattr(JobQueue, "handlers", dict(JobQueue.handlers))
+    return JobQueue.handlers
+
+
+def test_jobs_run_by_priority_then_age(handlers):
+    seen = []
+    handlers["test.record"] = lambda name: seen.append(name)
+    JobQueue.enqueue("test.record", {"name": "low"}, kick=False)
+    JobQueue.enqueue("test.record", {"name": "high"}, priority=10, kick=False)
+    JobQueue.enqueue("test.record", {"name": "later"}, delay=datetime.timedelta(minutes=5), kick=False)
+
+    assert JobQueue.run_pending() == 2
+    assert seen == ["high", "low"]
+    done = Job.objects.filter(status="done")
+    assert done.count() == 2 and all(j.duration_ms is not None for j in done)
+    assert Job.objects.get(payload__name="later").status == "pending"
+
+
+def test_failed_job_retries_with_backoff_until_max_attempts(handlers):
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise RuntimeError("smtp down")
+
+    handlers["test.flaky"] = flaky
+    JobQueue.enqueue("test.flaky", max_attempts=2, kick=False)
+
+    assert JobQueue.run_pending() == 1
+    job = Job.objects.get()
+    assert (job.status, job.attempts, job.last_error) == ("pending", 1, "smtp down")
+    assert job.run_after >= timezone.now() + JobQueue.backoff(1) - datetime.timedelta(seconds=1)
+    # gecikme dolmadan tekrar alınmaz
+    assert JobQueue.run_pending() == 0
+
+    Job.objects.update(run_after=timezone.now())
+    JobQueue.run_pending()
+    job.refresh_from_db()
+    assert (job.status, job.attempts, len(calls)) == ("failed", 2, 2)
+    assert JobQueue.backoff(100) == datetime.timedelta(seconds=JobQueue.BACKOFF_MAX_SECONDS)
+
+
+def test_stale_running_jobs_are_requeued(handlers):
+    handlers["test.noop"] = lambda: None
+    JobQueue.enqueue("test.noop", kick=False)
+    JobQueue.claim(10)
+    Job.objects.update(started_at=timezone.now() - JobQueue.STALE_AFTER * 2)
+
+    assert JobQueue.requeue_stale() == 1
+    job = Job.objects.get()
+    assert job.status == "pending" and "Worker lost" in job.last_error
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_workers_drains_queue_concurrently(handlers, capsys):
+    handlers["test.noop"] = lambda i: None
+    for i in range(20):
+        JobQueue.enqueue("test.noop", {"i": i}, kick=False)
+
+    call_command("run_workers", "--once", "--concurrency", "3", "--batch-size", "4", "--sleep", "0.01")
+    assert Job.objects.filter(status="done").count() == 20
+    assert Job.objects.filter(attempts__gt=1).count() == 0
+
+    call_command("run_workers", "--stats")
+    out = capsys.readouterr().out
+    assert "Ran 20 jobs with 3 workers" in out
+    assert "test.noop" in out
+
+
+@pytest.mark.django_db(transaction=True)
+def test_non_atomic_handlers_run_outside_a_transaction(handlers):
+    from django.db import connection
+    seen = {}
+
+    @JobQueue.register("test.atomic")
+    def atomic_job():
+        seen["atomic"] = connection.in_atomic_block
+
+    @JobQueue.register("test.batches", atomic=False)
+    def batched_job():
+        seen["batches"] = connection.in_atomic_block
+
+    JobQueue.enqueue("test.atomic", kick=False)
+    JobQueue.enqueue("test.batches", kick=False)
+    assert JobQueue.run_pending() == 2
+    assert seen == {"atomic": True, "batches": False}
+
+
+def test_prune_jobs_removes_only_old_finished_jobs(handlers, capsys):
+    handlers["test.noop"] = lambda i: None
+    for i in range(4):
+        JobQueue.enqueue("test.noop", {"i": i}, kick=False)
+    JobQueue.claim(3)
+    old = timezone.now() - datetime.timedelta(days=30)
+    Job.objects.filter(status="running").update(status="done", finished_at=old)
+    Job.objects.filter(payload__i=2).update(status="failed")
+    Job.objects.filter(payload__i=1).update(finished_at=timezone.now())
+
+    call_command("prune_jobs", "--batch-size", "1")
+    assert "Removed 2 jobs" in capsys.readouterr().out
+    assert sorted(Job.objects.values_list("payload__i", "status")) == [(1, "done"), (3, "pending")]
+
+
+def test_status_writes_retry_while_sqlite_table_is_locked(handlers, monkeypatch):
+    from django.db import OperationalError
+    from django.db.models import QuerySet
+
+    handlers["test.noop"] = lambda: None
+    JobQueue.enqueue("test.noop", kick=False)
+    update = QuerySet.update
+    locked = [2]
+
+    def flaky_update(self, **kwargs):
+        if kwargs.get("status") == "done" and locked[0]:
+            locked[0] -= 1
+            raise OperationalError("database table is locked: fitware_job")
+        return update(self, **kwargs)
+
+    monkeypatch.setattr(QuerySet, "update", flaky_update)
+    assert JobQueue.run_pending() == 1
+    assert Job.objects.get().status == "done" and locked == [0]
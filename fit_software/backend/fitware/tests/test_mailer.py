@@ -0,0 +1,216 @@
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from fitware.jobs import Job
+from fitware.mailer import MailQueue, OutgoingEmail, mail_sender
+
+pytestmark = pytest.mark.django_db
+
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    """Yerel SMTP taklidi: bağlantı sayısını ve alınan mesajları tutar"""
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, port=0):
+        super().__init__(("127.0.0.1", port), SMTPStubHandler)
+        self.connections = 0
+        self.messages = []
+        self.reject = set()
+        self.sockets = []
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+    def stop(self):
+        """Sunucuyu kapatır ve açık istemci bağlantılarını sunucu tarafında koparır"""
+        self.__exit__()
+        for sock in self.sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.server.sockets.append(self.connection)
+        self.reply("220 stub ready")
+        rcpt = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            cmd = line.split(" ", 1)[0].upper()
+            if cmd in ("EHLO", "HELO"):
+                self.reply("250 stub")
+            elif cmd == "MAIL":
+                rcpt = []
+                self.reply("250 OK")
+            elif cmd == "RCPT":
+                address = line.split(":", 1)[1].strip("<> ")
+                if address in self.server.reject:
+                    self.reply("550 no such user")
+                else:
+                    rcpt.append(address)
+                    self.reply("250 OK")
+            elif cmd == "DATA":
+                self.reply("354 end with .")
+                data = []
+                while (chunk := self.rfile.readline()) not in (b".\r\n", b""):
+                    data.append(chunk.decode())
+                self.server.messages.append((rcpt, "".join(data)))
+                self.reply("250 queued")
+            elif cmd == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture
+def smtp_stub():
+    with SMTPStub() as server:
+        with override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1", EMAIL_PORT=server.server_address[1],
+            EMAIL_USE_TLS=False, EMAIL_HOST_USER="", EMAIL_HOST_PASSWORD="",
+        ):
+            yield server
+            mail_sender.close()
+
+
+def test_reset_request_only_queues_mail(api_client, mailoutbox):
+    User.objects.create_user(username="a@b.com", email="a@b.com", password="XyZ12345!!")
+    r1 = api_client.post("/api/v1/auth/password/reset/", {"email": "a@b.com"}, format="json")
+    r2 = api_client.post("/api/v1/auth/password/reset/", {"email": "nobody@b.com"}, format="json")
+
+    assert r1.data == r2.data and r1.status_code == r2.status_code == 200
+    # istek içinde gönderim yok; tek flush işi kuyrukta
+    assert mailoutbox == []
+    assert list(OutgoingEmail.objects.values_list("to_email", "status")) == [("a@b.com", "pending")]
+    assert Job.objects.filter(kind=MailQueue.FLUSH_JOB, status="pending").count() == 1
+
+
+def test_flush_reuses_one_smtp_connection_across_batches(smtp_stub):
+    for i in range(5):
+        MailQueue.queue(to=f"u{i}@ex.com", subject="Hi", body=f"body {i}")
+
+    assert MailQueue.flush(batch_size=2) == (5, 0)
+    MailQueue.queue(to="late@ex.com", subject="Hi", body="late")
+    assert MailQueue.flush() == (1, 0)
+
+    assert smtp_stub.connections == 1
+    assert [rcpt for rcpt, _ in smtp_stub.messages] == [[f"u{i}@ex.com"] for i in range(5)] + [["late@ex.com"]]
+    assert OutgoingEmail.objects.filter(status="sent", sent_at__isnull=False).count() == 6
+
+
+def test_rejected_recipient_is_retried_without_dropping_connection(smtp_stub):
+    smtp_stub.reject.add("bad@ex.com")
+    MailQueue.queue(to="bad@ex.com", subject="Hi", body="x")
+    MailQueue.queue(to="ok@ex.com", subject="Hi", body="y")
+
+    assert MailQueue.flush() == (1, 1)
+    bad = OutgoingEmail.objects.get(to_email="bad@ex.com")
+    assert (bad.status, bad.attempts) == ("pending", 1)
+    assert "no such user" in bad.last_error
+    # geri çekilen e-posta vadesi gelene kadar alınmaz
+    assert MailQueue.flush() == (0, 0)
+    assert MailQueue.next_retry_at() == bad.available_at
+    assert smtp_stub.connections == 1
+
+
+def test_sender_reconnects_after_server_restart(smtp_stub):
+    MailQueue.queue(to="a@ex.com", subject="Hi", body="x")
+    assert MailQueue.flush() == (1, 0)
+    cached = mail_sender._connection
+    assert cached is not None
+
+    # Aynı portta yeniden başlatma: ayarlar değişmez, önbellekteki bağlantı ölü kalır
+    smtp_stub.stop()
+    with SMTPStub(port=smtp_stub.server_address[1]) as restarted:
+        MailQueue.queue(to="b@ex.com", subject="Hi", body="y")
+        assert mail_sender._connection is cached
+        assert MailQueue.flush() == (1, 0)
+        assert mail_sender._connection is not cached
+        assert restarted.connections == 1
+        assert [rcpt for rcpt, _ in restarted.messages] == [["b@ex.com"]]
+    assert smtp_stub.connections == 1
+
+
+@override_settings(EMAIL_RATE_PER_SECOND=20)
+def test_sender_rate_limits_messages(mailoutbox):
+    for i in range(4):
+        MailQueue.queue(to=f"u{i}@ex.com", subject="Hi", body="x")
+    started = time.monotonic()
+    assert MailQueue.flush() == (4, 0)
+    # 20/s: ilk mesaj hemen, sonraki üçü 50ms arayla
+    assert time.monotonic() - started >= 0.14
+    assert len(mailoutbox) == 4
+
+
+def test_finished_mail_bodies_are_blanked_and_old_rows_pruned(smtp_stub, capsys):
+    import datetime
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    smtp_stub.reject.add("bad@ex.com")
+    MailQueue.queue(to="ok@ex.com", subject="Reset", body="https://ex.com/reset/secret-token")
+    MailQueue.queue(to="bad@ex.com", subject="Reset", body="https://ex.com/reset/other-token")
+    MailQueue.flush()
+    assert OutgoingEmail.objects.get(to_email="ok@ex.com").body == ""
+    # tekrar denenecek e-postanın gövdesi korunur, kalıcı hatada silinir
+    assert OutgoingEmail.objects.get(to_email="bad@ex.com").body.endswith("other-token")
+    OutgoingEmail.objects.filter(to_email="bad@ex.com").update(
+        attempts=MailQueue.MAX_ATTEMPTS - 1, available_at=timezone.now(),
+    )
+    MailQueue.flush()
+    assert list(OutgoingEmail.objects.order_by("pk").values_list("status", "body")) == [("sent", ""), ("failed", "")]
+
+    MailQueue.queue(to="new@ex.com", subject="Hi", body="pending")
+    OutgoingEmail.objects.update(created_at=timezone.now() - datetime.timedelta(days=40))
+    call_command("prune_mail", "--batch-size", "1")
+    assert "Removed 2 emails" in capsys.readouterr().out
+    # bekleyen e-posta süresi geçse de silinmez
+    assert list(OutgoingEmail.objects.values_list("to_email", flat=True)) == ["new@ex.com"]
+
+
+def test_admin_does_not_show_mail_body(admin_client):
+    MailQueue.queue(to="a@ex.com", subject="Reset", body="https://ex.com/reset/secret-token")
+    email = OutgoingEmail.objects.get()
+    r = admin_client.get(f"/admin/fitware/outgoingemail/{email.pk}/change/")
+    assert r.status_code == 200
+    assert b"secret-token" not in r.content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_flush_commits_each_batch_outside_smtp(monkeypatch):
+    from django.db import connection
+
+    seen = []
+
+    def send(messages):
+        # SMTP sırasında açık transaction yok; claim commit edilmiş durumda
+        seen.append((connection.in_atomic_block, OutgoingEmail.objects.filter(status="sending").count()))
+        return [None] * len(messages)
+
+    monkeypatch.setattr(mail_sender, "send", send)
+    # queue() commit sonrası flush işini başlatır; satırlar doğrudan yazılır
+    OutgoingEmail.objects.bulk_create([OutgoingEmail(to_email=f"u{i}@ex.com", subject="Hi", body="x") for i in range(3)])
+    assert MailQueue.flush(batch_size=2) == (3, 0)
+    assert seen == [(False, 2), (False, 1)]
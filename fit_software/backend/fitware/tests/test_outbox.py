@@ -0,0 +1,184 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from fitware.outbox import EventOutbox, OutboxEvent
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def subscribers(monkeypatch):
+    """Testlere özel handler'lar; kayıt tablosu test sonunda eski haline döner"""
+    monkeypatch.setattr(EventOutbox, "handlers", {})
+    return EventOutbox.handlers
+
+
+def test_events_are_fanned_out_in_id_order_per_topic_run(subscribers):
+    calls = []
+
+    def on_a(payloads):
+        calls.append(("a", [p["n"] for p in payloads]))
+
+    def on_b1(payloads):
+        calls.append(("b1", len(payloads)))
+
+    def on_b2(payloads):
+        calls.append(("b2", len(payloads)))
+
+    subscribers["a"] = [on_a]
+    subscribers["b"] = [on_b1, on_b2]
+    EventOutbox.publish_many("a", [{"n": 1}, {"n": 2}])
+    EventOutbox.publish("b", {"n": 3})
+    EventOutbox.publish("a", {"n": 4})
+
+    assert EventOutbox.dispatch() == 4
+    # topic'ler arası id sırası korunur; ardışık aynı topic'li olaylar tek grup
+    assert calls == [("a", [1, 2]), ("b1", 1), ("b2", 1), ("a", [4])]
+    assert not OutboxEvent.objects.filter(processed_at__isnull=True).exists()
+    assert EventOutbox.dispatch() == 0
+
+
+def test_only_failed_handlers_are_retried_and_replayed(subscribers):
+    state = {"fail": True, "seen": [], "logged": []}
+
+    def flaky(payloads):
+        if state["fail"]:
+            raise RuntimeError("downstream unavailable")
+        state["seen"].extend(p["n"] for p in payloads)
+
+    def log(payloads):
+        state["logged"].extend((p["n"], p["event_id"]) for p in payloads)
+
+    subscribers["t"] = [log, flaky]
+    EventOutbox.publish("t", {"n": 1})
+
+    EventOutbox.dispatch()
+    failed = OutboxEvent.objects.get(topic="t")
+    assert failed.processed_at is None and failed.attempts == 1 and "downstream" in failed.last_error
+    assert failed.delivered_to == [EventOutbox.handler_key(log)]
+    # gecikme dolmadan tekrar denenmez
+    assert EventOutbox.dispatch() == 0
+
+    state["fail"] = False
+    call_command("dispatch_outbox", "--replay", "--topic", "t")
+    call_command("dispatch_outbox", "--replay", "--topic", "t")
+    # başarılı handler ne tekrar denemede ne replay'de yeniden çalışır
+    assert state["seen"] == [1]
+    assert state["logged"] == [(1, failed.pk)]
+    assert not OutboxEvent.objects.filter(processed_at__isnull=True).exists()
+
+    # açıkça istenirse tek handler yeniden çalıştırılır
+    call_command("dispatch_outbox", "--replay", "--handler", EventOutbox.handler_key(log))
+    assert state["logged"] == [(1, failed.pk), (1, failed.pk)]
+    assert state["seen"] == [1]
+
+
+def test_backed_off_events_reschedule_dispatch_and_dead_events_are_reported(subscribers, capsys):
+    import datetime
+    from django.utils import timezone
+    from fitware.jobs import Job, JobQueue
+
+    def broken(payloads):
+        raise RuntimeError("boom")
+
+    subscribers["t"] = [broken]
+    EventOutbox.publish("t", {"n": 1})
+    Job.objects.all().delete()
+
+    JobQueue.handlers[EventOutbox.DISPATCH_JOB]()
+    event = OutboxEvent.objects.get()
+    job = Job.objects.get(kind=EventOutbox.DISPATCH_JOB, status="pending")
+    # tekrar deneme, olayın vadesi geldiğinde çalışacak şekilde planlandı
+    assert abs(job.run_after - event.available_at) < datetime.timedelta(seconds=2)
+
+    OutboxEvent.objects.update(attempts=EventOutbox.MAX_ATTEMPTS, available_at=timezone.now())
+    assert EventOutbox.dispatch() == 0
+    call_command("dispatch_outbox")
+    assert "1 dead events" in capsys.readouterr().out
+    call_command("dispatch_outbox", "--dead")
+    assert "t: 1 dead" in capsys.readouterr().out and "boom" in event.last_error
+
+    subscribers["t"] = [lambda payloads: None]
+    call_command("dispatch_outbox", "--retry-dead")
+    assert OutboxEvent.objects.get().processed_at is not None
+
+
+def test_stale_challenge_event_does_not_overwrite_newer_goal_value(auth_client):
+    from django.apps import apps
+    Goal = apps.get_model("fitware", "Goal")
+    ChallengeJoined = apps.get_model("fitware", "ChallengeJoined")
+    auth_client.post("/api/challenges/", {"title": "Row", "description": "", "target_value": 100, "unit": "km"}, format="json")
+    join = ChallengeJoined.objects.get(challenge__title="Row")
+
+    # challenge ilerlemesi (olay henüz işlenmedi), ardından goal doğrudan daha yeni bir değerle güncellenir
+    auth_client.post(f"/api/challenges/{join.challenge_id}/update-progress/", {"progress_value": 30}, format="json")
+    auth_client.post(f"/api/goals/{join.goal_id}/update-progress/", {"current_value": 50}, format="json")
+
+    EventOutbox.dispatch()
+    assert Goal.objects.get(pk=join.goal_id).current_value == 50
+    join.refresh_from_db()
+    assert join.progress_value == 50
+
+    # replay de eski değeri geri yazmaz
+    call_command("dispatch_outbox", "--replay", "--handler", "fitware.outbox.sync_challenge_goals")
+    assert Goal.objects.get(pk=join.goal_id).current_value == 50
+
+
+def test_goal_completion_side_effects_run_after_commit(auth_client, django_capture_on_commit_callbacks):
+    from django.apps import apps
+    Goal = apps.get_model("fitware", "Goal")
+    ActivityLog = apps.get_model("fitware", "ActivityLog")
+    user = User.objects.get(email="testuser@example.com")
+    goal = Goal.objects.create(user=user, title="Run", target_value=5, unit="km")
+
+    # commit olmadan: olay yazıldı ama işlenmedi
+    auth_client.post(f"/api/goals/{goal.id}/update-progress/", {"current_value": 5}, format="json")
+    event = OutboxEvent.objects.get(topic="goal_progress")
+    assert event.payload == {"goal_id": goal.id, "user_id": user.pk, "value": 5.0, "unit": "km", "completed": True}
+    assert not ActivityLog.objects.filter(user=user, action_type="goal_completed").exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        auth_client.post(f"/api/goals/{goal.id}/update-progress/", {"current_value": 6}, format="json")
+    assert not OutboxEvent.objects.filter(processed_at__isnull=True).exists()
+    assert ActivityLog.objects.filter(user=user, action_type="goal_completed").count() == 1
+
+
+def test_stale_goal_event_does_not_overwrite_newer_profile_weight(auth_client):
+    from django.apps import apps
+    Goal = apps.get_model("fitware", "Goal")
+    Profile = apps.get_model("fitware", "Profile")
+    user = User.objects.get(email="testuser@example.com")
+    profile = Profile.objects.create(user=user, height=180, weight=90)
+    goal = Goal.objects.create(user=user, title="Cut", target_value=80, unit="kg", icon="📉", current_value=90)
+
+    # goal olayı işlenmeden profil daha yeni bir ağırlıkla güncellenir
+    auth_client.post(f"/api/goals/{goal.pk}/update-progress/", {"current_value": 88}, format="json")
+    auth_client.patch(f"/api/profile/{profile.pk}/", {"weight": 86}, format="json")
+
+    EventOutbox.dispatch()
+    profile.refresh_from_db()
+    goal.refresh_from_db()
+    assert (profile.weight, goal.current_value) == (86, 86)
+    assert profile.weight_updated_at is not None
+
+    # replay de eski değeri geri yazmaz
+    call_command("dispatch_outbox", "--replay", "--handler", "fitware.outbox.sync_goal_profile_weight")
+    profile.refresh_from_db()
+    assert profile.weight == 86
+
+
+def test_prune_outbox_removes_only_old_processed_events(subscribers, capsys):
+    import datetime
+    from django.utils import timezone
+
+    subscribers["t"] = [lambda payloads: None]
+    EventOutbox.publish_many("t", [{"n": i} for i in range(4)])
+    EventOutbox.dispatch()
+    EventOutbox.publish("t", {"n": 4})
+    old = timezone.now() - datetime.timedelta(days=30)
+    OutboxEvent.objects.filter(payload__n__in=[0, 1, 2]).update(processed_at=old)
+
+    call_command("prune_outbox", "--batch-size", "2")
+    assert "Removed 3 events" in capsys.readouterr().out
+    assert sorted(OutboxEvent.objects.values_list("payload__n", flat=True)) == [3, 4]
@@ -0,0 +1,320 @@
+import datetime
+
+import pytest
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = pytest.mark.django_db
+
+
+def _get_models():
+    Goal = apps.get_model("fitware", "Goal")
+    GoalProgressEvent = apps.get_model("fitware", "GoalProgressEvent")
+    return Goal, GoalProgressEvent
+
+
+def _create_goal(client, **overrides):
+    payload = {"title": "Run", "target_value": 100, "unit": "km", "current_value": 0}
+    payload.update(overrides)
+    r = client.post("/api/goals/", payload, format="json")
+    assert r.status_code in (200, 201), r.data
+    return r.data["id"]
+
+
+# -----------------------
+# PROGRESS HISTORY
+# -----------------------
+
+def test_update_progress_appends_history_event(auth_client):
+    _, GoalProgressEvent = _get_models()
+    goal_id = _create_goal(auth_client)
+
+    for value in (10, 25):
+        r = auth_client.post(f"/api/goals/{goal_id}/update-progress/", {"current_value": value}, format="json")
+        assert r.status_code == 200
+
+    events = GoalProgressEvent.objects.filter(goal_id=goal_id).order_by("recorded_at", "id")
+    assert [e.value for e in events] == [10, 25]
+    assert {e.source for e in events} == {"goal"}
+
+    r = auth_client.get(f"/api/goals/{goal_id}/history/", format="json")
+    assert r.status_code == 200
+    assert r.data["bucket"] == "raw"
+    assert [p["value"] for p in r.data["points"]] == [10, 25]
+
+
+def test_history_is_downsampled_server_side(auth_client):
+    Goal, GoalProgressEvent = _get_models()
+    goal_id = _create_goal(auth_client)
+    start = timezone.now() - datetime.timedelta(days=10)
+    GoalProgressEvent.objects.bulk_create([
+        GoalProgressEvent(goal_id=goal_id, value=i, recorded_at=start + datetime.timedelta(minutes=48 * i))
+        for i in range(300)
+    ])
+
+    r = auth_client.get(f"/api/goals/{goal_id}/history/?points=50", format="json")
+    assert r.status_code == 200
+    assert r.data["bucket"] == "day"
+    assert 10 <= len(r.data["points"]) <= 11
+    assert sum(p["count"] for p in r.data["points"]) == 300
+
+    r2 = auth_client.get(f"/api/goals/{goal_id}/history/?bucket=fortnight", format="json")
+    assert r2.status_code == 400
+
+
+def test_challenge_progress_sync_records_challenge_event(auth_client, django_capture_on_commit_callbacks):
+    _, GoalProgressEvent = _get_models()
+    auth_client.post("/api/challenges/", {"title": "Laps", "description": "", "target_value": 20, "unit": "laps"}, format="json")
+    challenge_id = auth_client.get("/api/challenges/", format="json").data[0]["id"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        r = auth_client.post(f"/api/challenges/{challenge_id}/update-progress/", {"progress_value": 5}, format="json")
+    assert r.status_code == 200
+    assert GoalProgressEvent.objects.filter(source="challenge", value=5).count() == 1
+
+
+def test_compact_progress_events_keeps_last_value_per_day():
+    Goal, GoalProgressEvent = _get_models()
+    user = User.objects.create_user(username="h@ex.com", email="h@ex.com", password="x")
+    goal = Goal.objects.create(user=user, title="Bench", target_value=100, unit="kg")
+
+    old_day = timezone.now() - datetime.timedelta(days=120)
+    events = []
+    for day in range(2):
+        for hour in range(3):
+            t = old_day.replace(hour=9) + datetime.timedelta(days=day, hours=hour)
+            events.append(GoalProgressEvent(goal=goal, value=day * 10 + hour, recorded_at=t))
+    events.append(GoalProgressEvent(goal=goal, value=99))  # yeni kayıt, dokunulmaz
+    GoalProgressEvent.objects.bulk_create(events)
+
+    call_command("compact_progress_events", "--days", "90")
+
+    remaining = GoalProgressEvent.objects.filter(goal=goal).order_by("recorded_at")
+    assert [e.value for e in remaining] == [2, 12, 99]
+    assert [e.is_daily for e in remaining] == [True, True, False]
+
+
+# -----------------------
+# PROGRESS ANNOTATIONS
+# -----------------------
+
+@pytest.mark.parametrize("start,current,target", [
+    (0, 5, 10), (0, 0, 10), (0, 12, 10), (2, 1, 10),
+    (80, 75, 70), (80, 69, 70), (80, 85, 70),
+    (5, 5, 5), (5, 4, 5), (0, 1, 3),
+])
+def test_progress_annotation_matches_python_property(start, current, target):
+    Goal, _ = _get_models()
+    from fitware.goals import annotate_progress
+    user = User.objects.create_user(username="p@ex.com", email="p@ex.com", password="x")
+    goal = Goal.objects.create(user=user, title="T", start_value=start, current_value=current, target_value=target)
+    python_progress, python_remaining = goal.progress, goal.remaining
+
+    annotated = annotate_progress(Goal.objects.filter(pk=goal.pk)).get()
+    assert annotated.annotated_progress == pytest.approx(python_progress)
+    assert annotated.annotated_remaining == pytest.approx(python_remaining)
+
+
+def test_goal_list_orders_and_filters_by_progress(auth_client):
+    ids = {}
+    # start_value yeni kayıtta current'a eşitlenir; ilerlemeyi update-progress ile ver
+    for title, current in [("mid", 50), ("low", 5), ("high", 95)]:
+        ids[title] = _create_goal(auth_client, title=title, current_value=0)
+        auth_client.post(f"/api/goals/{ids[title]}/update-progress/", {"current_value": current}, format="json")
+
+    r = auth_client.get("/api/goals/?ordering=-progress", format="json")
+    assert r.status_code == 200
+    assert [g["title"] for g in r.data] == ["high", "mid", "low"]
+    assert r.data[0]["progress"] == 95.0
+
+    r = auth_client.get("/api/goals/active/?max_progress=10", format="json")
+    assert [g["title"] for g in r.data] == ["low"]
+
+    r = auth_client.get("/api/goals/?min_progress=40&ordering=progress&page_size=1", format="json")
+    assert r.data["count"] == 2
+    assert [g["title"] for g in r.data["results"]] == ["mid"]
+
+    r = auth_client.get("/api/goals/?ordering=banana", format="json")
+    assert r.status_code == 400
+
+
+def test_update_progress_response_is_not_stale(auth_client):
+    goal_id = _create_goal(auth_client, start_value=0, current_value=0, target_value=10)
+    r = auth_client.post(f"/api/goals/{goal_id}/update-progress/", {"current_value": 4}, format="json")
+    assert r.data["goal"]["progress"] == 40.0
+    assert r.data["goal"]["remaining"] == 6.0
+
+
+# -----------------------
+# BULK PROGRESS UPDATE
+# -----------------------
+
+def test_bulk_update_progress_applies_all_in_one_request(auth_client, monkeypatch, django_capture_on_commit_callbacks):
+    Goal, GoalProgressEvent = _get_models()
+    Profile = apps.get_model("fitware", "Profile")
+    calls = []
+    monkeypatch.setattr("fitware.badges.BadgeService.check_milestone_badges", lambda user_id: calls.append(user_id))
+
+    user = User.objects.get(email="testuser@example.com")
+    Profile.objects.create(user=user, height=180, weight=90)
+    a = _create_goal(auth_client, title="A", target_value=10, unit="workouts")
+    b = _create_goal(auth_client, title="B", target_value=5, unit="workouts")
+    w = _create_goal(auth_client, title="W", target_value=200, unit="lbs", icon="📉")
+    # kg/lbs cinsinden ama vücut ağırlığı olmayan goal profile yazılmaz
+    bench = _create_goal(auth_client, title="Bench", target_value=100, unit="kg", icon="💪")
+
+    payload = {"updates": [
+        {"goal_id": a, "current_value": 10},
+        {"goal_id": b, "current_value": 5},
+        {"goal_id": w, "current_value": 180},
+        {"goal_id": bench, "current_value": 60},
+    ]}
+    with django_capture_on_commit_callbacks(execute=True):
+        r = auth_client.post("/api/goals/bulk-update-progress/", payload, format="json")
+    assert r.status_code == 200, r.data
+    assert r.data["updated"] == 4
+    assert sorted(r.data["completed"]) == sorted([a, b])
+
+    assert Goal.objects.get(pk=a).is_completed and Goal.objects.get(pk=b).is_completed
+    assert GoalProgressEvent.objects.filter(goal_id__in=[a, b, w]).count() == 3
+    # badge kontrolü kullanıcı başına bir kez
+    assert calls == [user.pk]
+    # lbs → kg
+    assert Profile.objects.get(user=user).weight == pytest.approx(180 * 0.453592)
+
+
+def test_bulk_update_progress_syncs_linked_challenges(auth_client, django_capture_on_commit_callbacks):
+    ChallengeJoined = apps.get_model("fitware", "ChallengeJoined")
+    for title in ("C1", "C2"):
+        auth_client.post("/api/challenges/", {"title": title, "description": "", "target_value": 10, "unit": "km"}, format="json")
+    joins = list(ChallengeJoined.objects.filter(user__email="testuser@example.com"))
+
+    payload = {"updates": [{"goal_id": joins[0].goal_id, "current_value": 10},
+                           {"goal_id": joins[1].goal_id, "current_value": 4}]}
+    with django_capture_on_commit_callbacks(execute=True):
+        r = auth_client.post("/api/goals/bulk-update-progress/", payload, format="json")
+    assert r.status_code == 200
+
+    for cj, value, done in zip(joins, (10, 4), (True, False)):
+        cj.refresh_from_db()
+        assert cj.progress_value == value
+        assert cj.is_completed is done
+
+
+def test_bulk_update_progress_rejects_unknown_goals_atomically(auth_client):
+    Goal, _ = _get_models()
+    own = _create_goal(auth_client, title="Mine")
+    r = auth_client.post("/api/goals/bulk-update-progress/",
+                         {"updates": [{"goal_id": own, "current_value": 3},
+                                      {"goal_id": 999999, "current_value": 1}]}, format="json")
+    assert r.status_code == 400
+    assert r.data["goal_ids"] == [999999]
+    assert Goal.objects.get(pk=own).current_value == 0
+
+
+# -----------------------
+# PROFILE WEIGHT PROPAGATION
+# -----------------------
+
+def test_profile_weight_propagates_to_kg_and_lbs_goals_in_constant_queries(
+        auth_client, django_assert_max_num_queries, django_capture_on_commit_callbacks):
+    Goal, GoalProgressEvent = _get_models()
+    Profile = apps.get_model("fitware", "Profile")
+    BodyMetric = apps.get_model("fitware", "BodyMetric")
+    user = User.objects.get(email="testuser@example.com")
+    profile = Profile.objects.create(user=user, height=180, weight=90)
+    goals = [Goal.objects.create(user=user, title=f"G{i}", target_value=80, unit="kg", icon="📉") for i in range(5)]
+    lbs = Goal.objects.create(user=user, title="L", target_value=170, unit="lbs", icon="📈")
+    other = Goal.objects.create(user=user, title="Run", target_value=10, unit="km", current_value=3)
+    bench = Goal.objects.create(user=user, title="Bench", target_value=120, unit="kg", icon="💪", current_value=100)
+
+    from fitware.profile import sync_weight_to_goals
+    with django_assert_max_num_queries(4):
+        sync_weight_to_goals(user.pk, 85)
+
+    for g in goals:
+        g.refresh_from_db()
+        assert g.current_value == 85
+    lbs.refresh_from_db()
+    assert lbs.current_value == pytest.approx(round(85 / 0.453592, 1))
+    other.refresh_from_db()
+    bench.refresh_from_db()
+    assert (other.current_value, bench.current_value) == (3, 100)
+
+    assert GoalProgressEvent.objects.filter(source="profile").count() == 6
+    point = BodyMetric.objects.get(user=user)
+    assert (point.metric, point.value, point.source) == ("weight", 85, "profile")
+
+    # API üzerinden: profile_weight_changed olayı commit sonrası goal'lere yayılır
+    with django_capture_on_commit_callbacks(execute=True):
+        r = auth_client.patch(f"/api/profile/{profile.id}/", {"weight": 84}, format="json")
+    assert r.status_code == 200
+    assert BodyMetric.objects.filter(user=user, metric="weight").count() == 2
+    goals[0].refresh_from_db()
+    assert goals[0].current_value == 84
+
+
+# -----------------------
+# BODY METRICS
+# -----------------------
+
+def test_goal_progress_records_body_metrics_in_kg(auth_client):
+    BodyMetric = apps.get_model("fitware", "BodyMetric")
+    lbs = _create_goal(auth_client, title="W", target_value=150, unit="lbs", icon="📉")
+    fat = _create_goal(auth_client, title="F", target_value=15, unit="fav", icon="⚖️")
+    run = _create_goal(auth_client, title="R", target_value=10, unit="km", icon="🏃")
+    bench = _create_goal(auth_client, title="Bench press", target_value=100, unit="kg", icon="💪")
+
+    r = auth_client.post("/api/goals/bulk-update-progress/", {"updates": [
+        {"goal_id": lbs, "current_value": 200},
+        {"goal_id": fat, "current_value": 18},
+        {"goal_id": run, "current_value": 3},
+        {"goal_id": bench, "current_value": 80},
+    ]}, format="json")
+    assert r.status_code == 200, r.data
+
+    # kg cinsinden kuvvet hedefi ağırlık serisine girmez
+    points = {p.metric: p for p in BodyMetric.objects.filter(source="goal")}
+    assert set(points) == {"weight", "body_fat"}
+    assert BodyMetric.objects.filter(source="goal", metric="weight").count() == 1
+    assert points["weight"].value == pytest.approx(200 * 0.453592, abs=0.01)
+    assert points["body_fat"].value == 18
+
+
+def test_body_metrics_range_downsampling_and_trend(auth_client):
+    BodyMetric = apps.get_model("fitware", "BodyMetric")
+    user = User.objects.get(email="testuser@example.com")
+    start = timezone.now() - datetime.timedelta(days=20)
+    BodyMetric.objects.bulk_create([
+        BodyMetric(user=user, metric="weight", value=90 - day * 0.5, recorded_at=start + datetime.timedelta(days=day, hours=h))
+        for day in range(20) for h in (0, 6)
+    ])
+    BodyMetric.objects.create(user=user, metric="waist", value=85)
+
+    r = auth_client.get("/api/body-metrics/?metric=weight&points=25", format="json")
+    assert r.status_code == 200
+    assert r.data["bucket"] == "day"
+    assert sum(p["count"] for p in r.data["points"]) == 40
+
+    r = auth_client.get("/api/body-metrics/trend/?metric=weight&window=7", format="json")
+    assert r.status_code == 200
+    points = r.data["points"]
+    assert len(points) == 20
+    assert points[0]["trend"] == points[0]["value"]
+    # 7 günlük pencere: son 7 günlük ortalamanın ortalaması
+    assert points[-1]["trend"] == pytest.approx(sum(p["value"] for p in points[-7:]) / 7, abs=0.01)
+
+    assert auth_client.get("/api/body-metrics/?metric=shoe", format="json").status_code == 400
+
+
+def test_manual_body_metric_entry_and_profile_height(auth_client):
+    BodyMetric = apps.get_model("fitware", "BodyMetric")
+    r = auth_client.post("/api/body-metrics/", {"metric": "waist", "value": 82.5}, format="json")
+    assert r.status_code == 201, r.data
+    assert r.data["source"] == "manual"
+
+    r = auth_client.post("/api/profile/", {"height": 180, "weight": 80}, format="json")
+    assert r.status_code == 201, r.data
+    assert set(BodyMetric.objects.filter(source="profile").values_list("metric", "value")) == {("height", 180), ("weight", 80)}
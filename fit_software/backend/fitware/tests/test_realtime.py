@@ -0,0 +1,203 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from django.apps import apps
+
+from fitware.realtime import ChallengeStreamApp, InProcessBackend, ProgressBroker, challenge_channel
+
+
+def _joined(challenge_id, user_id, value, target=10):
+    """ProgressBroker'ın okuduğu alanlara sahip hafif bir ChallengeJoined yerine geçen nesne"""
+    return SimpleNamespace(
+        challenge=SimpleNamespace(pk=challenge_id),
+        user_id=user_id,
+        user=SimpleNamespace(first_name="", last_name="", username=f"u{user_id}", email=""),
+        progress_value=value,
+        progress_percent=min(100, value / target * 100),
+        is_completed=value >= target,
+    )
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append((channel, message))
+
+
+# -----------------------
+# BROKER
+# -----------------------
+
+def test_broker_coalesces_updates_per_challenge():
+    backend = RecordingBackend()
+    broker = ProgressBroker(backend=backend, interval=60)
+
+    broker.publish_progress(_joined(1, 7, 3), 0)
+    broker.publish_progress(_joined(1, 7, 5), 3)
+    broker.publish_progress(_joined(1, 8, 2), 0)
+    broker.publish_progress(_joined(2, 7, 1), 0)
+    assert backend.messages == []  # aralık dolmadan yayın yok
+
+    assert broker.flush() == 2
+    by_channel = dict(backend.messages)
+    updates = {u["user_id"]: u for u in by_channel[challenge_channel(1)]["updates"]}
+    assert updates[7]["progress_value"] == 5 and updates[7]["delta"] == 5
+    assert updates[8]["delta"] == 2
+    assert len(by_channel[challenge_channel(2)]["updates"]) == 1
+
+
+def test_broker_flushes_after_interval():
+    backend = RecordingBackend()
+    broker = ProgressBroker(backend=backend, interval=0.05)
+    published = threading.Event()
+    backend.publish = lambda channel, message: (RecordingBackend.publish(backend, channel, message), published.set())
+
+    broker.publish_progress(_joined(3, 1, 4), 0)
+    broker.publish_progress(_joined(3, 1, 6), 4)
+    assert published.wait(2)
+    assert len(backend.messages) == 1
+    assert backend.messages[0][1]["updates"][0]["delta"] == 6
+
+
+@pytest.mark.django_db
+def test_challenge_progress_update_publishes_delta(auth_client, monkeypatch, django_capture_on_commit_callbacks):
+    from fitware.realtime import get_broker
+    backend = RecordingBackend()
+    monkeypatch.setattr(get_broker(), "backend", backend)
+    Challenge = apps.get_model("fitware", "Challenge")
+
+    auth_client.post("/api/challenges/", {"title": "Live", "description": "", "target_value": 10, "unit": "km"}, format="json")
+    challenge = Challenge.objects.get(title="Live")
+    with django_capture_on_commit_callbacks(execute=True):
+        r = auth_client.post(f"/api/challenges/{challenge.id}/update-progress/", {"progress_value": 4}, format="json")
+    assert r.status_code == 200
+
+    channel, message = backend.messages[-1]
+    assert channel == challenge_channel(challenge.id)
+    assert message["updates"][0]["delta"] == 4
+    assert message["updates"][0]["progress_percent"] == 40
+
+
+# -----------------------
+# ASGI STREAM
+# -----------------------
+
+def _run_stream(scope, incoming, publish):
+    """Stream uygulamasını doğrudan ASGI ile sürer; ilk mesaj gelince istemciyi ayırır"""
+    backend = InProcessBackend()
+    app = ChallengeStreamApp(broker=ProgressBroker(backend=backend, interval=0))
+    sent = []
+
+    async def main():
+        inbox = asyncio.Queue()
+        for event in incoming:
+            inbox.put_nowait(event)
+        got_message = asyncio.Event()
+
+        async def receive():
+            return await inbox.get()
+
+        async def send(event):
+            sent.append(event)
+            if b"data:" in event.get("body", b"") or "text" in event:
+                got_message.set()
+
+        task = asyncio.ensure_future(app(scope, receive, send))
+        while not backend._subscribers:
+            await asyncio.sleep(0.01)
+        # Başka bir thread'den yayın (senkron Django kodu gibi)
+        threading.Thread(target=publish, args=(app.broker,)).start()
+        await asyncio.wait_for(got_message.wait(), 2)
+        inbox.put_nowait({"type": "http.disconnect" if scope["type"] == "http" else "websocket.disconnect"})
+        await asyncio.wait_for(task, 2)
+        assert not backend._subscribers  # abonelik kapandı
+
+    asyncio.run(main())
+    return sent
+
+
+@pytest.fixture
+def stream_auth(db):
+    """Stream testleri için challenge + REST API'deki gibi Bearer başlığı"""
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+    user = User.objects.create_user(username="live@ex.com", email="live@ex.com", password="x")
+    challenge = apps.get_model("fitware", "Challenge").objects.create(
+        title="Live", created_user=user, target_value=10, unit="km",
+    )
+    header = (b"authorization", f"Bearer {AccessToken.for_user(user)}".encode())
+    return challenge, header
+
+
+def _refused(scope, incoming=()):
+    """Bağlantı akışa geçmeden kapanmalı; gönderilen olaylar döner"""
+    app = ChallengeStreamApp(broker=ProgressBroker(backend=InProcessBackend(), interval=0))
+    sent = []
+
+    async def main():
+        inbox = asyncio.Queue()
+        for event in incoming:
+            inbox.put_nowait(event)
+
+        async def send(event):
+            sent.append(event)
+
+        await asyncio.wait_for(app(scope, inbox.get, send), 2)
+
+    asyncio.run(main())
+    return sent
+
+
+# Stream uygulaması doğrulamayı ayrı bir thread'de yapar: satırlar commit edilmiş olmalı
+@pytest.mark.django_db(transaction=True)
+def test_sse_stream_pushes_progress_messages(stream_auth):
+    challenge, header = stream_auth
+    sent = _run_stream(
+        {"type": "http", "path": f"/api/challenges/{challenge.pk}/stream/", "headers": [header]},
+        [],
+        lambda broker: broker.publish_progress(_joined(challenge.pk, 1, 10), 2),
+    )
+    assert sent[0]["status"] == 200
+    assert (b"content-type", b"text/event-stream") in sent[0]["headers"]
+    body = b"".join(e.get("body", b"") for e in sent[1:]).decode()
+    assert "event: progress" in body
+    payload = json.loads(body.split("data: ", 1)[1].split("\n", 1)[0])
+    assert payload["challenge"] == challenge.pk and payload["updates"][0]["delta"] == 8
+
+
+@pytest.mark.django_db(transaction=True)
+def test_websocket_stream_pushes_progress_messages(stream_auth):
+    challenge, (_, value) = stream_auth
+    # Tarayıcı WebSocket'i başlık gönderemez: token query string'de
+    token = value.split(b" ", 1)[1]
+    sent = _run_stream(
+        {"type": "websocket", "path": f"/api/challenges/{challenge.pk}/stream/", "query_string": b"token=" + token},
+        [{"type": "websocket.connect"}],
+        lambda broker: broker.publish_progress(_joined(challenge.pk, 2, 1), 0),
+    )
+    assert sent[0] == {"type": "websocket.accept"}
+    message = json.loads(sent[1]["text"])
+    assert message["type"] == "progress" and message["updates"][0]["user_id"] == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_rejects_anonymous_and_missing_challenges(stream_auth):
+    challenge, header = stream_auth
+    path = f"/api/challenges/{challenge.pk}/stream/"
+    missing = f"/api/challenges/{challenge.pk + 100}/stream/"
+
+    assert _refused({"type": "http", "path": path})[0]["status"] == 401
+    bad = (b"authorization", b"Bearer not-a-token")
+    assert _refused({"type": "http", "path": path, "headers": [bad]})[0]["status"] == 401
+    assert _refused({"type": "http", "path": missing, "headers": [header]})[0]["status"] == 404
+
+    connect = [{"type": "websocket.connect"}]
+    assert _refused({"type": "websocket", "path": path}, connect)[-1] == {"type": "websocket.close", "code": 4401}
+    assert _refused({"type": "websocket", "path": missing, "headers": [header]}, connect)[-1] == {
+        "type": "websocket.close", "code": 4404,
+    }
@@ -0,0 +1,126 @@
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from fitware.throttling import (
+    CacheBucketStore,
+    DatabaseBucketStore,
+    InProcessBucketStore,
+    RateLimitBucket,
+    RateLimitRule,
+    parse_rate,
+)
+
+pytestmark = pytest.mark.django_db
+
+LIMITS = {
+    "login": {"ip": "5/min", "user": "2/min"},
+    "password_reset": {"ip": "3/hour"},
+    "ai_suggest": {"user": "2/min"},
+}
+
+
+@pytest.fixture
+def limits():
+    with override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS=LIMITS):
+        yield
+
+
+def _login(client, email, ip="10.0.0.1"):
+    return client.post("/api/v1/auth/login/", {"email": email, "password": "wrong"},
+                       format="json", REMOTE_ADDR=ip)
+
+
+def test_parse_rate():
+    assert parse_rate("10/min") == (10, 10 / 60)
+    assert parse_rate("5/15m") == (5, 5 / 900)
+    assert parse_rate("100/day") == (100, 100 / 86400)
+    with pytest.raises(ValueError):
+        parse_rate("ten per minute")
+
+
+@pytest.mark.parametrize("store", [InProcessBucketStore(), CacheBucketStore(), DatabaseBucketStore()],
+                         ids=["memory", "cache", "db"])
+def test_stores_refill_tokens_over_time(store):
+    t0 = 1_000_000.0
+    # kapasite 2, saniyede 1 jeton
+    assert [store.take("k", 2, 1.0, now=t0) for _ in range(3)] == [0, 0, 1.0]
+    assert store.take("k", 2, 1.0, now=t0 + 0.5) == pytest.approx(0.5)
+    assert store.take("k", 2, 1.0, now=t0 + 1.0) == 0
+    # uzun beklemede kapasiteyi aşmaz
+    assert [store.take("k", 2, 1.0, now=t0 + 100) for _ in range(3)] == [0, 0, 1.0]
+
+
+def test_login_throttled_per_account_and_per_ip(api_client, limits):
+    assert [_login(api_client, "a@ex.com").status_code for _ in range(2)] == [401, 401]
+    r = _login(api_client, "a@ex.com")
+    assert r.status_code == 429
+    assert int(r["Retry-After"]) >= 1
+
+    # reddedilen deneme de IP bucket'ından düşer: başka hesaplar için 2 jeton kaldı
+    assert [_login(api_client, f"b{i}@ex.com").status_code for i in range(3)] == [401, 401, 429]
+    # hesap bucket'ı IP+e-posta: başka IP'den gerçek kullanıcı kilitlenmez
+    assert _login(api_client, "a@ex.com", ip="10.0.0.2").status_code == 401
+
+
+def test_spoofed_forwarded_for_does_not_bypass_ip_bucket(api_client, limits):
+    codes = [
+        api_client.post("/api/v1/auth/login/", {"email": f"c{i}@ex.com", "password": "wrong"},
+                        format="json", REMOTE_ADDR="10.0.0.9", HTTP_X_FORWARDED_FOR=f"192.0.2.{i}").status_code
+        for i in range(6)
+    ]
+    assert codes == [401] * 5 + [429]
+
+
+@pytest.mark.parametrize("store", [InProcessBucketStore(), DatabaseBucketStore()], ids=["memory", "db"])
+def test_refilled_buckets_are_pruned(store):
+    t0 = 1_000_000.0
+    store.take("spent", 2, 1.0, now=t0)
+    store.take("spent", 2, 1.0, now=t0)
+    store.take("touched", 2, 1.0, now=t0)
+    # 1 sn sonra 'touched' dolmuş, 'spent' hâlâ bir jeton eksik
+    assert store.prune(now=t0 + 1.5) == 1
+    assert store.take("spent", 2, 1.0, now=t0 + 1.5) == 0
+    assert store.take("spent", 2, 1.0, now=t0 + 1.5) == pytest.approx(0.5)
+
+
+def test_suggest_throttled_per_user(auth_client, limits):
+    codes = [auth_client.post("/api/goals/suggest/", {"title": "Run 5k"}, format="json").status_code
+             for _ in range(3)]
+    assert 429 not in codes[:2] and codes[2] == 429
+    # endpoint sınıfı ortak: workout suggest de aynı bucket'ı kullanır
+    r = auth_client.post("/api/workouts/templates/suggest/", {"title": "Push day"}, format="json")
+    assert r.status_code == 429
+
+
+def test_db_rules_override_settings_without_restart(api_client, limits):
+    User.objects.create_user(username="r@ex.com", email="r@ex.com", password="XyZ12345!!")
+    url = "/api/v1/auth/password/reset/"
+    assert [api_client.post(url, {"email": "r@ex.com"}, format="json").status_code
+            for _ in range(4)] == [200, 200, 200, 429]
+
+    RateLimitRule.objects.create(scope="password_reset", key_type="ip", rate="3/hour", enabled=False)
+    assert api_client.post(url, {"email": "r@ex.com"}, format="json").status_code == 200
+
+    RateLimitRule.objects.filter(scope="password_reset").update(enabled=True, rate="1/day")
+    RateLimitRule.objects.get(scope="password_reset").save()  # sinyal: kurallar yeniden okunur
+    assert api_client.post(url, {"email": "r@ex.com"}, format="json").status_code == 429
+
+
+def test_prune_rate_limits_command(capsys):
+    import time
+
+    from django.core.management import call_command
+
+    store = DatabaseBucketStore()
+    store.take("old", 2, 1.0, now=time.time() - 60)
+    store.take("fresh", 2, 1.0)
+    with override_settings(RATE_LIMIT_STORE="fitware.throttling.DatabaseBucketStore"):
+        call_command("prune_rate_limits")
+    assert "Removed 1 buckets" in capsys.readouterr().out
+    assert list(RateLimitBucket.objects.values_list("key", flat=True)) == ["fresh"]
+
+
+def test_disabled_rate_limiting_allows_everything(api_client):
+    with override_settings(RATE_LIMIT_ENABLED=False, RATE_LIMITS=LIMITS):
+        assert all(_login(api_client, "a@ex.com").status_code == 401 for _ in range(5))
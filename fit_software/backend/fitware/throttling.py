@@ -0,0 +1,347 @@
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import DatabaseError, models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+# =============================================================================
+# MODELS
+# =============================================================================
+
+class RateLimitRule(models.Model):
+    """
+    RATE_LIMITS ayarını çalışma anında ezer (admin'den, deploy gerektirmeden).
+    Süreçler kuralları RATE_LIMIT_RULES_REFRESH_SECONDS aralıkla yeniden okur.
+    """
+    KEY_TYPES = [
+        ('ip', 'Per IP'),
+        ('user', 'Per user / account'),
+    ]
+
+    scope = models.CharField(max_length=50)
+    key_type = models.CharField(max_length=10, choices=KEY_TYPES)
+    # "10/min", "5/15m", "100/day" gibi; bucket kapasitesi = istek sayısı
+    rate = models.CharField(max_length=20)
+    enabled = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('scope', 'key_type')
+
+    def __str__(self):
+        return f"{self.scope}/{self.key_type}: {self.rate if self.enabled else 'off'}"
+
+
+class RateLimitBucket(models.Model):
+    """DatabaseBucketStore için bucket durumu (çok node'lu kurulum)"""
+    key = models.CharField(max_length=200, unique=True)
+    tokens = models.FloatField()
+    # Unix zamanı (saniye); node'lar arası karşılaştırılabilir olsun diye
+    updated_at = models.FloatField()
+    # Bucket'ın yeniden dolacağı an; sonrasında satır varsayılan durumla aynıdır ve silinebilir
+    full_at = models.FloatField(default=0, db_index=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.tokens:.2f}"
+
+
+# =============================================================================
+# RATES
+# =============================================================================
+
+RATE_RE = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*(s|sec|second|m|min|minute|h|hour|d|day)s?\s*$')
+PERIOD_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (kapasite, saniyede dolan jeton); geçersizse ValueError"""
+    match = RATE_RE.match(rate or '')
+    if not match:
+        raise ValueError(f"Invalid rate: {rate!r}")
+    count, multiplier, unit = match.groups()
+    period = int(multiplier or 1) * PERIOD_SECONDS[unit[0]]
+    count = int(count)
+    if count <= 0:
+        raise ValueError(f"Invalid rate: {rate!r}")
+    return count, count / period
+
+
+class RateLimitRules:
+    """Ayarlar + DB kurallarından scope başına limitler; süreç içinde kısa süre tutulur"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rules = None
+        self._loaded_at = 0.0
+
+    def get(self, scope):
+        """{'ip': (kapasite, jeton/sn), 'user': ...}; tanımsız anahtar türü sınırsızdır"""
+        refresh = getattr(settings, 'RATE_LIMIT_RULES_REFRESH_SECONDS', 30)
+        with self._lock:
+            if self._rules is None or time.monotonic() - self._loaded_at > refresh:
+                self._rules = self._load()
+                self._loaded_at = time.monotonic()
+            return self._rules.get(scope, {})
+
+    def reset(self):
+        with self._lock:
+            self._rules = None
+
+    @staticmethod
+    def _load():
+        rules = {}
+        for scope, limits in getattr(settings, 'RATE_LIMITS', {}).items():
+            rules[scope] = {k: parse_rate(rate) for k, rate in limits.items() if rate}
+        try:
+            with transaction.atomic():
+                overrides = list(RateLimitRule.objects.all())
+        except DatabaseError:
+            # Tablo henüz yok (migrate öncesi) / DB erişilemiyor: ayarlarla devam
+            overrides = []
+        for rule in overrides:
+            limits = rules.setdefault(rule.scope, {})
+            limits.pop(rule.key_type, None)
+            if rule.enabled:
+                try:
+                    limits[rule.key_type] = parse_rate(rule.rate)
+                except ValueError:
+                    pass
+        return rules
+
+
+rate_limit_rules = RateLimitRules()
+
+
+@receiver(post_save, sender=RateLimitRule)
+@receiver(post_delete, sender=RateLimitRule)
+def reset_rate_limit_rules(sender, **kwargs):
+    rate_limit_rules.reset()
+
+
+# =============================================================================
+# STORES
+# =============================================================================
+
+def refill(tokens, updated_at, capacity, per_second, now):
+    return min(capacity, tokens + max(0.0, now - updated_at) * per_second)
+
+
+def consume(tokens, capacity, per_second):
+    """(kalan jeton, bekleme süresi); jeton yoksa harcanmaz"""
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / per_second
+
+
+def full_at(tokens, capacity, per_second, now):
+    return now + (capacity - tokens) / per_second
+
+
+class InProcessBucketStore:
+    """
+    Tek node için: bucket'lar süreç belleğinde. Çok süreçli / çok node'lu kurulumda
+    CacheBucketStore veya DatabaseBucketStore RATE_LIMIT_STORE ayarıyla seçilir.
+    """
+
+    max_keys = 50000
+    # Dolmuş bucket'lar bu aralıkla (ve max_keys'e ulaşınca) atılır
+    prune_interval = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._pruned_at = 0.0
+
+    def take(self, key, capacity, per_second, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (capacity, now, now))
+            tokens, wait = consume(refill(tokens, updated_at, capacity, per_second, now), capacity, per_second)
+            if (len(self._buckets) >= self.max_keys and key not in self._buckets) \
+                    or abs(now - self._pruned_at) >= self.prune_interval:
+                self._prune(now)
+            self._buckets[key] = (tokens, now, full_at(tokens, capacity, per_second, now))
+        return wait
+
+    def prune(self, now=None):
+        """Yeniden dolmuş bucket'ları atar; atılan sayısını döner"""
+        with self._lock:
+            return self._prune(time.time() if now is None else now)
+
+    def _prune(self, now):
+        # Yeniden dolmuş bucket'lar varsayılan durumla aynı; atılabilir
+        before = len(self._buckets)
+        self._buckets = {k: v for k, v in self._buckets.items() if v[2] > now}
+        self._pruned_at = now
+        return before - len(self._buckets)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Paylaşılan Django cache'i (Redis / Memcached) üzerinde bucket. Okuma-yazma
+    atomik değil; eşzamanlı isteklerde limit birkaç istek aşılabilir.
+    """
+
+    key_prefix = 'ratelimit:'
+
+    def take(self, key, capacity, per_second, now=None):
+        now = time.time() if now is None else now
+        cache = caches[getattr(settings, 'RATE_LIMIT_CACHE', 'default')]
+        cache_key = self.key_prefix + key
+        tokens, updated_at = cache.get(cache_key) or (capacity, now)
+        tokens, wait = consume(refill(tokens, updated_at, capacity, per_second, now), capacity, per_second)
+        # Bucket dolana kadar tutmak yeterli
+        cache.set(cache_key, (tokens, now), timeout=int(capacity / per_second) + 1)
+        return wait
+
+
+class DatabaseBucketStore:
+    """
+    Node'lar arası kesin sayım: bucket satırı SELECT ... FOR UPDATE ile güncellenir.
+    Yeniden dolmuş satırlar `prune_rate_limits` komutuyla (cron) silinir.
+    """
+
+    PRUNE_BATCH_SIZE = 1000
+
+    def take(self, key, capacity, per_second, now=None):
+        now = time.time() if now is None else now
+        with transaction.atomic():
+            RateLimitBucket.objects.bulk_create(
+                [RateLimitBucket(key=key, tokens=capacity, updated_at=now)], ignore_conflicts=True,
+            )
+            bucket = RateLimitBucket.objects.select_for_update().get(key=key)
+            tokens, wait = consume(
+                refill(bucket.tokens, bucket.updated_at, capacity, per_second, now), capacity, per_second,
+            )
+            RateLimitBucket.objects.filter(pk=bucket.pk).update(
+                tokens=tokens, updated_at=now, full_at=full_at(tokens, capacity, per_second, now),
+            )
+        return wait
+
+    def prune(self, now=None, batch_size=PRUNE_BATCH_SIZE):
+        """Yeniden dolmuş bucket satırlarını batch batch siler; silinen sayısını döner"""
+        now = time.time() if now is None else now
+        full = RateLimitBucket.objects.filter(full_at__lte=now).order_by('pk')
+        deleted = 0
+        while True:
+            ids = list(full.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            # Bu arada harcanan bucket'a dokunulmaz
+            deleted += RateLimitBucket.objects.filter(pk__in=ids, full_at__lte=now).delete()[0]
+
+    def clear(self):
+        RateLimitBucket.objects.all().delete()
+
+
+_stores = {}
+
+
+def get_store():
+    path = getattr(settings, 'RATE_LIMIT_STORE', 'fitware.throttling.InProcessBucketStore')
+    store = _stores.get(path)
+    if store is None:
+        store = _stores.setdefault(path, import_string(path)())
+    return store
+
+
+@receiver(setting_changed)
+def reset_rate_limits_on_setting_change(setting, **kwargs):
+    if setting.startswith('RATE_LIMIT'):
+        rate_limit_rules.reset()
+        for store in _stores.values():
+            if isinstance(store, InProcessBucketStore):
+                store.clear()
+
+
+# =============================================================================
+# THROTTLES
+# =============================================================================
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Scope (endpoint sınıfı) başına IP ve kullanıcı bucket'ları. Herhangi biri boşsa
+    istek 429 + Retry-After ile reddedilir. RATE_LIMIT_ENABLED=False ise devre dışı.
+
+    IP, DRF'in get_ident'i ile REST_FRAMEWORK['NUM_PROXIES'] ayarına göre belirlenir:
+    X-Forwarded-For'da yalnız güvenilen proxy'lerin eklediği adres kullanılır.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self._wait = 0.0
+
+    def get_user_ident(self, request):
+        user = getattr(request, 'user', None)
+        return user.pk if user is not None and user.is_authenticated else None
+
+    def allow_request(self, request, view):
+        if not getattr(settings, 'RATE_LIMIT_ENABLED', True):
+            return True
+        limits = rate_limit_rules.get(self.scope)
+        if not limits:
+            return True
+
+        idents = {'ip': self.get_ident(request), 'user': self.get_user_ident(request)}
+        store = get_store()
+        self._wait = 0.0
+        for key_type, (capacity, per_second) in limits.items():
+            ident = idents.get(key_type)
+            if ident in (None, ''):
+                continue
+            wait = store.take(f"{self.scope}:{key_type}:{ident}", capacity, per_second)
+            self._wait = max(self._wait, wait)
+        return self._wait == 0
+
+    def wait(self):
+        return self._wait
+
+
+class AccountThrottleMixin:
+    """
+    Giriş yapılmamış uç noktalarda 'user' bucket'ı gönderilen e-postaya göre tutulur.
+
+    Yalnız e-postaya bağlı bucket, hesabı bilen herkesin gerçek kullanıcıyı kilitlemesine
+    izin verir. `account_per_ip` ile anahtar IP+e-posta olur: kilit saldırganın IP'sinde
+    kalır, buna karşılık çok IP'den tek hesaba yapılan deneme yalnız IP bucket'larıyla
+    sınırlanır. Şifre sıfırlamada amaç alıcıya giden e-posta sayısını sınırlamak olduğu
+    için anahtar yalnız e-postadır.
+    """
+
+    account_per_ip = False
+
+    def get_user_ident(self, request):
+        email = request.data.get('email') if hasattr(request, 'data') else None
+        email = (email or '').strip().lower()
+        if not email:
+            return super().get_user_ident(request)
+        return f"{self.get_ident(request)}:{email}" if self.account_per_ip else email
+
+
+class LoginRateThrottle(AccountThrottleMixin, TokenBucketThrottle):
+    scope = 'login'
+    account_per_ip = True
+
+
+class SignupRateThrottle(TokenBucketThrottle):
+    scope = 'signup'
+
+
+class PasswordResetRateThrottle(AccountThrottleMixin, TokenBucketThrottle):
+    scope = 'password_reset'
+
+
+class SuggestRateThrottle(TokenBucketThrottle):
+    scope = 'ai_suggest'
@@ -0,0 +1,46 @@
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class TokenPruner:
+    """
+    Süresi dolmuş refresh token kayıtlarını (OutstandingToken + BlacklistedToken) siler.
+
+    Rotation her refresh/login'de satır ekler; süresi dolan token zaten reddedildiği için
+    kayıtlarına gerek yoktur. Silme pk sırasıyla küçük batch'ler halinde, her batch ayrı
+    transaction'da yapılır: kilitler kısa sürer ve tarama kaldığı yerden devam eder.
+    """
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def prune(batch_size=BATCH_SIZE, before=None, max_batches=None, pause=0):
+        """(silinen outstanding, silinen blacklisted) sayılarını döner"""
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+        before = before or timezone.now()
+        outstanding = blacklisted = batches = 0
+        last_pk = 0
+        while max_batches is None or batches < max_batches:
+            ids = list(
+                OutstandingToken.objects
+                .filter(pk__gt=last_pk, expires_at__lte=before)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                # Önce blacklist: cascade toplamaya gerek kalmasın, sayılar ayrı raporlansın
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+            last_pk = ids[-1]
+            batches += 1
+            if pause:
+                time.sleep(pause)
+        return outstanding, blacklisted
@@ -2,7 +2,7 @@ import logging
 import secrets
 from urllib.parse import urlencode
 
-import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
@@ -11,12 +11,11 @@ from django.contrib.auth.models import User
 from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import path,include
-from django.core.mail import send_mail
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -26,6 +25,11 @@ from .goals import GoalViewSet
 from .profile import ProfileViewSet
 from .challanges import ChallengeViewSet
 from .badges import BadgeViewSet
+from .body_metrics import BodyMetricViewSet
+from .achievements import AchievementViewSet
+from .google_oauth import GoogleAuthError, google_oidc
+from .mailer import MailQueue
+from .throttling import LoginRateThrottle, PasswordResetRateThrottle, SignupRateThrottle
 
 logger = logging.getLogger(__name__)
 router = DefaultRouter()
@@ -33,6 +37,8 @@ router.register(r'goals', GoalViewSet, basename='goal')
 router.register(r'profile', ProfileViewSet, basename='profile')
 router.register(r"challenges", ChallengeViewSet, basename="challenge")
 router.register(r'badges', BadgeViewSet, basename='badge')
+router.register(r'body-metrics', BodyMetricViewSet, basename='body-metric')
+router.register(r'achievements', AchievementViewSet, basename='achievement')
 
 def health(request):
     return JsonResponse({"status": "ok", "service": "fitware", "version": "0.1.0"})
@@ -40,10 +46,10 @@ def health(request):
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def login(request):
     try:
-        from django.utils import timezone
-        from .goals import ActivityLog
+        from .activity import activity_recorder
         
         data = request.data
         email = data.get("email", "").strip().lower()
@@ -64,12 +70,7 @@ def login(request):
 
         # Log the login activity
         try:
-            today = timezone.now().date()
-            ActivityLog.objects.get_or_create(
-                user=user, 
-                date=today, 
-                defaults={'action_type': 'login'}
-            )
+            activity_recorder.record(user, 'login')
         except Exception as log_err:
             logger.warning("Could not log activity: %s", log_err)
 
@@ -102,6 +103,7 @@ def login(request):
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([SignupRateThrottle])
 def signup(request):
     try:
         data = request.data
@@ -174,6 +176,7 @@ token_generator = PasswordResetTokenGenerator()
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([PasswordResetRateThrottle])
 def password_reset_request(request):
     email = (request.data.get("email") or "").strip().lower()
 
@@ -193,15 +196,15 @@ def password_reset_request(request):
     frontend_url = getattr(settings, "FRONTEND_URL", "http://localhost:5173")
     reset_link = f"{frontend_url}/reset-password/{uid}/{token}"
 
-    send_mail(
+    # SMTP beklenmez: e-posta kuyruğa yazılır, arka plan işi gönderir.
+    # Böylece var olan / olmayan email için cevap süresi de aynı kalır.
+    MailQueue.queue(
+        to=email,
         subject="Fitware - Reset your password",
-        message=(
+        body=(
             f"Click this link to reset your password:\n\n{reset_link}\n\n"
             "If you did not request this, ignore this email."
         ),
-        from_email=getattr(settings, "DEFAULT_FROM_EMAIL", "no-reply@fitware.local"),
-        recipient_list=[email],
-        fail_silently=False,
     )
 
     return Response({"message": "If the email exists, a reset link was sent."}, status=status.HTTP_200_OK)
@@ -261,7 +264,10 @@ def google_login(request):
         )
 
     state = secrets.token_urlsafe(32)
+    nonce = secrets.token_urlsafe(32)
     request.session["google_oauth_state"] = state
+    # id_token'daki nonce ile eşleşmeli (token tekrar oynatılamasın)
+    request.session["google_oauth_nonce"] = nonce
 
     params = {
         "client_id": settings.GOOGLE_CLIENT_ID,
@@ -269,6 +275,7 @@ def google_login(request):
         "response_type": "code",
         "scope": "openid email profile",
         "state": state,
+        "nonce": nonce,
         "access_type": "offline",
         "prompt": "consent",
         "include_granted_scopes": "true",
@@ -277,72 +284,31 @@ def google_login(request):
     return redirect(google_auth_url)
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def google_callback(request):
-    if not _google_configured():
-        return Response(
-            {"error": "Google OAuth is not configured."},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        )
-
-    error = request.query_params.get("error")
+def _google_callback_start(request):
+    """Sorgu parametrelerini ve state'i kontrol eder; (code, nonce) ya da hata redirect'i döner"""
+    error = request.GET.get("error")
     if error:
         logger.warning("Google OAuth returned error: %s", error)
-        return redirect(_build_frontend_redirect({"error": error}))
+        return None, redirect(_build_frontend_redirect({"error": error}))
 
-    state = request.query_params.get("state")
+    state = request.GET.get("state")
     stored_state = request.session.pop("google_oauth_state", None)
+    nonce = request.session.pop("google_oauth_nonce", None)
     if not state or not stored_state or state != stored_state:
         logger.warning("Google OAuth state mismatch: expected=%s got=%s", stored_state, state)
-        return redirect(_build_frontend_redirect({"error": "state_mismatch"}))
+        return None, redirect(_build_frontend_redirect({"error": "state_mismatch"}))
 
-    code = request.query_params.get("code")
+    code = request.GET.get("code")
     if not code:
-        return redirect(_build_frontend_redirect({"error": "missing_code"}))
+        return None, redirect(_build_frontend_redirect({"error": "missing_code"}))
+    return (code, nonce), None
 
-    try:
-        token_response = requests.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "code": code,
-                "client_id": settings.GOOGLE_CLIENT_ID,
-                "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-                "grant_type": "authorization_code",
-            },
-            timeout=10,
-        )
-        token_response.raise_for_status()
-        token_data = token_response.json()
-    except requests.RequestException as exc:  # pragma: no cover - network
-        logger.exception("Google token exchange failed: %s", exc)
-        return redirect(_build_frontend_redirect({"error": "token_exchange_failed"}))
-
-    access_token = token_data.get("access_token")
-    if not access_token:
-        logger.error("Google token response missing access_token: %s", token_data)
-        return redirect(_build_frontend_redirect({"error": "missing_access_token"}))
-
-    try:
-        userinfo_response = requests.get(
-            "https://www.googleapis.com/oauth2/v2/userinfo",
-            headers={"Authorization": f"Bearer {access_token}"},
-            timeout=10,
-        )
-        userinfo_response.raise_for_status()
-        profile = userinfo_response.json()
-    except requests.RequestException as exc:  # pragma: no cover - network
-        logger.exception("Fetching Google user info failed: %s", exc)
-        return redirect(_build_frontend_redirect({"error": "userinfo_fetch_failed"}))
-
-    email = profile.get("email")
-    if not email:
-        logger.error("Google user info missing email: %s", profile)
-        return redirect(_build_frontend_redirect({"error": "missing_email"}))
 
-    first_name = profile.get("given_name") or ""
-    last_name = profile.get("family_name") or ""
+def _google_callback_finish(claims):
+    """Doğrulanmış id_token claim'leriyle kullanıcıyı bulur/oluşturur ve JWT ile frontend'e yönlendirir"""
+    email = claims["email"]
+    first_name = claims.get("given_name") or ""
+    last_name = claims.get("family_name") or ""
 
     user, created = User.objects.get_or_create(
         email=email,
@@ -378,13 +344,56 @@ def google_callback(request):
     return redirect(_build_frontend_redirect(redirect_params))
 
 
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def google_callback(request):
+    if not _google_configured():
+        return Response(
+            {"error": "Google OAuth is not configured."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    params, error_response = _google_callback_start(request)
+    if error_response:
+        return error_response
+
+    try:
+        claims = google_oidc.authenticate(*params)
+    except GoogleAuthError as exc:
+        return redirect(_build_frontend_redirect({"error": exc.code}))
+    return _google_callback_finish(claims)
+
+
+async def google_callback_async(request):
+    """
+    ASGI sürümü (GOOGLE_OAUTH_ASYNC): Google'a giden istekler event loop'u bloklamaz,
+    session / DB adımları sync_to_async ile çalışır.
+    """
+    if not _google_configured():
+        return JsonResponse({"error": "Google OAuth is not configured."}, status=500)
+
+    params, error_response = await sync_to_async(_google_callback_start)(request)
+    if error_response:
+        return error_response
+
+    try:
+        claims = await google_oidc.aauthenticate(*params)
+    except GoogleAuthError as exc:
+        return redirect(_build_frontend_redirect({"error": exc.code}))
+    return await sync_to_async(_google_callback_finish)(claims)
+
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/health/", health),
     path("api/v1/auth/login/", login, name="login"),
     path("api/v1/auth/signup/", signup, name="signup"),
     path("api/auth/google/login/", google_login, name="google_login"),
-    path("api/auth/google/callback/", google_callback, name="google_callback"),
+    path(
+        "api/auth/google/callback/",
+        google_callback_async if settings.GOOGLE_OAUTH_ASYNC else google_callback,
+        name="google_callback",
+    ),
     path("api/v1/auth/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/v1/auth/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
      # dj-rest-auth basic login/registration (optional if you use email/pass too)
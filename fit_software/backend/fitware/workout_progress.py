@@ -0,0 +1,138 @@
+from django.db import transaction
+from django.db.models import Case, Count, Exists, F, FloatField, OuterRef, Q, Sum, Value, When
+from django.utils import timezone
+
+from .goals import Goal, GoalProgressService, local_today
+
+# =============================================================================
+# SERVICES
+# =============================================================================
+
+class WorkoutProgressFanout:
+    """
+    Tamamlanan bir antrenmanın katkısını (workouts / dakika / saat / set / tekrar)
+    kullanıcının eşleşen aktif Goal ve ChallengeJoined kayıtlarına F() ile ekler.
+    Her session için en fazla bir kez uygulanır (WorkoutSession.progress_applied).
+    """
+
+    @staticmethod
+    def contributions(session_id):
+        """Session'ın birim başına katkısı, tek aggregate sorgusuyla"""
+        from workouts.models import WorkoutSession
+
+        qs = (
+            WorkoutSession.objects.filter(pk=session_id)
+            .values('user_id', 'duration_minutes')
+            .order_by()
+            .annotate(
+                set_count=Count('exercises__sets'),
+                rep_count=Sum('exercises__sets__reps'),
+            )
+        )
+        row = next(iter(qs), None)
+        if not row:
+            return None, {}
+
+        minutes = row['duration_minutes'] or 0
+        amounts = {
+            'workouts': 1,
+            'min': minutes,
+            'minutes': minutes,
+            'hr': round(minutes / 60, 2),
+            'sets': row['set_count'] or 0,
+            'reps': row['rep_count'] or 0,
+        }
+        return row['user_id'], {unit: amount for unit, amount in amounts.items() if amount}
+
+    @staticmethod
+    def apply_session(session_id):
+        """
+        Session'ın katkısını uygular. Daha önce uygulandıysa (ya da session tamamlanmamışsa)
+        hiçbir şey yapmaz ve None döner; aksi halde güncellenen kayıt sayılarını döner.
+        """
+        from workouts.models import WorkoutSession
+        from .achievements import AchievementService
+        from .leaderboards import LeaderboardService
+        from .models import Challenge, ChallengeJoined
+        from .outbox import EventOutbox
+        from .progress import ProgressHistory
+
+        with transaction.atomic():
+            # Idempotency: bayrağı koşullu UPDATE ile kapan işi yapar
+            claimed = WorkoutSession.objects.filter(
+                pk=session_id, is_completed=True, progress_applied=False
+            ).update(progress_applied=True)
+            if not claimed:
+                return None
+
+            user_id, amounts = WorkoutProgressFanout.contributions(session_id)
+            if not amounts:
+                return {'goals': 0, 'challenges': 0, 'completed_goals': []}
+            now = timezone.now()
+
+            # 1) Goal'ler: tek UPDATE, artış miktarı birime göre Case ile seçilir
+            goals = Goal.objects.filter(
+                user_id=user_id, is_active=True, is_completed=False, unit__in=amounts
+            )
+            goal_ids = list(goals.values_list('id', flat=True))
+            if goal_ids:
+                Goal.objects.filter(pk__in=goal_ids).update(
+                    current_value=F('current_value') + Case(
+                        *[When(unit=unit, then=Value(float(amount))) for unit, amount in amounts.items()],
+                        default=Value(0.0),
+                        output_field=FloatField(),
+                    ),
+                    updated_at=now,
+                )
+                rows = list(
+                    Goal.objects.filter(pk__in=goal_ids).values_list('id', 'current_value', 'target_value', 'unit')
+                )
+                completed = [
+                    (pk, current, unit) for pk, current, target, unit in rows if target > 0 and current >= target
+                ]
+                completed_ids = [pk for pk, _, _ in completed]
+                if completed_ids:
+                    Goal.objects.filter(pk__in=completed_ids).update(is_completed=True)
+                    AchievementService.goals_completed([user_id] * len(completed_ids))
+                    # Badge kontrolü ve aktivite logu goal_progress handler'larında (fitware.outbox)
+                    EventOutbox.publish_many('goal_progress', [
+                        {'goal_id': pk, 'user_id': user_id, 'value': current, 'unit': unit, 'completed': True}
+                        for pk, current, unit in completed
+                    ])
+                ProgressHistory.record_many([(pk, current) for pk, current, _, _ in rows], 'workout')
+                # Bu goal'lere bağlı join'ler goal değerinden senkronlanır
+                GoalProgressService.sync_challenges(goal_ids)
+            else:
+                completed_ids = []
+
+            # 2) Goal'e bağlı olmayan (ya da bağlı goal'ü artmayan) aktif challenge join'leri
+            today = local_today()
+            joins = (
+                ChallengeJoined.objects
+                .filter(user_id=user_id, is_completed=False, challenge__unit__in=amounts)
+                .filter(Q(challenge__due_date__isnull=True) | Q(challenge__due_date__gte=today))
+                .exclude(goal_id__in=goal_ids)
+                .values_list('id', 'challenge_id', 'challenge__unit')
+            )
+            ids_by_unit = {}
+            challenge_ids = set()
+            for join_id, challenge_id, unit in joins:
+                ids_by_unit.setdefault(unit, []).append(join_id)
+                challenge_ids.add(challenge_id)
+            for unit, ids in ids_by_unit.items():
+                ChallengeJoined.objects.filter(pk__in=ids).update(
+                    progress_value=F('progress_value') + amounts[unit], updated_at=now
+                )
+            join_ids = [pk for ids in ids_by_unit.values() for pk in ids]
+            if join_ids:
+                newly_completed = ChallengeJoined.objects.filter(pk__in=join_ids).filter(
+                    Exists(Challenge.objects.filter(
+                        pk=OuterRef('challenge_id'),
+                        target_value__gt=0,
+                        target_value__lte=OuterRef('progress_value'),
+                    ))
+                ).update(is_completed=True)
+                AchievementService.challenges_completed([user_id] * newly_completed)
+                transaction.on_commit(lambda: LeaderboardService.invalidate(*challenge_ids))
+
+        return {'goals': len(goal_ids), 'challenges': len(join_ids), 'completed_goals': completed_ids}
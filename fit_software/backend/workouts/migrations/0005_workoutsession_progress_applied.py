@@ -0,0 +1,25 @@
+# Generated by Django 4.2.16 on 2026-10-19 05:53
+
+from django.db import migrations, models
+
+
+def mark_existing_sessions_applied(apps, schema_editor):
+    """Eski tamamlanmış session'lar geriye dönük olarak goal'lere eklenmesin"""
+    WorkoutSession = apps.get_model('workouts', 'WorkoutSession')
+    WorkoutSession.objects.filter(is_completed=True).update(progress_applied=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0004_workouttemplate_is_ai_generated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workoutsession',
+            name='progress_applied',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_existing_sessions_applied, migrations.RunPython.noop),
+    ]
@@ -67,6 +67,8 @@ class WorkoutSession(models.Model):
     mood_emoji = models.CharField(max_length=10, blank=True, null=True)
     notes = models.TextField(blank=True) # General notes for the whole day
     is_completed = models.BooleanField(default=False)
+    # Goal/challenge progress katkısı uygulandı mı (fitware.workout_progress, session başına bir kez)
+    progress_applied = models.BooleanField(default=False)
 
     def __str__(self):
         return f"{self.title} ({self.date.date()})"
@@ -796,4 +796,77 @@ class WorkoutAPITest(APITestCase):
         try:
             self.client.post(url, data, format='json')
         except:
-            pass                           
\ No newline at end of file
+            pass                           
+
+class WorkoutProgressFanoutTest(APITestCase):
+    """Completing a workout feeds matching goals and challenges exactly once"""
+
+    def setUp(self):
+        from fitware.activity import activity_recorder
+        from fitware.goals import Goal
+        from fitware.models import Challenge, ChallengeJoined
+
+        # Süreç içi tampon testler arasında taşınmasın (geri alınan pk'ler yeniden kullanılır)
+        activity_recorder.clear()
+        self.user = User.objects.create_user(username='fanoutuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.session = WorkoutSession.objects.create(user=self.user, title="Push Day")
+        exercise = Exercise.objects.create(name="Pushup", category="strength", metric_type="reps")
+        workout_ex = WorkoutExercise.objects.create(workout=self.session, exercise=exercise)
+        for number, reps in enumerate((10, 12, 8), start=1):
+            WorkoutSet.objects.create(workout_exercise=workout_ex, set_number=number, reps=reps)
+
+        self.workouts_goal = Goal.objects.create(user=self.user, title="Workouts", target_value=2, unit="workouts")
+        self.reps_goal = Goal.objects.create(user=self.user, title="Reps", target_value=30, unit="reps")
+        self.km_goal = Goal.objects.create(user=self.user, title="Run", target_value=10, unit="km")
+        challenge = Challenge.objects.create(title="Minutes", created_user=self.user, target_value=100, unit="minutes")
+        self.join = ChallengeJoined.objects.create(user=self.user, challenge=challenge)
+
+    def _complete(self):
+        url = f'/api/workouts/sessions/{self.session.id}/complete/'
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {"duration_minutes": 45}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_complete_applies_contribution_per_unit(self):
+        self._complete()
+
+        self.workouts_goal.refresh_from_db()
+        self.reps_goal.refresh_from_db()
+        self.km_goal.refresh_from_db()
+        self.join.refresh_from_db()
+        self.assertEqual(self.workouts_goal.current_value, 1)
+        self.assertEqual(self.reps_goal.current_value, 30)
+        self.assertTrue(self.reps_goal.is_completed)
+        self.assertEqual(self.km_goal.current_value, 0)
+        self.assertEqual(self.join.progress_value, 45)
+        self.session.refresh_from_db()
+        self.assertTrue(self.session.progress_applied)
+
+    def test_fanout_is_idempotent_per_session(self):
+        from fitware.workout_progress import WorkoutProgressFanout
+
+        self._complete()
+        self.assertIsNone(WorkoutProgressFanout.apply_session(self.session.id))
+        self._complete()
+
+        self.workouts_goal.refresh_from_db()
+        self.join.refresh_from_db()
+        self.assertEqual(self.workouts_goal.current_value, 1)
+        self.assertEqual(self.join.progress_value, 45)
+
+    def test_completed_goals_are_handed_to_goal_progress_handlers(self):
+        from unittest.mock import patch
+        from fitware.goals import ActivityLog
+        from fitware.outbox import OutboxEvent
+
+        with patch("fitware.badges.BadgeService.check_milestone_badges") as check:
+            self._complete()
+
+        event = OutboxEvent.objects.get(topic="goal_progress")
+        self.assertEqual(event.payload["goal_id"], self.reps_goal.id)
+        self.assertTrue(event.payload["completed"])
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(ActivityLog.objects.filter(user=self.user, action_type="goal_completed").count(), 1)
+        # workout_completed ve goal_progress handler'ları; apply_session içinde ayrıca kontrol yok
+        self.assertEqual(check.call_count, 2)
@@ -1,7 +1,9 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.db.models import Sum, Count, F
+from fitware.throttling import SuggestRateThrottle
 # 1. Update Imports
 from .models import WorkoutTemplate, WorkoutSession, WorkoutExercise, WorkoutSet
 from .serializers import (
@@ -149,7 +151,7 @@ class WorkoutTemplateViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-    @action(detail=False, methods=['post'], url_path='suggest')
+    @action(detail=False, methods=['post'], url_path='suggest', throttle_classes=[SuggestRateThrottle])
     def suggest(self, request):
         title = (request.data.get('title') or '').strip()
         notes = (request.data.get('notes') or request.data.get('description') or '').strip()
@@ -287,7 +289,17 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
             .order_by('-date')
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        from fitware.achievements import AchievementService
+        session = serializer.save(user=self.request.user)
+        AchievementService.session_saved(session, was_completed=False, old_duration=0)
+
+    def perform_update(self, serializer):
+        # Tamamlanma / süre değişikliği kullanıcı sayaçlarına yansır
+        from fitware.achievements import AchievementService
+        was_completed = serializer.instance.is_completed
+        old_duration = serializer.instance.duration_minutes
+        session = serializer.save()
+        AchievementService.session_saved(session, was_completed, old_duration)
 
     # --- NEW: Add a Set (Smart Logic) ---
     @action(detail=True, methods=['post'])
@@ -321,6 +333,12 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
             reps=request.data.get('reps', 0),
             rpe=request.data.get('rpe')
         )
+        new_set.refresh_from_db(fields=['weight_kg', 'reps'])
+
+        from fitware.achievements import AchievementService
+        AchievementService.sets_changed(
+            session, sets=1, reps=new_set.reps, volume=new_set.weight_kg * new_set.reps,
+        )
         
         return Response(WorkoutSetSerializer(new_set).data, status=status.HTTP_201_CREATED)
 
@@ -343,6 +361,8 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
         except WorkoutSet.DoesNotExist:
             return Response({'error': 'Set not found in this session'}, status=status.HTTP_404_NOT_FOUND)
         
+        old_reps, old_volume = workout_set.reps, workout_set.weight_kg * workout_set.reps
+
         # Update fields
         if 'weight_kg' in request.data:
             workout_set.weight_kg = request.data['weight_kg']
@@ -352,6 +372,14 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
             workout_set.rpe = request.data['rpe']
         
         workout_set.save()
+        workout_set.refresh_from_db(fields=['weight_kg', 'reps'])
+
+        from fitware.achievements import AchievementService
+        AchievementService.sets_changed(
+            session,
+            reps=workout_set.reps - old_reps,
+            volume=workout_set.weight_kg * workout_set.reps - old_volume,
+        )
         return Response(WorkoutSetSerializer(workout_set).data)
 
     # --- UPDATED: Delete Set ---
@@ -373,6 +401,11 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
             # If so, maybe delete the WorkoutExercise container too?
             parent_exercise = workout_set.workout_exercise
             workout_set.delete()
+
+            from fitware.achievements import AchievementService
+            AchievementService.sets_changed(
+                session, sets=-1, reps=-workout_set.reps, volume=-workout_set.weight_kg * workout_set.reps,
+            )
             
             if parent_exercise.sets.count() == 0:
                 parent_exercise.delete()
@@ -385,6 +418,7 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
     def complete(self, request, pk=None):
         session = self.get_object()
         was_completed = session.is_completed
+        old_duration = session.duration_minutes
         session.is_completed = True
         
         if 'duration_minutes' in request.data:
@@ -394,66 +428,32 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
         if 'notes' in request.data:
             session.notes = request.data['notes']
         
-        session.save()
+        from fitware.achievements import AchievementService
+        from fitware.outbox import EventOutbox
+
+        with transaction.atomic():
+            session.save()
+            session.refresh_from_db(fields=['duration_minutes'])
+            AchievementService.session_saved(session, was_completed, old_duration)
+
+            # Aktivite logu, goal/challenge progress katkısı ve badge kontrolü outbox olayından
+            # commit sonrası işlenir; yeni badge'ler /api/badges/new/ ile teslim edilir
+            if not was_completed:
+                EventOutbox.publish('workout_completed', {'session_id': session.pk, 'user_id': session.user_id})
         
-        # Log activity for completed workout and check for badges
-        new_badge = None
-        if not was_completed:
-            from django.utils import timezone
-            from django.conf import settings
-            import pytz
-            from fitware.goals import ActivityLog
-            from fitware.badges import BadgeService
-            from fitware.models import Badge
-            
-            local_tz = pytz.timezone(settings.TIME_ZONE)
-            today = timezone.now().astimezone(local_tz).date()
-            ActivityLog.objects.get_or_create(
-                user=request.user,
-                date=today,
-                action_type='workout_completed'
-            )
-            
-            # Get badges before check
-            badges_before = set(Badge.objects.filter(user=request.user).values_list('badge_type', flat=True))
-            
-            # Check and award badges
-            BadgeService.check_milestone_badges(request.user)
-            
-            # Get badges after check to find newly earned badge
-            badges_after = set(Badge.objects.filter(user=request.user).values_list('badge_type', flat=True))
-            new_badges = badges_after - badges_before
-            
-            if new_badges:
-                new_badge = list(new_badges)[0]  # Get the first new badge
-        
-        # Return response with session data and new badge info
-        response_data = WorkoutSessionSerializer(session).data
-        if new_badge:
-            response_data['new_badge'] = new_badge
-        
-        return Response(response_data)
+        return Response(WorkoutSessionSerializer(session).data)
 
     # --- UPDATED: Stats ---
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        user_sessions = WorkoutSession.objects.filter(user=request.user, is_completed=True)
-        
-        total_workouts = user_sessions.count()
-        total_duration = user_sessions.aggregate(total=Sum('duration_minutes'))['total'] or 0
-        
+        from fitware.achievements import AchievementService
+
+        # Toplamlar kullanıcı sayaç satırından (tamamlanma geçişlerinde güncellenir)
+        counters = AchievementService.get(request.user.pk)
+
         # Querying the new WorkoutSet table
         all_sets = WorkoutSet.objects.filter(workout_exercise__workout__user=request.user, workout_exercise__workout__is_completed=True)
         
-        # Calculate Volume (Weight * Reps)
-        # We use F() expressions to do the math in the database
-        total_volume = all_sets.aggregate(
-            volume=Sum(F('weight_kg') * F('reps'))
-        )['volume'] or 0
-
-        total_sets = all_sets.count()
-        total_reps = all_sets.aggregate(total=Sum('reps'))['total'] or 0
-        
         # Most used exercises (Traverse up: Set -> WorkoutExercise -> Exercise)
         exercise_counts = all_sets.values('workout_exercise__exercise__name').annotate(
             count=Count('workout_exercise__exercise')
@@ -466,11 +466,11 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
         ]
         
         return Response({
-            'total_workouts': total_workouts,
-            'total_duration_minutes': total_duration,
-            'total_volume_kg': total_volume,
-            'total_sets': total_sets,
-            'total_reps': total_reps,
+            'total_workouts': counters.workouts_completed,
+            'total_duration_minutes': counters.total_duration_minutes,
+            'total_volume_kg': counters.total_volume_kg,
+            'total_sets': counters.total_sets,
+            'total_reps': counters.total_reps,
             'top_exercises': top_exercises
         })
 
@@ -483,7 +483,7 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
         session = self.get_object()
         serializer = self.get_serializer(session, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        self.perform_update(serializer)
         return Response(serializer.data)
 
     @action(detail=True, methods=['patch'])
@@ -523,7 +523,17 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
             return Response({'error': 'exercise_id is required'}, status=status.HTTP_400_BAD_REQUEST)
         try:
             workout_ex = WorkoutExercise.objects.get(id=exercise_id, workout=session)
+            if session.is_completed:
+                from fitware.achievements import AchievementService
+                removed = workout_ex.sets.aggregate(
+                    n=Count('id'), rep_count=Sum('reps'), volume=Sum(F('weight_kg') * F('reps')),
+                )
             workout_ex.delete()
+            if session.is_completed:
+                # Silmeden sonra: eksik sayaç satırı kaynaklardan kurulursa set'ler zaten düşülmüş olur
+                AchievementService.sets_changed(
+                    session, sets=-removed['n'], reps=-(removed['rep_count'] or 0), volume=-(removed['volume'] or 0),
+                )
             return Response(status=status.HTTP_204_NO_CONTENT)
         except WorkoutExercise.DoesNotExist:
             return Response({'error': 'WorkoutExercise not found'}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
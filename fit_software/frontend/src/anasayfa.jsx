@@ -11,6 +11,7 @@ export default function Anasayfa() {
   const [activeTab, setActiveTab] = useState('dashboard');
   const [goals, setGoals] = useState([]);
   const [activityLogs, setActivityLogs] = useState([]);
+  const [streak, setStreak] = useState(null);
   const [badges, setBadges] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -69,6 +70,13 @@ export default function Anasayfa() {
         console.error('Error fetching activity logs:', error);
         setActivityLogs([]);
       }
+      try {
+        const response = await api.get('/goals/streak/');
+        setStreak(response.data || null);
+      } catch (error) {
+        console.error('Error fetching streak:', error);
+        setStreak(null);
+      }
     };
     
     const logVisitAndFetch = async () => {
@@ -150,6 +158,11 @@ export default function Anasayfa() {
 
   // --- Login Streak ---
   const getLoginStreak = () => {
+    // Prefer the server-side streak (not limited to the 35-day log window)
+    if (streak) {
+      return streak.current_streak;
+    }
+
     // Use activityLogs, count consecutive days up to today
     if (!activityLogs || activityLogs.length === 0) {
       return 0;
@@ -4,6 +4,9 @@ import { api } from "./config";
 import "./challenges.css";
 import { API_BASE } from "./api";
 
+// Modalda gösterilen ilk leaderboard sayfası
+const LEADERBOARD_PAGE_SIZE = 20;
+
 export default function Challenges() {
   const navigate = useNavigate();
   const [user, setUser] = useState(null);
@@ -19,6 +22,8 @@ export default function Challenges() {
   const [modalType, setModalType] = useState(null); // 'details' | 'progress' | null
   const [selectedChallenge, setSelectedChallenge] = useState(null);
   const [progressInput, setProgressInput] = useState("");
+  // katılımcı sıralaması (ilk sayfa + benim sıram) leaderboard endpoint'inden
+  const [leaderboard, setLeaderboard] = useState(null);
 
   // create challenge modal
   const [showCreateModal, setShowCreateModal] = useState(false);
@@ -295,11 +300,36 @@ export default function Challenges() {
       challenge.progress_value != null ? String(challenge.progress_value) : ""
     );
     setModalType("progress");
+    loadLeaderboard(challenge.id);
   }
 
   function closeModal() {
     setModalType(null);
     setSelectedChallenge(null);
+    setLeaderboard(null);
+  }
+
+  async function loadLeaderboard(challengeId) {
+    try {
+      const token =
+        localStorage.getItem("access") || sessionStorage.getItem("access");
+      const res = await fetch(
+        `${API_BASE}/api/challenges/${challengeId}/leaderboard/?page_size=${LEADERBOARD_PAGE_SIZE}`,
+        {
+          headers: {
+            "Content-Type": "application/json",
+            ...(token ? { Authorization: `Bearer ${token}` } : {}),
+          },
+          credentials: "include",
+        }
+      );
+      if (!res.ok) {
+        throw new Error("Leaderboard alınamadı");
+      }
+      setLeaderboard(await res.json());
+    } catch (err) {
+      setLeaderboard(null);
+    }
   }
 
   async function handleSaveProgress() {
@@ -345,6 +375,7 @@ export default function Challenges() {
 
   // modal içindeki seçili challenge'ı güncelle
   setSelectedChallenge(updated);
+  loadLeaderboard(updated.id);
 }
 
   function openCreateModal() {
@@ -792,29 +823,23 @@ export default function Challenges() {
                       />
                     </div>
 
-                    {/* Katılımcı listesi */}
-                    {Array.isArray(selectedChallenge.participants_detail) &&
-                      selectedChallenge.participants_detail.length > 0 && (
+                    {/* Katılımcı listesi (sıralı, ilk sayfa) */}
+                    {leaderboard && leaderboard.results.length > 0 && (
                         <div className="participants-list">
                           <h4>Participants progress</h4>
                           <ul>
-                            {[...selectedChallenge.participants_detail]
-                              .sort(
-                                (a, b) =>
-                                  (b.progress_percent || 0) - (a.progress_percent || 0)
-                              )
-                              .map((p, index) => {
+                            {leaderboard.results.map((p) => {
                                 const isMe = p.user_id === user?.id;
 
                                 return (
                                   <li
-                                    key={p.id}
+                                    key={p.user_id}
                                     className={`participants-list-item ${
                                       isMe ? "participant-me" : ""
                                     }`}
                                   >
                                     <span className="participant-name">
-                                      #{index + 1} {p.display_name}
+                                      #{p.rank} {p.display_name}
                                       {isMe ? " (you)" : ""}
                                     </span>
                                     <span className="participant-progress">
@@ -826,6 +851,20 @@ export default function Challenges() {
                                 );
                               })}
                           </ul>
+                          {/* İlk sayfada değilsem kendi sıram ayrıca */}
+                          {leaderboard.me &&
+                            !leaderboard.results.some((p) => p.user_id === leaderboard.me.user_id) && (
+                              <p className="participants-list-item participant-me">
+                                #{leaderboard.me.rank} {leaderboard.me.display_name} (you) –{" "}
+                                {leaderboard.me.progress_value} / {selectedChallenge.target_value}{" "}
+                                {selectedChallenge.unit}
+                              </p>
+                            )}
+                          {leaderboard.count > leaderboard.results.length && (
+                            <p className="participants-more">
+                              +{leaderboard.count - leaderboard.results.length} more participants
+                            </p>
+                          )}
                         </div>
                       )}
 
@@ -112,6 +112,9 @@ export const goalsApi = {
 
   getActive: async () => (await api.get('/goals/active/')).data,
   getLogs: async () => (await api.get('/goals/activity_logs/')).data,
+  getStreak: async () => (await api.get('/goals/streak/')).data,
+  getActivityCalendar: async (year, encoding = 'bitmap') =>
+    (await api.get('/goals/activity-calendar/', { params: { year, encoding } })).data,
   suggest: async (title, description, profile = null) => {
     const payload = { title, description };
     if (profile && (profile.height || profile.weight || profile.fitness_level)) {